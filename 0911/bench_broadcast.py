@@ -0,0 +1,75 @@
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List
+
+from framing import Message
+from outbox import Outbox
+
+# 브로드캐스트 인코딩 방식 비교 마이크로 벤치마크
+#  - per-recipient: 수신자마다 encode_line(text) (예전 _broadcast 방식)
+#  - encode-once : Message.line()이 한 번 만든 bytes를 모든 대기열이 공유 (현재 방식)
+# 네트워크 없이 Outbox에 넣는 비용만 측정(실제 송신은 writer 몫이므로 제외)
+
+
+def encode_line(text: str) -> bytes:
+    # 예전 ChatServer._encode_line
+    return (text + '\n').encode('utf-8', errors='ignore')  # \n으로 라인 경계를 보장
+
+
+def per_recipient(outboxes: List[Outbox], text: str) -> None:
+    for box in outboxes:
+        box.put(encode_line(text))
+
+
+def encode_once(outboxes: List[Outbox], text: str) -> None:
+    msg = Message.system(text)
+    for box in outboxes:
+        box.put(msg.line())
+
+
+def measure(fn: Callable[[List[Outbox], str], None], users: int, messages: int, text: str) -> dict:
+    # 대기열이 넘쳐 버려지는 비용이 섞이지 않도록 메시지 수만큼 넉넉하게
+    outboxes = [Outbox(maxlen=messages) for _ in range(users)]
+
+    # 1) 처리량(할당 추적 없이)
+    start = time.perf_counter()
+    for _ in range(messages):
+        fn(outboxes, text)
+    elapsed = time.perf_counter() - start
+
+    # 2) 메모리: 같은 작업을 새 대기열에 다시 하면서 할당량 추적
+    outboxes = [Outbox(maxlen=messages) for _ in range(users)]
+    tracemalloc.start()
+    for _ in range(messages):
+        fn(outboxes, text)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'deliveries_per_sec': users * messages / elapsed,
+        'retained_bytes': current,
+        'peak_bytes': peak,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='브로드캐스트 인코딩 방식 벤치마크')
+    parser.add_argument('--users', type=int, default=5000, help='방 인원(수신자 수)')
+    parser.add_argument('--messages', type=int, default=20, help='보낼 메시지 수')
+    parser.add_argument('--size', type=int, default=80, help='메시지 길이(글자)')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    text = 'user> ' + '가' * args.size  # 한글은 UTF-8로 3바이트라 인코딩 비용이 큰 편
+    print(f'users={args.users} messages={args.messages} size={args.size}')
+    for label, fn in (('per-recipient', per_recipient), ('encode-once', encode_once)):
+        r = measure(fn, args.users, args.messages, text)
+        print(f'{label:>14}: {r["deliveries_per_sec"]:>12,.0f} deliveries/s | '
+              f'retained {r["retained_bytes"] / 1024:>9,.0f} KiB | peak {r["peak_bytes"] / 1024:>9,.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,13 +3,16 @@ import socket
 import threading
 import sys
 
+from framing import CHAT, MAGIC, PING, PING_LINE, PONG_LINE, SYSTEM, WHISPER, FrameError, Message, pack_frame, pack_sender, read_frame, split_sender
+
 
 class ChatClient:
     # 멀티스레드 채팅 서버 클래스
-    def __init__(self, host: str, port: int, name: str) -> None:
+    def __init__(self, host: str, port: int, name: str, binary: bool = False) -> None:
         self.host = host # 접속할 서버 주소
         self.port = port # 접속할 서버 포트
         self.name = name # 닉네임(첫 줄로 서버에 보냄)
+        self.binary = binary # True면 이진 프레이밍 모드(framing.py), 아니면 텍스트 줄 프로토콜
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM) # TCP 소켓 생성
         self._closed = False # 수신 스레드 또는 연결 종료 여부 플래그
 
@@ -19,11 +22,53 @@ class ChatClient:
         data = (text + '\n').encode('utf-8', errors='ignore')  # \n으로 라인 경계를 보장
         sock.sendall(data)  # sendall: 버퍼가 전부 송신될 때까지 블로킹
 
+    def _send(self, text: str) -> None:
+        # 입력 한 줄을 서버에 보냄(이진 모드면 종류에 맞는 프레임으로)
+        if not self.binary:
+            self._send_line(self.sock, text)
+            return
+        parts = text.split(' ', 2)
+        if parts[0] == '/w' and len(parts) == 3: # 귓속말: 대상 닉네임 + 본문
+            payload = pack_sender(parts[1].encode('utf-8'), parts[2].encode('utf-8', errors='ignore'))
+            frame = pack_frame(WHISPER, payload)
+        elif text.startswith('/'): # 그 밖의 명령(/join, /leave, /종료, 형식이 틀린 /w)
+            frame = pack_frame(SYSTEM, text.encode('utf-8', errors='ignore'))
+        else:
+            frame = pack_frame(CHAT, text.encode('utf-8', errors='ignore'))
+        self.sock.sendall(frame)
+
+    def _recv_frames(self) -> None:
+        # 이진 모드 수신 루프: 프레임을 텍스트 모드와 같은 모양의 줄로 바꿔 출력
+        file_obj = self.sock.makefile('rb')
+        try:
+            while True:
+                frame = read_frame(file_obj)
+                if frame is None:
+                    break
+                kind, payload = frame
+                if kind == PING: # 하트비트: 같은 종류의 빈 프레임으로 응답
+                    self.sock.sendall(pack_frame(PING, b''))
+                    continue
+                if kind == SYSTEM:
+                    msg = Message(SYSTEM, payload)
+                else:
+                    sender, body = split_sender(payload)
+                    msg = Message(kind, body, sender)
+                sys.stdout.write(msg.line().decode('utf-8', errors='ignore'))
+                sys.stdout.flush()
+        except (ConnectionResetError, BrokenPipeError, FrameError):
+            pass
+        finally:
+            self._closed = True
+
     def _recv_loop(self) -> None:
         # 서버에서 오는 메시지를 계속 읽어 화면에 출력하는 스레드 루프
         file_obj = self.sock.makefile('r', encoding='utf-8', newline='\n')
         try:
             for line in file_obj: # 서버가 보낸 각 줄
+                if line.rstrip('\n') == PING_LINE: # 하트비트: 화면에 찍지 않고 바로 응답
+                    self._send_line(self.sock, PONG_LINE)
+                    continue
                 sys.stdout.write(line)  # 그대로 출력(줄 끝에 \n 포함)
                 sys.stdout.flush() # 즉시 화면 반영
         except (ConnectionResetError, BrokenPipeError):
@@ -35,11 +80,15 @@ class ChatClient:
         # 서버로 TCP 연결
         self.sock.connect((self.host, self.port))
 
-        # 1) 닉네임 전송
-        self._send_line(self.sock, self.name)
+        # 1) 닉네임 전송(이진 모드는 MAGIC으로 모드를 알린 뒤 첫 SYSTEM 프레임에 닉네임)
+        if self.binary:
+            self.sock.sendall(MAGIC + pack_frame(SYSTEM, self.name.encode('utf-8')))
+        else:
+            self._send_line(self.sock, self.name)
 
         # 2) 수신 쓰레드 시작(백그라운드에서 메시지 출력)
-        t = threading.Thread(target=self._recv_loop, daemon=True) # daemon=True: 메인 종료 시 함께 종료
+        recv_loop = self._recv_frames if self.binary else self._recv_loop
+        t = threading.Thread(target=recv_loop, daemon=True) # daemon=True: 메인 종료 시 함께 종료
         t.start()
 
         # 3) 키보드 입력을 서버로 전송하는 루프
@@ -51,11 +100,11 @@ class ChatClient:
                     text = '/종료'
                 if not text: # 빈 줄이면 스킵
                     continue
-                self._send_line(self.sock, text) # 서버에 전송(일반/명령 포함)
+                self._send(text) # 서버에 전송(일반/명령 포함)
                 if text == '/종료': # 내가 종료를 입력한 경우 루프 종료
                     break
         except KeyboardInterrupt: # 터미널에서 Ctrl+C(클라이언트 강제 종료)
-            self._send_line(self.sock, '/종료') # 서버에 종료 알림 보내고
+            self._send('/종료') # 서버에 종료 알림 보내고
         finally:
             # 소켓 닫기(자원 해제)
             try:
@@ -69,12 +118,14 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument('--host', default='127.0.0.1')
     parser.add_argument('--port', type=int, default=5000)
     parser.add_argument('--name', required=True, help='닉네임(공백 불가, 최대 20자)')
+    parser.add_argument('--binary', action='store_true',
+                        help='길이 접두 이진 프레임으로 통신(메시지를 디코딩 없이 중계, 줄바꿈 포함 가능)')
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    client = ChatClient(args.host, args.port, args.name)
+    client = ChatClient(args.host, args.port, args.name, binary=args.binary)
     client.run()
 
 
@@ -0,0 +1,245 @@
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from framing import Message
+
+# 멀티 프로세스 모드
+#  - 워커 N개가 SO_REUSEPORT로 같은 포트를 각자 listen(커널이 접속을 워커에 분배)
+#  - 메인 프로세스는 허브: 워커 사이의 방송/귓속말을 중계하고 닉네임 소유권을 관리
+#  - 워커 ↔ 허브는 multiprocessing.Pipe(리눅스에서는 유닉스 도메인 소켓쌍)
+#
+# 허브 ↔ 워커 메시지(튜플)
+#   워커 → 허브: ('claim', 요청번호, 닉네임) / ('release', 닉네임)
+#                ('publish', 방이름 또는 None, 메시지) / ('whisper', 요청번호, 닉네임, 메시지)
+#   허브 → 워커: ('reply', 요청번호, 성공여부) / ('publish', 방이름 또는 None, 메시지)
+#                ('deliver', 닉네임, 메시지)
+# 메시지는 framing.Message(받는 워커가 연결별 프로토콜에 맞게 인코딩)
+
+
+class ClusterBus:
+    # 워커 쪽 버스 끝점. ChatServer가 닉네임 확인/방송/귓속말을 이걸로 허브에 알림
+    # 허브에 묻는 요청(claim/whisper)은 두 가지로
+    #  - claim/whisper: 답을 기다려 돌려줌(스레드 엔진: 연결마다 스레드라 그 연결만 기다림)
+    #  - claim_async/whisper_async: 바로 반환하고 답이 오면 callback(성공여부)을 수신 스레드에서 호출
+    #    (이벤트 루프 엔진: 루프 스레드가 허브 답을 기다리면 그 워커의 모든 연결이 멈춤)
+    # REPLY_TIMEOUT_SEC 안에 답이 없으면 실패(False)로 처리
+    REPLY_TIMEOUT_SEC = 5.0
+
+    def __init__(self, conn: Connection) -> None:
+        self._conn = conn
+        self._send_lock = threading.Lock()  # Connection.send는 스레드 안전하지 않음
+        self._seq = 0
+        self._waiting: Dict[int, Tuple[float, Callable[[bool], None]]] = {}  # 요청번호 → (마감 시각, callback)
+        self._server = None
+
+    def start(self, server) -> None:
+        # 허브에서 오는 메시지를 받아 서버에 전달하는 수신 스레드 시작
+        self._server = server
+        threading.Thread(target=self._reader_loop, daemon=True).start()
+
+    # ---------- 워커 → 허브 ----------
+
+    def _send(self, msg: tuple) -> None:
+        with self._send_lock:
+            try:
+                self._conn.send(msg)
+            except OSError:
+                pass  # 허브가 내려간 경우: 수신 스레드가 감지해 워커를 종료시킴
+
+    def _request_async(self, kind: str, callback: Callable[[bool], None], *args) -> None:
+        # 허브에 묻고 바로 반환. 답(또는 시간 초과/전송 실패)은 callback으로 정확히 한 번
+        with self._send_lock:
+            self._seq += 1
+            seq = self._seq
+            self._waiting[seq] = (time.monotonic() + self.REPLY_TIMEOUT_SEC, callback)
+            try:
+                self._conn.send((kind, seq) + args)
+                return
+            except OSError:
+                self._waiting.pop(seq, None)
+        callback(False)
+
+    def _request(self, kind: str, *args) -> bool:
+        # 허브에 묻고 답을 기다림(같은 머신의 파이프라 왕복은 매우 짧음)
+        event = threading.Event()
+        slot = [False]
+
+        def done(ok: bool) -> None:
+            slot[0] = ok
+            event.set()
+
+        self._request_async(kind, done, *args)
+        event.wait(self.REPLY_TIMEOUT_SEC + 1.0)  # 시간 초과도 수신 스레드가 done(False)로 알려 줌
+        return slot[0]
+
+    def _expire(self) -> None:
+        # 마감이 지난 요청은 실패로 끝냄(수신 스레드에서 주기적으로)
+        now = time.monotonic()
+        with self._send_lock:
+            expired = [seq for seq, (deadline, _) in self._waiting.items() if deadline <= now]
+            callbacks = [self._waiting.pop(seq)[1] for seq in expired]
+        for callback in callbacks:
+            callback(False)
+
+    def claim(self, name: str) -> bool:
+        # 클러스터 전체에서 닉네임 선점. 다른 워커가 쓰는 중이면 False
+        return self._request('claim', name)
+
+    def claim_async(self, name: str, callback: Callable[[bool], None]) -> None:
+        self._request_async('claim', callback, name)
+
+    def release(self, name: str) -> None:
+        self._send(('release', name))
+
+    def publish(self, room_name: Optional[str], msg: Message) -> None:
+        # 다른 워커들의 같은 방에도 방송(room_name이 None이면 모든 방)
+        self._send(('publish', room_name, msg))
+
+    def whisper(self, name: str, msg: Message) -> bool:
+        # 다른 워커에 접속한 사용자에게 귓속말. 대상이 없으면 False
+        return self._request('whisper', name, msg)
+
+    def whisper_async(self, name: str, msg: Message, callback: Callable[[bool], None]) -> None:
+        self._request_async('whisper', callback, name, msg)
+
+    # ---------- 허브 → 워커 ----------
+
+    def _reader_loop(self) -> None:
+        next_expire = time.monotonic() + 1.0
+        while True:
+            try:
+                msg = self._conn.recv() if self._conn.poll(1.0) else None  # 조용해도 1초마다 깸
+            except (EOFError, OSError):
+                # 허브(메인 프로세스)가 사라짐: 닉네임 중복 검사를 못 하므로 이 워커도 정리하고 종료
+                os.kill(os.getpid(), signal.SIGINT)
+                break
+            if time.monotonic() >= next_expire:
+                self._expire()  # 답이 없는 요청 정리
+                next_expire = time.monotonic() + 1.0
+            if msg is None:
+                continue
+            kind = msg[0]
+            if kind == 'reply':
+                _, seq, ok = msg
+                with self._send_lock:
+                    slot = self._waiting.pop(seq, None)
+                if slot is not None:
+                    slot[1](ok)
+            elif kind == 'publish':
+                self._server._on_remote_publish(msg[1], msg[2])
+            elif kind == 'deliver':
+                self._server._on_remote_deliver(msg[1], msg[2])
+
+
+def _hub_loop(conns: List[Connection]) -> None:
+    # 메인 프로세스의 허브: 모든 워커 파이프를 한 스레드에서 wait()로 다중화
+    alive: Dict[Connection, int] = {conn: i for i, conn in enumerate(conns)}
+    by_id: Dict[int, Connection] = {i: conn for conn, i in alive.items()}
+    owner: Dict[str, int] = {}  # 닉네임 → 워커 번호
+
+    def send(wid: int, msg: tuple) -> None:
+        conn = by_id.get(wid)
+        if conn is None:
+            return
+        try:
+            conn.send(msg)
+        except OSError:
+            pass
+
+    while alive:
+        for conn in wait(list(alive)):
+            wid = alive[conn]
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                # 워커 종료: 그 워커가 갖고 있던 닉네임을 모두 풀어 줌
+                del alive[conn]
+                by_id.pop(wid, None)
+                for name in [n for n, w in owner.items() if w == wid]:
+                    del owner[name]
+                continue
+
+            kind = msg[0]
+            if kind == 'claim':
+                _, seq, name = msg
+                ok = name not in owner
+                if ok:
+                    owner[name] = wid
+                send(wid, ('reply', seq, ok))
+            elif kind == 'release':
+                if owner.get(msg[1]) == wid:
+                    del owner[msg[1]]
+            elif kind == 'publish':
+                for other in list(by_id):
+                    if other != wid:
+                        send(other, msg)
+            elif kind == 'whisper':
+                _, seq, name, payload = msg
+                target = owner.get(name)
+                if target is not None:
+                    send(target, ('deliver', name, payload))
+                send(wid, ('reply', seq, target is not None))
+
+
+def _worker_main(conn: Connection, inherited: List[Connection], index: int, engine: str,
+                 host: str, port: int, metrics_port: Optional[int], kwargs: dict) -> None:
+    from metrics import serve_metrics
+    from server import ENGINES  # 순환 import 방지(server.py의 main이 이 모듈을 부름)
+
+    # fork로 함께 복사된 허브 쪽 파이프 끝은 닫아야, 허브가 죽었을 때 EOF를 받을 수 있음
+    for hub_end in inherited:
+        hub_end.close()
+
+    if kwargs.get('history_dir'):
+        # 같은 디렉터리에 여러 워커가 쓰지 않도록 워커별 하위 디렉터리
+        kwargs = dict(kwargs, history_dir=os.path.join(kwargs['history_dir'], f'worker{index}'))
+
+    bus = ClusterBus(conn)
+    server = ENGINES[engine](host, port, reuse_port=True, bus=bus, **kwargs)
+    bus.start(server)
+    if metrics_port is not None:
+        serve_metrics(server.metrics, host, metrics_port + index)  # 워커마다 다른 포트
+    server.serve_forever()
+
+
+def run_cluster(workers: int, engine: str, host: str, port: int,
+                metrics_port: Optional[int] = None, **kwargs) -> None:
+    # 워커 프로세스 N개를 띄우고 메인 프로세스는 허브 역할
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        raise SystemExit('[서버] 이 OS는 SO_REUSEPORT를 지원하지 않아 멀티 프로세스 모드를 쓸 수 없습니다.')
+
+    hub_ends: List[Connection] = []
+    procs: List[multiprocessing.Process] = []
+    for index in range(workers):
+        hub_end, worker_end = multiprocessing.Pipe()
+        proc = multiprocessing.Process(
+            target=_worker_main,
+            args=(worker_end, hub_ends + [hub_end], index, engine, host, port, metrics_port, kwargs),
+            daemon=True,
+        )
+        proc.start()
+        worker_end.close()  # 부모 쪽 사본은 닫아야 워커 종료 시 EOF를 받음
+        hub_ends.append(hub_end)
+        procs.append(proc)
+
+    print(f'[서버] 워커 {workers}개 실행(SO_REUSEPORT, {engine} 엔진)')
+    # kill(SIGTERM)로 종료해도 finally에서 워커를 정리하도록 SystemExit로 바꿈
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        _hub_loop(hub_ends)
+    except KeyboardInterrupt:
+        pass  # 워커들도 같은 Ctrl+C를 받아 각자 정리함
+    finally:
+        for conn in hub_ends:
+            conn.close()  # 워커 쪽 수신 스레드가 EOF를 보고 스스로 종료
+        for proc in procs:
+            proc.join(timeout=2)
+            if proc.is_alive():
+                proc.terminate()
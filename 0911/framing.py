@@ -0,0 +1,121 @@
+import struct
+from typing import List, Optional, Tuple
+
+# 이진 프레이밍 모드(텍스트 줄 프로토콜과 함께 지원)
+#  - 클라이언트가 접속 직후 MAGIC을 먼저 보내면 그 연결은 이진 모드(텍스트 닉네임은 NUL로 시작할 수 없음)
+#  - 이후 양방향 모두 프레임 단위: [종류 1B][본문 길이 4B] + 본문
+#  - 본문은 디코딩하지 않은 바이트 그대로라 줄바꿈이 들어 있어도 됨
+#
+# 종류별 본문
+#   클라이언트 → 서버: SYSTEM = 첫 프레임은 닉네임, 이후는 명령(/join 방이름 등)
+#                      CHAT = 메시지, WHISPER = [대상 길이 1B] + 대상 닉네임 + 메시지
+#   서버 → 클라이언트: SYSTEM = 안내/오류 문구
+#                      CHAT, WHISPER = [보낸 사람 길이 1B] + 보낸 사람 닉네임 + 메시지
+#   양방향: PING = 빈 본문. 서버가 보내면 클라이언트는 같은 PING 프레임으로 응답
+#
+# 텍스트 모드의 하트비트는 서버가 PING_LINE 한 줄을 보내고 클라이언트가 PONG_LINE으로 응답
+
+MAGIC = b'\x00CHB1'
+HEADER = struct.Struct('>BI')
+MAX_FRAME_BYTES = 1024 * 1024  # 이보다 큰 프레임은 프로토콜 위반으로 보고 연결을 끊음
+
+CHAT = 1
+WHISPER = 2
+SYSTEM = 3
+PING = 4
+
+PING_LINE = 'PING'
+PONG_LINE = '/pong'
+
+
+class FrameError(ValueError):
+    pass
+
+
+def pack_frame(kind: int, payload: bytes) -> bytes:
+    return HEADER.pack(kind, len(payload)) + payload
+
+
+def pack_sender(name: bytes, body: bytes) -> bytes:
+    # CHAT/WHISPER 본문: 닉네임(길이 1B 접두) + 메시지
+    return bytes((len(name),)) + name + body
+
+
+def split_sender(payload: bytes) -> Tuple[bytes, bytes]:
+    # pack_sender의 반대. 형식이 깨졌으면 빈 닉네임으로 봄
+    if not payload or payload[0] + 1 > len(payload):
+        return b'', payload
+    end = payload[0] + 1
+    return payload[1:end], payload[end:]
+
+
+def parse_frames(buf: bytearray, max_bytes: int = MAX_FRAME_BYTES) -> Tuple[List[Tuple[int, bytes]], int]:
+    # 이벤트 루프용: 수신 버퍼에서 완성된 프레임들과 소비한 바이트 수 반환(미완성 꼬리는 남김)
+    frames: List[Tuple[int, bytes]] = []
+    pos = 0
+    end = len(buf)
+    with memoryview(buf) as view:  # 슬라이스마다 bytearray를 새로 만들지 않도록
+        while end - pos >= HEADER.size:
+            kind, length = HEADER.unpack_from(view, pos)
+            if length > max_bytes:
+                raise FrameError(f'프레임이 너무 큼: {length}바이트')
+            start = pos + HEADER.size
+            if end - start < length:
+                break
+            frames.append((kind, bytes(view[start:start + length])))
+            pos = start + length
+    return frames, pos
+
+
+def read_frame(file_obj, max_bytes: int = MAX_FRAME_BYTES) -> Optional[Tuple[int, bytes]]:
+    # 스레드 엔진/클라이언트용: makefile('rb') 객체에서 프레임 하나를 읽음(연결 종료 시 None)
+    header = file_obj.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    kind, length = HEADER.unpack(header)
+    if length > max_bytes:
+        raise FrameError(f'프레임이 너무 큼: {length}바이트')
+    payload = file_obj.read(length)
+    if len(payload) < length:
+        return None
+    return kind, payload
+
+
+class Message:
+    # 서버가 내보내는 메시지 하나. 텍스트 줄/이진 프레임 인코딩을 각각 처음 필요할 때 한 번만 만들고
+    # 같은 bytes 객체를 모든 수신자가 공유(방송 대상에 이진 클라이언트가 없으면 프레임은 만들지 않음)
+    __slots__ = ('kind', 'body', 'sender', '_line', '_frame')
+
+    def __init__(self, kind: int, body: bytes, sender: bytes = b'') -> None:
+        self.kind = kind
+        self.body = body        # 디코딩하지 않은 메시지 본문
+        self.sender = sender    # CHAT/WHISPER의 보낸 사람 닉네임(UTF-8)
+        self._line: Optional[bytes] = None
+        self._frame: Optional[bytes] = None
+
+    @classmethod
+    def system(cls, text: str) -> 'Message':
+        return cls(SYSTEM, text.encode('utf-8', errors='ignore'))
+
+    def line(self) -> bytes:
+        # 텍스트 프로토콜 클라이언트용 한 줄(본문의 줄바꿈은 공백으로 바꿔 줄 경계를 지킴)
+        if self._line is None:
+            if self.kind == SYSTEM:
+                self._line = self.body + b'\n'
+            else:
+                prefix = '(귓속말)'.encode('utf-8') if self.kind == WHISPER else b''
+                self._line = prefix + self.sender + b'> ' + self.body.replace(b'\n', b' ') + b'\n'
+        return self._line
+
+    def frame(self) -> bytes:
+        # 이진 모드 클라이언트용 프레임
+        if self._frame is None:
+            if self.kind == SYSTEM:
+                self._frame = pack_frame(SYSTEM, self.body)
+            else:
+                self._frame = pack_frame(self.kind, pack_sender(self.sender, self.body))
+        return self._frame
+
+    def __reduce__(self):
+        # 워커 간 버스로 보낼 때 캐시된 인코딩은 빼고 보냄
+        return Message, (self.kind, self.body, self.sender)
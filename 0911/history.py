@@ -0,0 +1,236 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Tuple
+
+# 방 대화 기록: 추가만 하는(append-only) 세그먼트 로그 + 방별 최근 메시지 링 버퍼
+#  - _broadcast는 append()로 링 버퍼와 쓰기 대기열에 넣기만 함(디스크 I/O 없음, 잠깐 잡는 락 하나)
+#  - 백그라운드 writer 스레드가 모아서 쓰고, fsync는 fsync_interval마다 한 번
+#  - 세그먼트가 segment_bytes를 넘으면 다음 번호 파일로 교체(00000001.log, 00000002.log, ...)
+#  - 링 버퍼는 입장(recent) 때 처음 만들고, 그 전의 과거(재시작 이전 등)는 세그먼트를 mmap으로 읽어 채움
+#    → 디스크를 읽는 일은 입장 경로에서만. 링을 둔 방은 최근에 쓴 max_rooms개까지(LRU)
+#
+# 레코드 형식: [본문 길이 4B][시각 8B(double)][방 이름 길이 2B] + 방 이름 + 본문(인코딩된 줄)
+
+HEADER = struct.Struct('>IdH')
+SEGMENT_SUFFIX = '.log'
+SNAPSHOT_TIMEOUT_SEC = 5.0  # 입장 때 writer가 밀린 기록을 다 쓸 때까지 기다리는 최대 시간
+
+
+class _Ring:
+    # 방 하나의 최근 줄들. ready 전에는 "이 링을 만든 뒤에 들어온 줄"만 있음(과거는 채우는 중)
+    __slots__ = ('lines', 'ready')
+
+    def __init__(self, size: int) -> None:
+        self.lines: Deque[bytes] = deque(maxlen=size)
+        self.ready = threading.Event()
+
+
+class _Snapshot:
+    # 쓰기 대기열에 넣는 표식: writer가 여기까지 쓰고 나서 그 시점의 (세그먼트 번호, 파일 끝)을 알려 줌
+    __slots__ = ('seq', 'offset', 'done')
+
+    def __init__(self) -> None:
+        self.seq: Optional[int] = None
+        self.offset = 0
+        self.done = threading.Event()
+
+
+class HistoryLog:
+    def __init__(self, directory: str, ring_size: int = 100,
+                 segment_bytes: int = 8 * 1024 * 1024, fsync_interval: float = 1.0,
+                 max_rooms: int = 1024) -> None:
+        self.directory = directory
+        self.ring_size = ring_size
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.max_rooms = max_rooms
+        os.makedirs(directory, exist_ok=True)
+
+        self._rings: 'OrderedDict[str, _Ring]' = OrderedDict()  # 방 이름 → 최근 줄들(LRU)
+        self._ring_lock = threading.Lock()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()  # 기록 튜플, _Snapshot, None(종료)
+
+        segments = self._segments()
+        self._seq = segments[-1][0] if segments else 1
+        self._file = open(self._segment_path(self._seq), 'ab')
+        self._size = self._file.tell()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
+    # ---------- 세그먼트 파일 ----------
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f'{seq:08d}{SEGMENT_SUFFIX}')
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        # (번호, 경로) 목록, 오래된 것부터
+        found = []
+        for name in os.listdir(self.directory):
+            stem, ext = os.path.splitext(name)
+            if ext == SEGMENT_SUFFIX and stem.isdigit():
+                found.append((int(stem), os.path.join(self.directory, name)))
+        return sorted(found)
+
+    # ---------- 기록(메시지 경로) ----------
+
+    def append(self, room: str, data: bytes) -> None:
+        # 방송 경로에서 호출: 메모리 작업만 하고 바로 반환(링이 없는 방은 대기열에만)
+        # 링 추가와 대기열 넣기를 같은 락 안에서 해야 _snapshot 표식과 순서가 맞음
+        with self._ring_lock:
+            ring = self._rings.get(room)
+            if ring is not None:
+                ring.lines.append(data)
+            self._queue.put((time.time(), room, data))
+
+    # ---------- 백그라운드 writer ----------
+
+    def _writer_loop(self) -> None:
+        last_sync = time.monotonic()
+        dirty = False
+        while True:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                item = ()  # 한가할 때도 밀린 fsync는 처리
+            batch = [item] if item else []
+            # 쌓여 있는 것은 한 번에 모아서 씀
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = item is None or any(record is None for record in batch)
+            for record in batch:
+                if isinstance(record, _Snapshot):
+                    self._file.flush()  # 여기까지 쓴 것이 mmap으로 읽는 쪽에 보이도록
+                    record.seq, record.offset = self._seq, self._size
+                    record.done.set()
+                elif record:
+                    self._write_record(*record)
+                    dirty = True
+                    if self._size >= self.segment_bytes:
+                        self._rotate()  # 이전 세그먼트는 fsync 후 닫힘
+                        last_sync = time.monotonic()
+                        dirty = False
+            if dirty:
+                self._file.flush()  # OS로 넘김(mmap으로 읽는 쪽에서 보이도록)
+                now = time.monotonic()
+                if stop or now - last_sync >= self.fsync_interval:
+                    os.fsync(self._file.fileno())
+                    last_sync = now
+                    dirty = False
+            if stop:
+                self._file.close()
+                return
+
+    def _write_record(self, ts: float, room: str, data: bytes) -> None:
+        room_bytes = room.encode('utf-8')
+        self._file.write(HEADER.pack(len(data), ts, len(room_bytes)))
+        self._file.write(room_bytes)
+        self._file.write(data)
+        self._size += HEADER.size + len(room_bytes) + len(data)
+
+    def _rotate(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._seq += 1
+        self._file = open(self._segment_path(self._seq), 'ab')
+        self._size = 0
+
+    def close(self) -> None:
+        # 남은 기록을 모두 쓰고 fsync한 뒤 writer 종료
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+
+    # ---------- 재생(읽기) ----------
+
+    def recent(self, room: str, n: int) -> List[bytes]:
+        # 방의 최근 n줄(오래된 것부터). 입장 경로에서 호출: 처음 보는 방이면 로그를 읽어 링을 채움
+        # 링 버퍼보다 많이 원하면 로그에서 읽음
+        if n <= 0:
+            return []
+        if n > self.ring_size:
+            snapshot = self._snapshot()
+            return self._read_back(room, n, snapshot.seq, snapshot.offset)
+        with self._ring_lock:
+            ring = self._rings.get(room)
+            if ring is not None:
+                self._rings.move_to_end(room)
+                loader = False
+            else:
+                # 링을 먼저 만들고 표식을 넣음: 이후의 append는 링에, 이전 것은 표식 앞이라 로그에 들어감
+                ring = self._rings[room] = _Ring(self.ring_size)
+                while len(self._rings) > self.max_rooms:
+                    self._rings.popitem(last=False)
+                snapshot = _Snapshot()
+                self._queue.put(snapshot)
+                loader = True
+        if loader:
+            self._fill(ring, room, snapshot)
+        else:
+            ring.ready.wait(SNAPSHOT_TIMEOUT_SEC)  # 다른 입장 요청이 채우는 중
+        with self._ring_lock:
+            return list(ring.lines)[-n:]
+
+    def _fill(self, ring: _Ring, room: str, snapshot: _Snapshot) -> None:
+        # 표식 시점까지 로그에 있는 과거 + 링을 만든 뒤 들어온 줄(겹치지 않음)
+        snapshot.done.wait(SNAPSHOT_TIMEOUT_SEC)  # writer가 멈췄으면 지금 파일에 있는 만큼
+        past = self._read_back(room, self.ring_size, snapshot.seq, snapshot.offset)
+        with self._ring_lock:
+            lines = deque(past, maxlen=self.ring_size)
+            lines.extend(ring.lines)
+            ring.lines = lines
+        ring.ready.set()
+
+    def _snapshot(self) -> _Snapshot:
+        # 지금까지 append된 기록이 모두 파일에 쓰일 때까지 기다림
+        snapshot = _Snapshot()
+        with self._ring_lock:
+            self._queue.put(snapshot)
+        snapshot.done.wait(SNAPSHOT_TIMEOUT_SEC)
+        return snapshot
+
+    def _read_back(self, room: str, n: int, upto_seq: Optional[int] = None, upto_offset: int = 0) -> List[bytes]:
+        # 최신 세그먼트부터 거꾸로 mmap해서 방의 마지막 n줄 수집
+        # upto_seq가 있으면 (세그먼트 upto_seq, 위치 upto_offset) 이후에 쓴 기록은 보지 않음
+        want = room.encode('utf-8')
+        collected: List[bytes] = []
+        for seq, path in reversed(self._segments()):
+            if upto_seq is not None and seq > upto_seq:
+                continue
+            found = _scan_segment(path, want, upto_offset if seq == upto_seq else None)
+            collected = found[-(n - len(collected)):] + collected if found else collected
+            if len(collected) >= n:
+                break
+        return collected[-n:]
+
+
+def _scan_segment(path: str, room: bytes, limit: Optional[int] = None) -> List[bytes]:
+    # 세그먼트 하나를 mmap으로 훑어 해당 방 레코드의 본문만 반환(앞에서부터). limit 바이트까지만
+    try:
+        with open(path, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return []  # 빈 파일은 mmap 불가
+    except OSError:
+        return []
+    found: List[bytes] = []
+    with mm:
+        pos = 0
+        end = len(mm) if limit is None else min(limit, len(mm))
+        while pos + HEADER.size <= end:
+            length, _, room_len = HEADER.unpack_from(mm, pos)
+            body = pos + HEADER.size + room_len
+            if body + length > end:
+                break  # 쓰는 도중인 마지막 레코드
+            if mm[pos + HEADER.size:body] == room:
+                found.append(mm[body:body + length])
+            pos = body + length
+    return found
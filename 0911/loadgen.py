@@ -0,0 +1,200 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+from framing import PING_LINE, PONG_LINE
+from server import _raise_fd_limit
+
+# 헤드리스 부하 생성기: ChatClient와 같은 줄 프로토콜(첫 줄 닉네임, \n 구분)을 쓰는
+# 가상 클라이언트 수천 개를 asyncio로 띄워 로컬 ChatServer의 처리량/지연을 측정
+#
+#   python loadgen.py --clients 2000 --senders 20 --rate 5 --duration 10
+#
+# 보내는 메시지 본문에 송신 시각(perf_counter_ns)을 넣고, 받은 쪽에서 빼서 종단 간 지연을 잼
+# (같은 프로세스 안이라 시계가 같음)
+
+MARK = 't:'  # 측정용 메시지 접두사: t:보낸사람번호:순번:송신시각ns
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    # 정렬된 값에서 p(0~1) 백분위수. 값이 없으면 0
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(p * len(sorted_values)))
+    return sorted_values[index]
+
+
+class LoadStats:
+    def __init__(self) -> None:
+        self.connect_ms: List[float] = []   # 접속~등록 완료(안내 수신)까지
+        self.latency_ms: List[float] = []   # 송신~수신 종단 간 지연
+        self.sent = 0
+        self.received = 0
+        self.failed = 0                     # 접속/등록 실패 수
+        self.measuring = False              # 워밍업 중에는 지연을 기록하지 않음
+
+    def summary(self, elapsed: float) -> Dict[str, float]:
+        conn = sorted(self.connect_ms)
+        lat = sorted(self.latency_ms)
+        return {
+            'clients_ok': len(conn),
+            'clients_failed': self.failed,
+            'connect_p50_ms': percentile(conn, 0.50),
+            'connect_p99_ms': percentile(conn, 0.99),
+            'connect_max_ms': conn[-1] if conn else 0.0,
+            'sent': self.sent,
+            'delivered': self.received,
+            'sent_per_sec': self.sent / elapsed if elapsed else 0.0,
+            'delivered_per_sec': self.received / elapsed if elapsed else 0.0,
+            'latency_p50_ms': percentile(lat, 0.50),
+            'latency_p99_ms': percentile(lat, 0.99),
+            'latency_p999_ms': percentile(lat, 0.999),
+            'latency_max_ms': lat[-1] if lat else 0.0,
+        }
+
+
+class SimClient:
+    # 가상 클라이언트 하나(입력 대신 정해진 속도로 메시지를 보냄)
+    def __init__(self, index: int, host: str, port: int, stats: LoadStats) -> None:
+        self.index = index
+        self.name = f'load{index}'
+        self.host = host
+        self.port = port
+        self.stats = stats
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    def _send_line(self, text: str) -> None:
+        # ChatClient._send_line과 같은 형식(\n으로 라인 경계)
+        self.writer.write((text + '\n').encode('utf-8', errors='ignore'))
+
+    async def connect(self, gate: asyncio.Semaphore) -> bool:
+        # 접속 + 닉네임 등록. 사용법 안내 줄이 오면 등록 완료로 봄
+        async with gate:
+            start = time.perf_counter()
+            try:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+                self._send_line(self.name)
+                while True:
+                    line = await self.reader.readline()
+                    if not line or line.startswith(b'ERROR'):
+                        raise ConnectionError(line.decode('utf-8', errors='ignore').strip())
+                    if line.startswith('안내:'.encode('utf-8')):
+                        break
+            except (OSError, ConnectionError):
+                self.stats.failed += 1
+                return False
+            self.stats.connect_ms.append((time.perf_counter() - start) * 1000)
+            return True
+
+    async def recv_loop(self) -> None:
+        # 받은 측정 메시지에서 송신 시각을 꺼내 지연 기록
+        marker = f'> {MARK}'.encode('utf-8')
+        ping = (PING_LINE + '\n').encode('utf-8')
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return
+            if line == ping:  # --idle-timeout 서버에서 보내지 않는 클라이언트가 끊기지 않도록
+                self._send_line(PONG_LINE)
+                continue
+            pos = line.find(marker)
+            if pos < 0:
+                continue  # 입장/퇴장 안내 등
+            sent_ns = int(line[pos + len(marker):].rstrip().rsplit(b':', 1)[1])
+            if self.stats.measuring:
+                self.stats.received += 1
+                self.stats.latency_ms.append((time.perf_counter_ns() - sent_ns) / 1e6)
+
+    async def send_loop(self, rate: float, until: float) -> None:
+        # 초당 rate개를 일정 간격으로 전송(밀리면 따라잡지 않고 다음 간격부터)
+        interval = 1.0 / rate
+        seq = 0
+        next_at = time.perf_counter()
+        while next_at < until:
+            self._send_line(f'{MARK}{self.index}:{seq}:{time.perf_counter_ns()}')
+            if self.stats.measuring:
+                self.stats.sent += 1
+            seq += 1
+            await self.writer.drain()
+            next_at = max(next_at + interval, time.perf_counter())
+            await asyncio.sleep(next_at - time.perf_counter())
+
+    async def close(self) -> None:
+        if self.writer is None:
+            return
+        try:
+            self._send_line('/종료')
+            await self.writer.drain()
+            self.writer.close()
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, float]:
+    stats = LoadStats()
+    clients = [SimClient(i, args.host, args.port, stats) for i in range(args.clients)]
+
+    # 1) 접속(동시 접속 시도 수 제한: SYN 대기열 폭주 방지)
+    gate = asyncio.Semaphore(args.connect_concurrency)
+    results = await asyncio.gather(*(c.connect(gate) for c in clients))
+    live = [c for c, ok in zip(clients, results) if ok]
+    receivers = [asyncio.create_task(c.recv_loop()) for c in live]
+
+    # 2) 워밍업 후 측정 구간
+    senders = live[:args.senders]
+    start = time.perf_counter()
+    until = start + args.warmup + args.duration
+    send_tasks = [asyncio.create_task(c.send_loop(args.rate, until)) for c in senders]
+    await asyncio.sleep(args.warmup)
+    stats.measuring = True
+    measure_start = time.perf_counter()
+    await asyncio.gather(*send_tasks)
+    await asyncio.sleep(args.drain)  # 아직 오는 중인 메시지 기다림
+    stats.measuring = False
+    elapsed = time.perf_counter() - measure_start
+
+    # 3) 정리
+    for task in receivers:
+        task.cancel()
+    await asyncio.gather(*(c.close() for c in live), return_exceptions=True)
+    return stats.summary(elapsed)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='채팅 서버 부하 생성/지연 측정기')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--clients', type=int, default=1000, help='가상 클라이언트 수')
+    parser.add_argument('--senders', type=int, default=10, help='그중 메시지를 보내는 클라이언트 수')
+    parser.add_argument('--rate', type=float, default=5.0, help='보내는 클라이언트 하나당 초당 메시지 수')
+    parser.add_argument('--duration', type=float, default=10.0, help='측정 시간(초)')
+    parser.add_argument('--warmup', type=float, default=1.0, help='측정 전 워밍업(초)')
+    parser.add_argument('--drain', type=float, default=1.0, help='송신 종료 후 수신 대기(초)')
+    parser.add_argument('--connect-concurrency', type=int, default=200, help='동시에 진행할 접속 수')
+    parser.add_argument('--json', default=None, help='결과를 JSON으로 저장할 경로')
+    parser.add_argument('--max-p99-ms', type=float, default=None,
+                        help='지연 p99가 이 값을 넘으면 종료 코드 1(배포 전 회귀 검사용)')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    _raise_fd_limit()  # 클라이언트 수천 개 = 소켓 수천 개
+    summary = asyncio.run(run_load(args))
+    for key, value in summary.items():
+        print(f'{key:>20}: {value:,.3f}' if isinstance(value, float) else f'{key:>20}: {value:,}')
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    if args.max_p99_ms is not None and summary['latency_p99_ms'] > args.max_p99_ms:
+        print(f'[실패] 지연 p99 {summary["latency_p99_ms"]:.3f}ms > 기준 {args.max_p99_ms}ms', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
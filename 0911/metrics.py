@@ -0,0 +1,160 @@
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Sequence
+
+# 채팅 서버 계측(카운터/게이지/히스토그램)과 Prometheus 텍스트 형식 노출
+# 메시지 경로에서는 정수 덧셈/리스트 인덱스 증가만 하고, 문자열 만들기는 수집(scrape) 때만 함
+# 카운터는 락 없이 += 하므로 여러 스레드가 동시에 올리면 드물게 몇 개 빠질 수 있음(관측용으로 충분)
+
+# 기본 히스토그램 구간(초): 수십 µs ~ 1초
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+class Counter:
+    __slots__ = ('name', 'help', 'value')
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def render(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter',
+                f'{self.name} {self.value}']
+
+
+class Gauge:
+    # 값을 따로 저장하지 않고 수집할 때 콜백으로 읽음(예: 현재 접속자 수)
+    __slots__ = ('name', 'help', 'read')
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]) -> None:
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def render(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} gauge',
+                f'{self.name} {self.read()}']
+
+
+class Histogram:
+    __slots__ = ('name', 'help', 'bounds', 'counts', 'sum')
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # 마지막 칸 = +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f'{self.name}_sum {self.sum}')
+        lines.append(f'{self.name}_count {cumulative}')
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list = []
+
+    def counter(self, name: str, help: str) -> Counter:
+        metric = Counter(name, help)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+        metric = Gauge(name, help, read)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class ChatMetrics(Registry):
+    # ChatServer가 메시지 경로에서 올리는 지표 모음
+    def __init__(self) -> None:
+        super().__init__()
+        self.connections = self.counter('chat_connections_total', '수락한 TCP 연결 수')
+        self.bytes_in = self.counter('chat_bytes_in_total', '클라이언트에게서 받은 바이트')
+        self.bytes_out = self.counter('chat_bytes_out_total', '클라이언트에게 보낸 바이트')
+        self.write_calls = self.counter('chat_write_syscalls_total', '송신 시스템 콜(sendmsg/sendall) 횟수')
+        self.messages_in = self.counter('chat_messages_in_total', '받은 줄(명령 포함) 수')
+        self.deliveries = self.counter('chat_deliveries_total', '송신 대기열에 넣은 메시지 수(방송 팬아웃 포함)')
+        self.send_failures = self.counter('chat_send_failures_total', '송신 오류로 정리한 연결 수')
+        self.slow_disconnects = self.counter('chat_slow_consumer_disconnects_total',
+                                             '대기열이 넘쳐(disconnect 정책) 끊은 연결 수')
+        self.pings_sent = self.counter('chat_pings_sent_total', '조용한 연결에 보낸 하트비트 PING 수')
+        self.idle_reaped = self.counter('chat_idle_reaped_total', 'PING에도 응답이 없어 유휴 시간 초과로 끊은 연결 수')
+        self.throttled = self.counter('chat_throttled_messages_total',
+                                      '속도 제한에 걸려 다음 메시지 읽기를 미룬 횟수(연결/방 토큰 버킷)')
+        self.fanout_seconds = self.histogram('chat_broadcast_fanout_seconds', '방송 한 번을 대기열에 넣는 데 걸린 시간')
+        self.lock_wait_seconds = self.histogram('chat_lock_wait_seconds', '전역 _lock 획득 대기 시간')
+
+
+class TimedLock:
+    # threading.Lock과 같은 with 사용법 + 획득까지 기다린 시간을 히스토그램에 기록
+    def __init__(self, wait_hist: Histogram) -> None:
+        self._lock = threading.Lock()
+        self._wait_hist = wait_hist
+
+    def __enter__(self) -> 'TimedLock':
+        if not self._lock.acquire(blocking=False):
+            # 경합이 있을 때만 시간을 잼(경합 없는 경우는 0으로 기록)
+            start = time.perf_counter()
+            self._lock.acquire()
+            self._wait_hist.observe(time.perf_counter() - start)
+        else:
+            self._wait_hist.observe(0.0)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._lock.release()
+
+
+def serve_metrics(registry: Registry, host: str, port: int) -> ThreadingHTTPServer:
+    # 별도 포트에서 GET /metrics 로 Prometheus 텍스트 형식 응답(데몬 스레드)
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            return  # 수집 요청마다 로그가 찍히지 않도록
+
+    httpd = ThreadingHTTPServer((host, port), MetricsHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+# 큐가 가득 찼을 때의 정책
+DROP_OLDEST = 'drop-oldest'  # 가장 오래된 메시지를 버리고 새 메시지를 넣음
+DISCONNECT = 'disconnect'    # 못 따라오는 느린 소비자의 연결을 끊음
+OVERFLOW_POLICIES = (DROP_OLDEST, DISCONNECT)
+
+# writev(sendmsg)에 한 번에 넘길 버퍼 수 상한(리눅스 IOV_MAX=1024보다 넉넉히 작게)
+MAX_BATCH_ITEMS = 512
+
+
+class Outbox:
+    # 연결 하나의 송신 대기열(크기 제한 있음)
+    # 브로드캐스트하는 쪽은 put()으로 넣기만 하고, 실제 송신은 그 연결 전담 writer가 함
+    # → 느린 수신자 하나가 다른 사람이나 보낸 사람의 수신 루프를 붙잡지 않음
+
+    def __init__(self, maxlen: int = 256, policy: str = DROP_OLDEST) -> None:
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f'알 수 없는 overflow 정책: {policy}')
+        self.maxlen = maxlen
+        self.policy = policy
+        self.dropped = 0     # drop-oldest로 버린 메시지 수
+        self.nbytes = 0      # 대기 중인 바이트 수(묶어 보내기 판단용)
+        self.closed = False
+        self._items: Deque[bytes] = deque()
+        self._cond = threading.Condition(threading.Lock())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, data: bytes) -> bool:
+        # 송신 대기열에 추가. disconnect 정책에서 넘치면 False(호출 측이 연결을 끊어야 함)
+        with self._cond:
+            if self.closed:
+                return True  # 이미 닫힌 연결에는 조용히 무시
+            if len(self._items) >= self.maxlen:
+                if self.policy == DISCONNECT:
+                    return False
+                self.nbytes -= len(self._items.popleft())
+                self.dropped += 1
+            self._items.append(data)
+            self.nbytes += len(data)
+            self._cond.notify()
+        return True
+
+    def _take(self, max_bytes: int) -> List[bytes]:
+        # 앞에서부터 max_bytes까지(최소 1개) 꺼냄. _cond를 잡은 상태에서 호출
+        batch: List[bytes] = []
+        size = 0
+        while self._items and len(batch) < MAX_BATCH_ITEMS:
+            if batch and size + len(self._items[0]) > max_bytes:
+                break
+            data = self._items.popleft()
+            batch.append(data)
+            size += len(data)
+        self.nbytes -= size
+        return batch
+
+    def get_batch(self, max_bytes: int, window_sec: float = 0.0) -> List[bytes]:
+        # writer 스레드용: 첫 메시지가 올 때까지 대기한 뒤,
+        # window_sec 동안(또는 max_bytes가 찰 때까지) 더 모아서 한 번에 꺼냄
+        # 닫히고 비었으면 빈 리스트
+        with self._cond:
+            while not self._items and not self.closed:
+                self._cond.wait()
+            if window_sec > 0 and not self.closed:
+                deadline = time.monotonic() + window_sec
+                while self.nbytes < max_bytes and not self.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            return self._take(max_bytes)
+
+    def get_batch_nowait(self, max_bytes: int) -> List[bytes]:
+        # 이벤트 루프용: 기다리지 않고 지금 쌓인 것을 max_bytes까지 꺼냄(없으면 빈 리스트)
+        with self._cond:
+            return self._take(max_bytes)
+
+    def close(self) -> None:
+        # 더 이상 넣지 않음 + 대기 중인 writer를 깨움
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
@@ -0,0 +1,29 @@
+import threading
+import time
+from typing import Optional
+
+# 토큰 버킷 속도 제한: 초당 rate개씩 채워지고 최대 burst개까지 쌓임
+# 채우기는 따로 타이머 없이 꺼낼 때 monotonic 시계로 지난 시간만큼 계산(연결 수만 개여도 비용 없음)
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'burst', '_tokens', '_stamp', '_lock')
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()  # 방 버킷은 여러 연결(스레드)이 함께 씀
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        # 토큰 하나를 예약하고, 그 토큰이 생길 때까지 기다려야 할 시간(초) 반환(0이면 바로 처리)
+        # 모자라면 빚(음수)으로 달아 둠 → 다시 물어볼 필요 없이 반환된 시간만큼 기다렸다가 처리하면 됨
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            elapsed = max(0.0, now - self._stamp)
+            self._stamp = max(self._stamp, now)
+            tokens = min(self.burst, self._tokens + elapsed * self.rate) - 1
+            self._tokens = tokens
+        return 0.0 if tokens >= 0 else -tokens / self.rate
@@ -0,0 +1,77 @@
+import socket
+import threading
+from typing import Callable, Dict, List, Optional
+
+from ratelimit import TokenBucket
+
+DEFAULT_ROOM = 'lobby'  # 접속 직후 들어가는 기본 방
+
+
+def is_valid_room_name(name: str) -> bool:
+    # 닉네임과 같은 규칙: 비어 있지 않고, 공백 없이, 20자 이하
+    return bool(name) and ' ' not in name and len(name) <= 20
+
+
+class Room:
+    # 방 하나. 멤버 변경/조회는 이 방의 락만 사용(다른 방과 경쟁하지 않음)
+    def __init__(self, name: str, limiter: Optional[TokenBucket] = None) -> None:
+        self.name = name
+        self.limiter = limiter  # 방 전체 메시지 속도 제한(없으면 None)
+        self.lock = threading.Lock()
+        self.members: Dict[socket.socket, str] = {}  # 소켓 → 닉네임
+        self.closed = False  # 비어서 목록에서 빠진 방(새로 들어오면 안 됨)
+
+    def snapshot(self) -> List[socket.socket]:
+        # 방송용 멤버 목록 복사본(락은 복사하는 동안만)
+        with self.lock:
+            return list(self.members)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+
+class RoomRegistry:
+    # 방 이름 → Room
+    # 전역 락(_lock)은 방을 만들거나 없앨 때만 잡고, 입장/퇴장/방송은 방별 락으로 처리
+    def __init__(self, make_limiter: Optional[Callable[[], TokenBucket]] = None) -> None:
+        self._lock = threading.Lock()
+        self._make_limiter = make_limiter  # 방을 만들 때마다 새 속도 제한 버킷을 만드는 함수
+        self._rooms: Dict[str, Room] = {DEFAULT_ROOM: self._new_room(DEFAULT_ROOM)}
+
+    def _new_room(self, name: str) -> Room:
+        return Room(name, self._make_limiter() if self._make_limiter is not None else None)
+
+    def get(self, name: str) -> Optional[Room]:
+        return self._rooms.get(name)
+
+    def snapshot(self) -> List[Room]:
+        with self._lock:
+            return list(self._rooms.values())
+
+    def join(self, name: str, sock: socket.socket, nickname: str) -> Room:
+        # 방에 들어감(없으면 생성)
+        while True:
+            room = self._rooms.get(name)
+            if room is None:
+                with self._lock:
+                    room = self._rooms.get(name)
+                    if room is None:
+                        room = self._rooms[name] = self._new_room(name)
+            with room.lock:
+                if not room.closed:
+                    room.members[sock] = nickname
+                    return room
+            # 방금 비어서 닫힌 방을 잡은 경우: 새 방으로 다시 시도
+
+    def leave(self, room: Room, sock: socket.socket) -> None:
+        # 방에서 나감. 기본 방이 아닌데 비게 되면 목록에서 제거
+        with room.lock:
+            room.members.pop(sock, None)
+            empty = not room.members
+        if empty and room.name != DEFAULT_ROOM:
+            with self._lock:
+                with room.lock:
+                    # 락을 다시 잡는 사이 누가 들어왔을 수 있으니 재확인
+                    if not room.members and self._rooms.get(room.name) is room:
+                        room.closed = True
+                        del self._rooms[room.name]
@@ -1,80 +1,381 @@
 import argparse
+import heapq
+import itertools
+import selectors
 import socket
 import threading
-from typing import Dict, Optional
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from framing import CHAT, HEADER, MAGIC, PING, PING_LINE, PONG_LINE, SYSTEM, WHISPER, FrameError, Message, pack_frame, parse_frames, read_frame, split_sender
+from history import HistoryLog
+from metrics import ChatMetrics, TimedLock, serve_metrics
+from outbox import DROP_OLDEST, OVERFLOW_POLICIES, Outbox
+from ratelimit import TokenBucket
+from rooms import DEFAULT_ROOM, Room, RoomRegistry, is_valid_room_name
+from timerwheel import TimerWheel
 
 
 class ChatServer:
-    def __init__(self, host: str, port: int) -> None:
+    def __init__(self, host: str, port: int,
+                 outbox_size: int = 256, overflow: str = DROP_OLDEST,
+                 reuse_port: bool = False, bus=None,
+                 flush_ms: float = 0.0, batch_bytes: int = 64 * 1024,
+                 nodelay: bool = False, sndbuf: Optional[int] = None, cork: bool = False,
+                 history_dir: Optional[str] = None, replay: int = 20,
+                 idle_timeout: float = 0.0,
+                 rate_limit: float = 0.0, burst: int = 10,
+                 room_rate_limit: float = 0.0, room_burst: int = 50) -> None:
         self.host = host
         self.port = port
+        # 연결별 송신 대기열 설정(최대 메시지 수, 넘칠 때 정책)
+        self.outbox_size = outbox_size
+        self.overflow = overflow
+        # 묶어 보내기: 첫 줄이 쌓인 뒤 flush_ms 동안(또는 batch_bytes가 찰 때까지) 모아 writev 한 번으로 송신
+        # flush_ms=0이면 기다리지 않고 그 순간 쌓여 있는 것만 묶음(지연 상한 = flush_ms)
+        self.flush_delay = flush_ms / 1000
+        self.batch_bytes = batch_bytes
+        # 클라이언트 소켓 옵션(TCP_NODELAY: Nagle 끔, SO_SNDBUF: 커널 송신 버퍼, TCP_CORK: 묶음 단위로만 전송)
+        self.nodelay = nodelay
+        self.sndbuf = sndbuf
+        self.cork = cork and hasattr(socket, 'TCP_CORK')  # TCP_CORK는 리눅스 전용
+        # 방 대화 기록(디스크 로그 + 최근 메시지 링 버퍼). 입장 시 최근 replay줄을 다시 보여 줌
+        self._history = HistoryLog(history_dir, ring_size=max(replay, 1)) if history_dir else None
+        self.replay = replay
+        # 유휴 연결 정리: idle_timeout/2 동안 아무것도 안 보내면 PING, idle_timeout이 되도록 조용하면 끊음
+        # FIN 없이 사라진 상대(전원 차단, 네트워크 단절)의 스레드/소켓/닉네임을 회수. 0이면 끔
+        self.idle_timeout = idle_timeout
+        self._wheel = TimerWheel(tick=min(1.0, idle_timeout / 8), slots=64) if idle_timeout > 0 else None
+        self._last_seen: Dict[socket.socket, float] = {}  # 소켓 → 마지막 수신 시각(monotonic)
+        self._ping_sent: Dict[socket.socket, float] = {}  # 소켓 → 마지막 PING 시각
+        # 속도 제한(토큰 버킷): 연결마다 초당 rate_limit개(순간 burst개), 방마다 초당 room_rate_limit개
+        # 넘치면 버리지 않고 그 연결에서 다음 메시지를 읽지 않고 기다림 → 커널 수신 버퍼가 차면 TCP가 보내는 쪽을 멈춤
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self._limits: Dict[socket.socket, TokenBucket] = {}  # 소켓 → 연결별 버킷
+        # 멀티 프로세스 모드에서 다른 워커와 이어 주는 버스(cluster.ClusterBus). 단일 프로세스면 None
+        self._bus = bus
         # 수신용 리스닝 소켓
         self.server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            # 여러 워커 프로세스가 같은 포트를 listen → 커널이 접속을 나눠 줌
+            self.server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.server_sock.bind((self.host, self.port))
-        self.server_sock.listen()
+        self.server_sock.listen(socket.SOMAXCONN) # 동시 접속 폭주 대비 대기열 최대로
 
-        # 연결 관리
-        self._lock = threading.Lock()
+        # 계측 지표(메시지 경로에서는 정수 증가만, 문자열 변환은 수집 시에만)
+        self.metrics = ChatMetrics()
+        # 연결 관리(닉네임 등록/해제, 귓속말 조회용 전역 락). 획득 대기 시간을 기록
+        self._lock = TimedLock(self.metrics.lock_wait_seconds)
         # 닉네임 → 소켓
         self._sock_by_name: Dict[str, socket.socket] = {}
         # 소켓 → 닉네임
         self._name_by_sock: Dict[socket.socket, str] = {}
+        # 소켓 → 송신 대기열(전담 writer 스레드가 비움)
+        self._outboxes: Dict[socket.socket, Outbox] = {}
+        # 이진 프레이밍 모드로 접속한 소켓들(나머지는 텍스트 줄 프로토콜)
+        self._binary: Set[socket.socket] = set()
+        # 방 목록(방별 락으로 샤딩) + 소켓 → 현재 방
+        room_limiter = (lambda: TokenBucket(room_rate_limit, room_burst)) if room_rate_limit > 0 else None
+        self._rooms = RoomRegistry(room_limiter)
+        self._room_by_sock: Dict[socket.socket, Room] = {}
+
+        self.metrics.gauge('chat_connected_clients', '닉네임 등록을 마친 현재 접속자 수',
+                           lambda: len(self._name_by_sock))
+        self.metrics.gauge('chat_outbox_dropped', '현재 연결들의 대기열에서 drop-oldest로 버린 메시지 수',
+                           lambda: sum(o.dropped for o in list(self._outboxes.values())))
 
     # ---------- 네트워크 유틸 ----------
 
-    @staticmethod
-    def _send_line(sock: socket.socket, text: str) -> None:
-        data = (text + '\n').encode('utf-8', errors='ignore')  # \n으로 라인 경계를 보장
-        sock.sendall(data) # sendall: 버퍼가 전부 송신될 때까지 블로킹
+    def _encode_for(self, sock: socket.socket, msg: Message) -> bytes:
+        # 연결의 프로토콜에 맞는 인코딩(메시지 객체에 캐시되므로 수신자가 많아도 한 번씩만 만듦)
+        return msg.frame() if sock in self._binary else msg.line()
 
-    @staticmethod
-    def _recv_line(file_obj) -> Optional[str]:
-        # 파일 객체에서 한 줄 수신(없으면 None). socket.makefile()로 생성된 객체 사용
-        line = file_obj.readline() # \n까지 읽음. 연결 종료 시 ''(빈 문자열) 반환
-        if not line:
-            return None    # 빈 문자열이면 연결이 끊겼다고 판단
-        return line.rstrip('\n') # 오른쪽 끝의 \n 제거(메시지 본문만 사용)
+    def _send_line(self, sock: socket.socket, text: str) -> None:
+        # 안내 한 줄을 그 연결의 송신 대기열에 넣음(실제 네트워크 I/O는 writer가 담당)
+        self._send(sock, Message.system(text))
+
+    def _send(self, sock: socket.socket, msg: Message) -> None:
+        self._enqueue(sock, self._encode_for(sock, msg))
+
+    def _enqueue(self, sock: socket.socket, data: bytes) -> None:
+        outbox = self._outboxes.get(sock)
+        if outbox is None:
+            return  # 아직 준비 전이거나 이미 정리된 연결
+        if not outbox.put(data):
+            # disconnect 정책: 대기열이 넘칠 만큼 못 따라오는 소비자는 끊음
+            self.metrics.slow_disconnects.inc()
+            self._cleanup_socket(sock)
+
+    def _tune_socket(self, sock: socket.socket) -> None:
+        # 접속한 클라이언트 소켓에 송신 관련 옵션 적용
+        if self.nodelay:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.sndbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.sndbuf)
+
+    def _writer_loop(self, sock: socket.socket, outbox: Outbox) -> None:
+        # 연결 전담 writer 스레드: 대기열에서 묶음으로 꺼내 송신(느려도 이 연결만 기다림)
+        metrics = self.metrics
+        try:
+            while True:
+                batch = outbox.get_batch(self.batch_bytes, self.flush_delay)
+                if not batch:
+                    break  # 대기열이 닫힘(연결 정리)
+                if self.cork:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 1)
+                views = [memoryview(b) for b in batch]
+                while views: # 일부만 나가면 남은 부분만 다시(블로킹 소켓이라 결국 전부 나감)
+                    sent = _sendv(sock, views)
+                    metrics.write_calls.inc()
+                    metrics.bytes_out.inc(sent)
+                    _advance(views, sent)
+                if self.cork:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 0)  # 마개를 뽑아 즉시 전송
+        except OSError:
+            if not outbox.closed:  # 이미 정리 중인 연결의 오류는 실패로 세지 않음
+                metrics.send_failures.inc()
+            self._cleanup_socket(sock)
+
+    def _recv_line(self, file_obj) -> Optional[str]:
+        # 파일 객체에서 한 줄 수신(없으면 None). socket.makefile('rb')로 생성된 객체 사용
+        raw = file_obj.readline() # \n까지 읽음. 연결 종료 시 b''(빈 바이트) 반환
+        if not raw:
+            return None    # 비어 있으면 연결이 끊겼다고 판단
+        self.metrics.bytes_in.inc(len(raw))
+        return raw.decode('utf-8', errors='ignore').rstrip('\n') # 오른쪽 끝의 \n 제거(메시지 본문만 사용)
+
+    def _recv_frame(self, file_obj) -> Optional[Tuple[int, bytes]]:
+        # 이진 모드 연결에서 프레임 하나 수신(없으면 None). 본문은 디코딩하지 않음
+        frame = read_frame(file_obj)
+        if frame is not None:
+            self.metrics.bytes_in.inc(HEADER.size + len(frame[1]))
+        return frame
+
+    # ---------- 하트비트/유휴 연결 정리 ----------
+
+    def _watch_idle(self, sock: socket.socket) -> None:
+        # 새 연결을 타이머 휠에 등록(닉네임을 안 보내고 버티는 연결도 정리 대상)
+        if self._wheel is None:
+            return
+        self._last_seen[sock] = time.monotonic()
+        self._wheel.schedule(sock, self.idle_timeout / 2)
+
+    def _touch(self, sock: socket.socket) -> None:
+        # 무엇이든 받으면 살아 있는 것: 시각만 갱신(휠은 만료 때 확인하며 다시 등록)
+        if self._wheel is not None:
+            self._last_seen[sock] = time.monotonic()
+
+    def _check_idle(self, sock: socket.socket) -> None:
+        # 휠에서 만료된 연결 확인: 그사이 활동이 있었으면 다시 등록, 조용하면 PING, 그래도 조용하면 정리
+        last = self._last_seen.get(sock)
+        if last is None:
+            return  # 이미 정리된 연결(휠에서 따로 빼지 않음)
+        now = time.monotonic()
+        idle = now - last
+        ping_after = self.idle_timeout / 2
+        if idle < ping_after:
+            self._wheel.schedule(sock, last + ping_after - now)
+            return
+        if idle < self.idle_timeout:
+            if self._ping_sent.get(sock, 0.0) <= last:  # 마지막 활동 이후 아직 안 보냄
+                self._ping_sent[sock] = now
+                self.metrics.pings_sent.inc()
+                self._send_ping(sock)
+            self._wheel.schedule(sock, last + self.idle_timeout - now)
+            return
+        self.metrics.idle_reaped.inc()
+        self._reap(sock)
+
+    def _send_ping(self, sock: socket.socket) -> None:
+        if sock in self._binary:
+            self._enqueue(sock, pack_frame(PING, b''))
+        else:
+            self._send_line(sock, PING_LINE)
+
+    def _reap(self, sock: socket.socket) -> None:
+        # 소켓을 shutdown하면 그 연결의 수신 스레드가 깨어나 퇴장 처리까지 마무리
+        self._cleanup_socket(sock)
+
+    def _run_idle_reaper(self) -> None:
+        # 스레드 엔진용: 틱마다 휠을 돌리는 데몬 스레드(만료된 칸의 연결만 확인)
+        while True:
+            time.sleep(self._wheel.tick)
+            for sock in self._wheel.advance(time.monotonic()):
+                self._check_idle(sock)
+
+    # ---------- 속도 제한 ----------
+
+    def _watch_rate(self, sock: socket.socket) -> None:
+        if self.rate_limit > 0:
+            self._limits[sock] = TokenBucket(self.rate_limit, self.burst)
+
+    def _throttle_delay(self, sock: socket.socket) -> float:
+        # 방금 처리한 메시지 몫의 토큰을 연결/방 버킷에서 하나씩 예약하고,
+        # 다음 메시지를 읽기 전에 기다려야 할 시간(초) 반환(0이면 바로 읽어도 됨)
+        now = time.monotonic()
+        wait = 0.0
+        bucket = self._limits.get(sock)
+        if bucket is not None:
+            wait = bucket.reserve(now)
+        room = self._room_by_sock.get(sock)
+        if room is not None and room.limiter is not None:
+            wait = max(wait, room.limiter.reserve(now))
+        if wait > 0:
+            self.metrics.throttled.inc()
+        return wait
 
     # ---------- 방송/귓속말 ----------
 
-    def _broadcast(self, text: str, exclude: Optional[socket.socket] = None) -> None:
-        # 모든 접속자에게 전송. exclude가 있으면 그 소켓은 제외.
-        with self._lock:
-            sockets = list(self._sock_by_name.values())
+    def _broadcast(self, text: str, exclude: Optional[socket.socket] = None,
+                   room: Optional[Room] = None) -> None:
+        # 안내 문구를 room 멤버에게 전송(room이 없으면 모든 방). exclude가 있으면 그 소켓은 제외.
+        self._publish(Message.system(text), exclude, room)
 
-        for sock in sockets: # 현재 접속 중인 모든 소켓에 대해
-            if sock is exclude: # 보낸 사람 본인은 제외
-                continue
-            try:
-                self._send_line(sock, text) # 실제 송신
-            except OSError:
-                # 송신 실패 소켓은 정리
-                self._cleanup_socket(sock)
+    def _publish(self, msg: Message, exclude: Optional[socket.socket] = None,
+                 room: Optional[Room] = None) -> None:
+        # 인코딩은 프로토콜별로 한 번만: 같은 bytes 객체(불변)를 모든 대기열이 공유
+        self._fanout(msg, exclude, room)
+        if room is not None:
+            self._record(room.name, msg.line())
+        if self._bus is not None:
+            # 다른 워커에 있는 같은 방 사람들에게도
+            self._bus.publish(room.name if room is not None else None, msg)
+
+    def _fanout(self, msg: Message, exclude: Optional[socket.socket] = None,
+                room: Optional[Room] = None) -> None:
+        # 이 프로세스에 접속한 방 멤버들의 대기열에 넣기
+        # 전역 락 대신 방별 락만 잡으므로 다른 방의 방송/입장/퇴장과 경쟁하지 않음
+        start = time.perf_counter()
+        rooms = [room] if room is not None else self._rooms.snapshot()
+        binary = self._binary
+        count = 0
+        for r in rooms:
+            for sock in r.snapshot(): # 현재 방에 있는 모든 소켓에 대해
+                if sock is exclude: # 보낸 사람 본인은 제외
+                    continue
+                # 대기열에 넣기만 함(네트워크 대기 없음)
+                self._enqueue(sock, msg.frame() if sock in binary else msg.line())
+                count += 1
+        self.metrics.deliveries.inc(count)
+        self.metrics.fanout_seconds.observe(time.perf_counter() - start)
 
-    def _whisper(self, to_name: str, text: str, sender: str) -> bool:
-        # 특정 사용자에게 귓속말. 성공 시 True.
+    def _whisper(self, sock: socket.socket, to_name: str, body: bytes, sender: str) -> None:
+        # 특정 사용자에게 귓속말. 대상이 없으면 보낸 사람(sock)에게 안내
         with self._lock:
             target = self._sock_by_name.get(to_name) # 닉네임으로 대상 소켓 조회
 
-        if target is None: # 대상 닉네임이 없으면 실패
-            return False
+        msg = Message(WHISPER, body, sender.encode('utf-8'))  # 수신자에게 귓속말 포맷으로 전송
+        if target is None: # 이 프로세스에 없으면 다른 워커에 있는지 허브에 물어봄
+            if self._bus is None:
+                self._whisper_missing(sock, to_name)
+            else:
+                self._remote_whisper(sock, to_name, msg)
+            return
 
-        try:
-            self._send_line(target, f'(귓속말){sender}> {text}')  # 수신자에게 귓속말 포맷으로 전송
-            return True
-        except OSError:
-            self._cleanup_socket(target) # 송신 실패 시 정리
-            return False
+        self._send(target, msg)
+        self.metrics.deliveries.inc()
+
+    def _remote_whisper(self, sock: socket.socket, to_name: str, msg: Message) -> None:
+        # 스레드 엔진: 허브 답을 기다려도 이 연결의 스레드만 멈춤
+        if not self._bus.whisper(to_name, msg):
+            self._whisper_missing(sock, to_name)
+
+    def _whisper_missing(self, sock: socket.socket, to_name: str) -> None:
+        self._send_line(sock, f'안내: "{to_name}" 사용자를 찾을 수 없습니다.')
+
+    # ---------- 다른 워커에서 온 메시지(버스 수신 스레드에서 호출) ----------
+
+    def _call_soon_threadsafe(self, fn: Callable, *args) -> None:
+        # 스레드 엔진은 대기열이 스레드 안전하므로 바로 실행
+        fn(*args)
+
+    def _on_remote_publish(self, room_name: Optional[str], msg: Message) -> None:
+        room = None
+        if room_name is not None:
+            self._record(room_name, msg.line())  # 워커마다 자기 로그에 전체 기록을 남김
+            room = self._rooms.get(room_name)
+            if room is None:
+                return  # 이 워커에는 그 방에 있는 사람이 없음
+        self._call_soon_threadsafe(self._fanout, msg, None, room)
+
+    def _on_remote_deliver(self, name: str, msg: Message) -> None:
+        with self._lock:
+            target = self._sock_by_name.get(name)
+        if target is not None:
+            self._call_soon_threadsafe(self._send, target, msg)
+
+    # ---------- 대화 기록 ----------
+
+    def _record(self, room_name: str, data: bytes) -> None:
+        # 방 대화를 기록(메모리에 넣기만 하고 디스크 쓰기는 백그라운드 writer가)
+        if self._history is not None:
+            self._history.append(room_name, data)
+
+    def _replay(self, sock: socket.socket, room_name: str) -> None:
+        # 방에 들어온 사람에게 최근 대화를 다시 보내 줌
+        if self._history is None or self.replay <= 0:
+            return
+        lines = self._history.recent(room_name, self.replay)
+        if not lines:
+            return
+        self._send_line(sock, f'안내: "{room_name}" 방의 최근 메시지 {len(lines)}개')
+        binary = sock in self._binary
+        for data in lines:
+            # 기록은 텍스트 줄 형식이라 이진 모드 연결에는 안내(SYSTEM) 프레임으로 감싸 보냄
+            self._enqueue(sock, Message(SYSTEM, data.rstrip(b'\n')).frame() if binary else data)
+
+    def _close_history(self) -> None:
+        if self._history is not None:
+            self._history.close()  # 남은 기록 쓰고 fsync
+
+    # ---------- 방 입장/퇴장 ----------
+
+    def _join_room(self, sock: socket.socket, name: str, room_name: str) -> None:
+        # 지금 방에서 나와 room_name 방으로 이동(각 방에 입장/퇴장 알림)
+        old = self._room_by_sock.get(sock)
+        if old is not None:
+            self._rooms.leave(old, sock)
+            self._broadcast(f'{name}님이 퇴장하셨습니다.', room=old)
+        self._replay(sock, room_name)  # 입장 알림보다 먼저 지난 대화
+        room = self._rooms.join(room_name, sock, name)
+        self._room_by_sock[sock] = room
+        self._broadcast(f'{name}님이 입장하셨습니다.', room=room)
+
+    def _farewell(self, sock: socket.socket, name: str) -> None:
+        # 연결 정리 후, 마지막으로 있던 방에 퇴장 알림
+        self._cleanup_socket(sock)
+        room = self._room_by_sock.pop(sock, None)
+        if room is not None:
+            self._broadcast(f'{name}님이 퇴장하셨습니다.', room=room)
 
     # ---------- 클라이언트 처리 ----------
 
     def _cleanup_socket(self, sock: socket.socket) -> None:
         # 소켓 연결 정리 및 사용자 목록에서 제거
+        room = self._room_by_sock.get(sock)
+        if room is not None:
+            self._rooms.leave(room, sock) # 방 멤버에서 제거(퇴장 알림은 _farewell)
         with self._lock:
             name = self._name_by_sock.pop(sock, None) # 소켓→닉네임 맵에서 제거
             if name:
                 self._sock_by_name.pop(name, None) # 닉네임→소켓 맵에서도 제거
+            outbox = self._outboxes.pop(sock, None)
+        self._binary.discard(sock)
+        self._last_seen.pop(sock, None)
+        self._ping_sent.pop(sock, None)
+        self._limits.pop(sock, None)
+        if name and self._bus is not None:
+            self._bus.release(name) # 클러스터 전체 닉네임 목록에서도 해제
+        if outbox is not None:
+            outbox.close() # 대기 중인 writer 스레드를 깨워 종료시킴
+        try:
+            # 다른 스레드의 readline()/sendall() 대기도 즉시 풀리도록 먼저 shutdown
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
         try:
             sock.close() # OS 리소스 해제
         except OSError: 
@@ -82,78 +383,183 @@ class ChatServer:
 
     def _register_name(self, sock: socket.socket, name: str) -> bool:
         # 닉네임 등록. 중복이면 False
-        if not name or ' ' in name or len(name) > 20: # 빈 문자열/공백 포함/너무 김 → 불가
+        if not self._valid_name(name):
             return False
+        if self._bus is not None and not self._bus.claim(name):
+            return False  # 다른 워커에서 이미 사용 중(허브가 클러스터 전체를 관리)
+        return self._bind_name(sock, name)
+
+    @staticmethod
+    def _valid_name(name: str) -> bool:
+        return bool(name) and ' ' not in name and len(name) <= 20 # 빈 문자열/공백 포함/너무 김 → 불가
+
+    def _bind_name(self, sock: socket.socket, name: str) -> bool:
+        # 이 프로세스의 닉네임 목록에 등록(허브 선점은 이미 끝난 상태)
         with self._lock:
             if name in self._sock_by_name:  # 중복 닉네임 방지
-                return False
-            self._sock_by_name[name] = sock # 닉네임→소켓
-            self._name_by_sock[sock] = name # 소켓→닉네임
+                bound = False
+            else:
+                self._sock_by_name[name] = sock # 닉네임→소켓
+                self._name_by_sock[sock] = name # 소켓→닉네임
+                bound = True
+        if not bound and self._bus is not None:
+            self._bus.release(name)  # 허브에서 선점한 것은 돌려놓음
+        return bound
+
+    def _welcome(self, sock: socket.socket, name: str) -> None:
+        # 기본 방 입장 알림 + 본인에게 사용법 안내
+        self._join_room(sock, name, DEFAULT_ROOM)
+        self._send_line(sock, '안내: "/종료"로 종료, "/w 대상닉 메시지"는 귓속말, '
+                              '"/join 방이름"·"/leave"로 방 이동입니다.')
+
+    def _handle_line(self, sock: socket.socket, name: str, line: str) -> bool:
+        # 한 줄(명령/일반 메시지) 처리. 세션을 끝내야 하면 False 반환
+        if line == PONG_LINE: # PING 응답(수신 시각 갱신은 이미 됨)
+            return True
+        self.metrics.messages_in.inc()
+        if line == '/종료': # 정상 종료 명령
+            return False
+
+        if line.startswith('/w '): # 귓속말 명령 처리
+            # 형식: /w 대상닉 메시지→ 3파트로 분할
+            parts = line.split(' ', 2)
+            if len(parts) < 3: # 메시지 빠진 경우 사용법 안내
+                self._send_line(sock, '안내: 사용법 -> /w 대상닉 메시지')
+                return True
+            _, to_name, message = parts
+            self._whisper(sock, to_name, message.encode('utf-8', errors='ignore'), name)  # 귓속말 시도
+            return True
+
+        current = self._room_by_sock.get(sock)
+
+        if line.startswith('/join '): # 방 이동: /join 방이름
+            room_name = line[len('/join '):].strip()
+            if not is_valid_room_name(room_name):
+                self._send_line(sock, '안내: 사용법 -> /join 방이름(공백 없이 20자 이하)')
+            elif current is not None and current.name == room_name:
+                self._send_line(sock, f'안내: 이미 "{room_name}" 방에 있습니다.')
+            else:
+                self._join_room(sock, name, room_name)
+                self._send_line(sock, f'안내: "{room_name}" 방에 들어왔습니다.')
+            return True
+
+        if line == '/leave': # 방 나가기 → 기본 방으로
+            if current is None or current.name == DEFAULT_ROOM:
+                self._send_line(sock, f'안내: 이미 기본 방({DEFAULT_ROOM})에 있습니다.')
+            else:
+                self._join_room(sock, name, DEFAULT_ROOM)
+                self._send_line(sock, f'안내: "{current.name}" 방을 나와 {DEFAULT_ROOM}로 이동했습니다.')
+            return True
+
+        # # 일반 메시지: 보낸 본인(exclude) 제외하고 같은 방 모두에게 브로드캐스트
+        if current is not None:
+            msg = Message(CHAT, line.encode('utf-8', errors='ignore'), name.encode('utf-8'))
+            self._publish(msg, exclude=sock, room=current)
+        return True
+
+    def _handle_frame(self, sock: socket.socket, name: str, kind: int, payload: bytes) -> bool:
+        # 이진 모드 프레임 처리. 메시지 본문은 디코딩 없이 그대로 전달. 세션을 끝내야 하면 False 반환
+        if kind == SYSTEM: # 명령은 텍스트 줄과 같은 처리
+            return self._handle_line(sock, name, payload.decode('utf-8', errors='ignore'))
+        if kind == PING: # PING 응답(수신 시각 갱신은 이미 됨)
+            return True
+        self.metrics.messages_in.inc()
+        if kind == CHAT:
+            current = self._room_by_sock.get(sock)
+            if current is not None:
+                self._publish(Message(CHAT, payload, name.encode('utf-8')), exclude=sock, room=current)
+        elif kind == WHISPER:
+            target, body = split_sender(payload)
+            self._whisper(sock, target.decode('utf-8', errors='ignore'), body, name)
+        return True  # 모르는 종류는 무시(이후 버전과의 호환)
+
+    def _negotiate(self, sock: socket.socket, reader) -> bool:
+        # 첫 바이트로 프로토콜 판별: MAGIC이면 이진 프레이밍, 아니면 텍스트 줄(기존 클라이언트)
+        if reader.peek(1)[:1] != MAGIC[:1]:
+            return True
+        if reader.read(len(MAGIC)) != MAGIC:
+            return False
+        self._binary.add(sock)
         return True
 
     def _handle_client(self, sock: socket.socket, addr) -> None:
         # 각 클라이언트별 쓰레드 엔트리
-        reader = sock.makefile('r', encoding='utf-8', newline='\n')
+        self._tune_socket(sock)
+        reader = sock.makefile('rb')
+        # 등록 직후부터 오는 방송을 놓치지 않도록 대기열을 먼저 만들어 둠
+        outbox = Outbox(self.outbox_size, self.overflow)
+        with self._lock:
+            self._outboxes[sock] = outbox
+        self._watch_idle(sock)
+        self._watch_rate(sock)
 
-        # 1) 첫 줄은 닉네임
-        name = self._recv_line(reader)
+        # 1) 첫 줄(이진 모드면 첫 SYSTEM 프레임)은 닉네임
+        name = None
+        binary = False
+        try:
+            if self._negotiate(sock, reader):
+                binary = sock in self._binary
+                if binary:
+                    frame = self._recv_frame(reader)
+                    if frame is not None and frame[0] == SYSTEM:
+                        name = frame[1].decode('utf-8', errors='ignore')
+                else:
+                    name = self._recv_line(reader)
+        except (OSError, FrameError):
+            pass
         if name is None or not self._register_name(sock, name): # 등록 실패(중복/형식 위반 등)
             try:
-                self._send_line(sock, 'ERROR 닉네임이 중복되었거나 사용할 수 없습니다.')
+                sock.sendall(self._encode_for(sock, Message.system('ERROR 닉네임이 중복되었거나 사용할 수 없습니다.')))
             except OSError:
                 pass
             self._cleanup_socket(sock) # 소켓 정리
             return
 
+        # 송신 전담 writer 스레드 시작
+        threading.Thread(target=self._writer_loop, args=(sock, outbox), daemon=True).start()
+
         # 입장 알림
-        join_msg = f'{name}님이 입장하셨습니다.'
-        self._broadcast(join_msg)
-        try:
-            self._send_line(sock, '안내: "/종료"로 종료, "/w 대상닉 메시지"는 귓속말입니다.')
-        except OSError:
-            self._cleanup_socket(sock)
-            return
+        self._welcome(sock, name)
 
         # 2) 메시지 루프
         try:
             while True:
-                line = self._recv_line(reader) # 라인 단위 수신
-                if line is None:
-                    break  # 연결 종료
-
-                if line == '/종료': # 정상 종료 명령
-                    break
-
-                if line.startswith('/w '): # 귓속말 명령 처리
-                    # 형식: /w 대상닉 메시지→ 3파트로 분할
-                    parts = line.split(' ', 2)
-                    if len(parts) < 3: # 메시지 빠진 경우 사용법 안내
-                        self._send_line(sock, '안내: 사용법 -> /w 대상닉 메시지')
-                        continue
-                    _, to_name, message = parts
-                    if not self._whisper(to_name, message, name):  # 귓속말 시도
-                        self._send_line(sock, f'안내: "{to_name}" 사용자를 찾을 수 없습니다.')
-                    continue
-
-                # # 일반 메시지: 보낸 본인(exclude) 제외하고 모두에게 브로드캐스트
-                self._broadcast(f'{name}> {line}', exclude=sock)
-        except (ConnectionResetError, BrokenPipeError):
-            # 상대가 비정상 종료(연결 리셋 등)해도 서버는 조용히 정리
+                if binary:
+                    frame = self._recv_frame(reader) # 프레임 단위 수신
+                    if frame is None:
+                        break  # 연결 종료
+                    self._touch(sock)
+                    if not self._handle_frame(sock, name, *frame):
+                        break
+                else:
+                    line = self._recv_line(reader) # 라인 단위 수신
+                    if line is None:
+                        break  # 연결 종료
+                    self._touch(sock)
+                    if not self._handle_line(sock, name, line):
+                        break
+                wait = self._throttle_delay(sock)
+                if wait > 0:
+                    time.sleep(wait) # 그동안 이 연결은 읽지 않음(보내는 쪽에 TCP 배압)
+        except (ConnectionResetError, BrokenPipeError, FrameError):
+            # 상대가 비정상 종료(연결 리셋 등)하거나 프레임 규칙을 어겨도 서버는 조용히 정리
             pass
         finally:
             # 퇴장 처리
-            self._cleanup_socket(sock)
-            self._broadcast(f'{name}님이 퇴장하셨습니다.')
+            self._farewell(sock, name)
 
     # ---------- 서버 구동 ----------
 
     def serve_forever(self) -> None:
         # 클라이언트 접속을 accept하고, 접속마다 스레드를 생성
         print(f'[서버] {self.host}:{self.port} 에서 대기 중...')
+        if self._wheel is not None:
+            threading.Thread(target=self._run_idle_reaper, daemon=True).start()
         try:
             while True:
                 # 새 연결 수락(클라이언트의 TCP 3-way handshake 완료된 소켓이 반환)
                 client_sock, addr = self.server_sock.accept()
+                self.metrics.connections.inc()
                 # 각 연결을 전담할 데몬 스레드 생성(메인 종료 시 함께 정리)
                 t = threading.Thread(
                     target=self._handle_client, args=(client_sock, addr), daemon=True
@@ -168,6 +574,7 @@ class ChatServer:
                 sockets = list(self._sock_by_name.values())
             for s in sockets:
                 self._cleanup_socket(s)
+            self._close_history()
             # 리스닝 소켓 닫기(포트 반환)    
             try:
                 self.server_sock.close()
@@ -175,16 +582,471 @@ class ChatServer:
                 pass
 
 
+class _Conn:
+    # 이벤트 루프 엔진에서 연결 하나의 상태(스레드 대신 버퍼로 관리)
+    __slots__ = ('sock', 'addr', 'name', 'binary', 'inbuf', 'backlog', 'paused', 'events',
+                 'outbox', 'pending', 'writing', 'delayed')
+
+    def __init__(self, sock: socket.socket, addr, outbox: Outbox) -> None:
+        self.sock = sock
+        self.addr = addr
+        self.name: Optional[str] = None   # 닉네임 등록 전에는 None
+        self.binary: Optional[bool] = None  # 첫 바이트를 받기 전에는 프로토콜을 모름
+        self.inbuf = bytearray()          # 아직 \n(또는 프레임 끝)을 못 만난 수신 바이트
+        self.backlog: Deque[Tuple[Optional[int], bytes]] = deque()  # 받았지만 아직 처리 안 한 줄/프레임
+        self.paused = False               # 속도 제한으로 읽기를 멈춘 상태인지
+        self.events = 0                   # 셀렉터에 등록된 이벤트(0 = 등록 안 됨)
+        self.outbox = outbox              # 송신 대기열(writer = 이벤트 루프)
+        self.pending: List[memoryview] = []  # 대기열에서 꺼냈지만 다 못 보낸 나머지
+        self.writing = False              # 쓰기 가능 이벤트를 감시 중인지
+        self.delayed = False              # 묶어 보내기 창(flush_ms)이 끝나길 기다리는 중인지
+
+
+class SelectorChatServer(ChatServer):
+    # selectors 기반 단일 스레드 이벤트 루프 엔진
+    # 연결마다 스레드를 만들지 않으므로 유휴 접속 수만 개도 코어 하나로 유지 가능
+    # 프로토콜/닉네임/귓속말/종료 처리는 ChatServer의 것을 그대로 재사용
+
+    RECV_SIZE = 4096
+
+    def __init__(self, host: str, port: int, **kwargs) -> None:
+        super().__init__(host, port, **kwargs)
+        self.server_sock.setblocking(False)
+        self._selector = selectors.DefaultSelector()  # 리눅스는 epoll, 맥은 kqueue
+        self._conns: Dict[socket.socket, _Conn] = {}
+        # 다른 스레드(클러스터 버스)가 루프에 일을 넘길 때 쓰는 대기열 + 루프 깨우기용 소켓쌍
+        self._calls: Deque[Tuple[Callable, tuple]] = deque()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        # 묶어 보내기 창이 끝나길 기다리는 연결들(지연이 모두 같으므로 넣은 순서 = 마감 순서)
+        self._delayed: Deque[Tuple[float, _Conn]] = deque()
+        # 속도 제한으로 읽기를 멈춘 연결들(재개 시각 순 힙. 기다리는 시간이 제각각이라 deque 대신 힙)
+        self._paused: List[Tuple[float, int, _Conn]] = []
+        self._pause_seq = itertools.count()
+
+    def _call_soon_threadsafe(self, fn: Callable, *args) -> None:
+        # 셀렉터/대기열 상태는 루프 스레드에서만 바꾸도록 넘겨서 실행
+        self._calls.append((fn, args))
+        try:
+            self._wake_w.send(b'\0')
+        except OSError:
+            pass  # 버퍼가 찼다 = 이미 깨울 신호가 쌓여 있음
+
+    def _remote_whisper(self, sock: socket.socket, to_name: str, msg: Message) -> None:
+        # 허브 답을 루프에서 기다리지 않음: 대상이 없다는 답이 오면 그때 안내
+        def done(ok: bool) -> None:
+            if not ok:
+                self._call_soon_threadsafe(self._whisper_missing, sock, to_name)
+
+        self._bus.whisper_async(to_name, msg, done)
+
+    def _run_calls(self) -> None:
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except OSError:
+            pass
+        while self._calls:
+            fn, args = self._calls.popleft()
+            fn(*args)
+
+    # ---------- 송신: 대기열에 쌓은 뒤 쓰기 가능할 때 전송 ----------
+
+    def _enqueue(self, sock: socket.socket, data: bytes) -> None:
+        conn = self._conns.get(sock)
+        if conn is None:
+            return  # 이미 정리된 연결
+        if not conn.outbox.put(data):
+            self._close_conn(conn)  # disconnect 정책: 느린 소비자 끊기
+            return
+        if conn.writing:
+            return
+        if self.flush_delay and conn.outbox.nbytes < self.batch_bytes:
+            # 묶어 보내기 창: flush_ms 뒤(또는 batch_bytes가 차면) 한 번에 송신
+            if not conn.delayed:
+                conn.delayed = True
+                self._delayed.append((time.monotonic() + self.flush_delay, conn))
+            return
+        self._start_writing(conn)
+
+    def _set_events(self, conn: _Conn) -> None:
+        # 연결 상태(읽기 멈춤/쓸 것 있음)에 맞게 셀렉터 등록을 바꿈
+        events = (0 if conn.paused else selectors.EVENT_READ) | (selectors.EVENT_WRITE if conn.writing else 0)
+        if events == conn.events:
+            return
+        if not events:
+            self._selector.unregister(conn.sock)
+        elif not conn.events:
+            self._selector.register(conn.sock, events, conn)
+        else:
+            self._selector.modify(conn.sock, events, conn)
+        conn.events = events
+
+    def _start_writing(self, conn: _Conn) -> None:
+        # 쓰기 가능 이벤트 감시 추가(대기열이 비어 있다가 처음 보낼 때만)
+        conn.delayed = False
+        conn.writing = True
+        self._set_events(conn)
+
+    def _release_delayed(self) -> Optional[float]:
+        # 창이 끝난 연결은 송신 시작. 다음 마감까지 남은 시간(select 타임아웃) 반환
+        now = time.monotonic()
+        while self._delayed:
+            deadline, conn = self._delayed[0]
+            if deadline > now:
+                return deadline - now
+            self._delayed.popleft()
+            if conn.delayed and conn.sock in self._conns:
+                self._start_writing(conn)
+        return None
+
+    def _flush(self, conn: _Conn) -> None:
+        # 쓰기 가능 이벤트: 쌓인 줄들을 writev 한 번으로, 커널 버퍼가 찰 때까지 보내고 나머지는 다음 이벤트로
+        if self.cork:
+            conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 1)
+        try:
+            while True:
+                if not conn.pending:
+                    conn.pending = [memoryview(b) for b in conn.outbox.get_batch_nowait(self.batch_bytes)]
+                    if not conn.pending:
+                        conn.writing = False
+                        self._set_events(conn)
+                        return
+                try:
+                    sent = _sendv(conn.sock, conn.pending)
+                except (BlockingIOError, InterruptedError):
+                    return
+                except OSError:
+                    self.metrics.send_failures.inc()
+                    self._close_conn(conn)
+                    return
+                self.metrics.write_calls.inc()
+                self.metrics.bytes_out.inc(sent)
+                _advance(conn.pending, sent)
+                if conn.pending:
+                    return  # 일부만 나감 = 커널 송신 버퍼가 가득 참
+        finally:
+            if self.cork and conn.sock in self._conns:
+                conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 0)
+
+    # ---------- 연결 정리 ----------
+
+    def _cleanup_socket(self, sock: socket.socket) -> None:
+        conn = self._conns.pop(sock, None)
+        if conn is not None:
+            # 마지막 안내(ERROR 등)는 한 번만 논블로킹으로 밀어 넣어 본다
+            rest = conn.pending or [memoryview(b) for b in conn.outbox.get_batch_nowait(self.batch_bytes)]
+            if rest:
+                try:
+                    _sendv(sock, rest)
+                except OSError:
+                    pass
+            conn.outbox.close()
+            try:
+                self._selector.unregister(sock)
+            except (KeyError, ValueError):
+                pass
+        super()._cleanup_socket(sock)
+
+    def _reap(self, sock: socket.socket) -> None:
+        conn = self._conns.get(sock)
+        if conn is not None:
+            self._close_conn(conn)  # 루프 스레드에서 바로 퇴장 처리까지
+
+    def _close_conn(self, conn: _Conn) -> None:
+        # 연결 종료 + 등록된 사용자였다면 퇴장 알림
+        if conn.sock not in self._conns:
+            return  # 이미 처리됨
+        if conn.name is not None:
+            self._farewell(conn.sock, conn.name)
+        else:
+            self._cleanup_socket(conn.sock)
+
+    # ---------- 이벤트 처리 ----------
+
+    def _accept(self) -> None:
+        # 대기열에 쌓인 연결을 한 번에 모두 수락
+        while True:
+            try:
+                client_sock, addr = self.server_sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return  # fd 고갈 등: 다음 이벤트에서 다시 시도
+            client_sock.setblocking(False)
+            self._tune_socket(client_sock)
+            self.metrics.connections.inc()
+            conn = _Conn(client_sock, addr, Outbox(self.outbox_size, self.overflow))
+            self._conns[client_sock] = conn
+            self._set_events(conn)
+            self._watch_idle(client_sock)
+            self._watch_rate(client_sock)
+
+    def _read(self, conn: _Conn) -> None:
+        try:
+            data = conn.sock.recv(self.RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._close_conn(conn)  # 연결 종료(FIN) 또는 리셋
+            return
+        self.metrics.bytes_in.inc(len(data))
+        self._touch(conn.sock)
+
+        conn.inbuf += data
+        if conn.binary is None and not self._detect_protocol(conn):
+            return
+        if conn.binary:
+            try:
+                frames, used = parse_frames(conn.inbuf)
+            except FrameError:
+                self._close_conn(conn)
+                return
+            del conn.inbuf[:used]
+            conn.backlog.extend(frames)
+        else:
+            lines: List[bytes] = conn.inbuf.split(b'\n')
+            conn.inbuf = bytearray(lines.pop())  # 마지막 조각은 아직 미완성 줄
+            conn.backlog.extend((None, raw) for raw in lines)
+        self._drain_backlog(conn)
+
+    def _drain_backlog(self, conn: _Conn) -> None:
+        # 받아 둔 줄/프레임을 차례로 처리. 속도 제한에 걸리면 남은 것은 두고 읽기도 멈춤
+        while conn.backlog and not conn.paused:
+            if conn.sock not in self._conns:
+                return  # 처리 중에 연결이 닫힘
+            kind, payload = conn.backlog.popleft()
+            if kind is None:
+                self._on_line(conn, payload.decode('utf-8', errors='ignore'))
+            else:
+                self._on_frame(conn, kind, payload)
+            if conn.name is not None and conn.sock in self._conns:
+                wait = self._throttle_delay(conn.sock)
+                if wait > 0:
+                    self._pause_reading(conn, wait)
+
+    def _pause_reading(self, conn: _Conn, wait: float) -> None:
+        # wait초 동안 이 연결은 읽지 않음(보내는 쪽에 TCP 배압). 송신은 계속
+        conn.paused = True
+        self._set_events(conn)
+        heapq.heappush(self._paused, (time.monotonic() + wait, next(self._pause_seq), conn))
+
+    def _release_paused(self) -> Optional[float]:
+        # 기다림이 끝난 연결은 밀린 줄부터 처리하고 읽기 재개. 다음 재개까지 남은 시간 반환
+        now = time.monotonic()
+        while self._paused:
+            deadline, _, conn = self._paused[0]
+            if deadline > now:
+                return deadline - now
+            heapq.heappop(self._paused)
+            if conn.sock in self._conns:
+                conn.paused = False
+                self._set_events(conn)
+                self._drain_backlog(conn)
+        return None
+
+    def _detect_protocol(self, conn: _Conn) -> bool:
+        # 첫 바이트로 프로토콜 판별(스레드 엔진의 _negotiate와 같은 규칙). 판별이 끝나면 True
+        if conn.inbuf[:1] != MAGIC[:1]:
+            conn.binary = False
+            return True
+        if len(conn.inbuf) < len(MAGIC):
+            return False  # MAGIC이 다 도착하길 기다림
+        if conn.inbuf[:len(MAGIC)] != MAGIC:
+            self._cleanup_socket(conn.sock)
+            return False
+        del conn.inbuf[:len(MAGIC)]
+        conn.binary = True
+        self._binary.add(conn.sock)
+        return True
+
+    def _on_name(self, conn: _Conn, name: Optional[str]) -> None:
+        if name is None or not self._valid_name(name):
+            self._finish_name(conn, name, False)
+        elif self._bus is None:
+            self._finish_name(conn, name, self._bind_name(conn.sock, name))
+        else:
+            # 허브 답을 루프에서 기다리지 않음: 답이 올 때까지 이 연결만 읽기를 멈추고 다른 연결은 계속 처리
+            conn.paused = True
+            self._set_events(conn)
+            self._bus.claim_async(name, lambda ok: self._call_soon_threadsafe(self._on_claimed, conn, name, ok))
+
+    def _on_claimed(self, conn: _Conn, name: str, ok: bool) -> None:
+        # 허브의 닉네임 선점 결과(루프 스레드에서)
+        if conn.sock not in self._conns:
+            if ok:
+                self._bus.release(name)  # 기다리는 동안 연결이 끊김
+            return
+        conn.paused = False
+        self._set_events(conn)
+        self._finish_name(conn, name, ok and self._bind_name(conn.sock, name))
+        self._drain_backlog(conn)  # 기다리는 동안 받아 둔 줄들
+
+    def _finish_name(self, conn: _Conn, name: Optional[str], ok: bool) -> None:
+        if not ok:
+            self._send_line(conn.sock, 'ERROR 닉네임이 중복되었거나 사용할 수 없습니다.')
+            self._cleanup_socket(conn.sock)
+            return
+        conn.name = name
+        self._welcome(conn.sock, name)
+
+    def _on_line(self, conn: _Conn, line: str) -> None:
+        # 1) 첫 줄은 닉네임
+        if conn.name is None:
+            self._on_name(conn, line)
+            return
+
+        # 2) 이후는 스레드 엔진과 같은 명령 처리
+        if not self._handle_line(conn.sock, conn.name, line):
+            self._close_conn(conn)
+
+    def _on_frame(self, conn: _Conn, kind: int, payload: bytes) -> None:
+        # 이진 모드: 첫 SYSTEM 프레임은 닉네임, 이후는 스레드 엔진과 같은 프레임 처리
+        if conn.name is None:
+            self._on_name(conn, payload.decode('utf-8', errors='ignore') if kind == SYSTEM else None)
+            return
+        if not self._handle_frame(conn.sock, conn.name, kind, payload):
+            self._close_conn(conn)
+
+    # ---------- 서버 구동 ----------
+
+    def serve_forever(self) -> None:
+        _raise_fd_limit()
+        print(f'[서버] {self.host}:{self.port} 에서 대기 중... (selectors 엔진)')
+        self._selector.register(self.server_sock, selectors.EVENT_READ, None)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        try:
+            while True:
+                # 가장 가까운 예약 작업(묶어 보내기 창, 읽기 재개, 타이머 휠 틱)까지만 대기
+                timeouts = [t for t in (self._release_delayed(), self._release_paused()) if t is not None]
+                if self._wheel is not None:
+                    now = time.monotonic()
+                    for sock in self._wheel.advance(now):
+                        self._check_idle(sock)
+                    timeouts.append(self._wheel.timeout(now))
+                timeout = min(timeouts) if timeouts else None
+                for key, mask in self._selector.select(timeout):
+                    conn = key.data
+                    if key.fileobj is self._wake_r:  # 다른 스레드가 넘긴 일
+                        self._run_calls()
+                        continue
+                    if conn is None:  # 리스닝 소켓
+                        self._accept()
+                        continue
+                    if mask & selectors.EVENT_READ:
+                        self._read(conn)
+                    if mask & selectors.EVENT_WRITE and conn.sock in self._conns:
+                        self._flush(conn)
+        except KeyboardInterrupt:
+            print('\n[서버] 종료합니다.')
+        finally:
+            for conn in list(self._conns.values()):
+                self._cleanup_socket(conn.sock)
+            self._close_history()
+            self._selector.close()
+            self._wake_r.close()
+            self._wake_w.close()
+            try:
+                self.server_sock.close()
+            except OSError:
+                pass
+
+
+def _sendv(sock: socket.socket, views: List[memoryview]) -> int:
+    # 여러 버퍼를 시스템 콜 한 번(writev)으로 송신하고 보낸 바이트 수 반환
+    if hasattr(sock, 'sendmsg'):
+        return sock.sendmsg(views)
+    return sock.send(b''.join(views))  # 윈도우에는 sendmsg가 없음
+
+
+def _advance(views: List[memoryview], sent: int) -> None:
+    # 보낸 만큼 앞에서부터 버퍼 목록을 줄임(제자리 수정)
+    while sent and views:
+        first = views[0]
+        if sent >= len(first):
+            sent -= len(first)
+            views.pop(0)
+        else:
+            views[0] = first[sent:]
+            sent = 0
+
+
+def _raise_fd_limit() -> None:
+    # 접속 1만 개 이상이면 기본 fd 한도(보통 1024)를 넘으므로 soft 한도를 hard 한도까지 올림
+    try:
+        import resource  # 유닉스 전용(윈도우에는 없음)
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+ENGINES = {
+    'thread': ChatServer,            # 접속마다 스레드(기본)
+    'selectors': SelectorChatServer, # 단일 스레드 이벤트 루프
+}
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description='멀티스레드 채팅 서버')
     parser.add_argument('--host', default='127.0.0.1')
     parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='thread',
+                        help='thread: 접속마다 스레드, selectors: 이벤트 루프(대량 유휴 접속용)')
+    parser.add_argument('--outbox-size', type=int, default=256, help='연결별 송신 대기열 최대 메시지 수')
+    parser.add_argument('--overflow', choices=OVERFLOW_POLICIES, default=DROP_OLDEST,
+                        help='송신 대기열이 넘칠 때: drop-oldest(오래된 것 버림), disconnect(연결 끊음)')
+    parser.add_argument('--flush-ms', type=float, default=0.0,
+                        help='묶어 보내기 창(ms). 이 시간 동안 쌓인 줄을 writev 한 번으로 송신(지연 상한)')
+    parser.add_argument('--batch-bytes', type=int, default=64 * 1024,
+                        help='묶음 최대 크기. 이만큼 쌓이면 창이 끝나기 전이라도 바로 송신')
+    parser.add_argument('--nodelay', action='store_true', help='TCP_NODELAY(Nagle 알고리즘 끄기)')
+    parser.add_argument('--sndbuf', type=int, default=None, help='SO_SNDBUF(커널 송신 버퍼 크기, 바이트)')
+    parser.add_argument('--cork', action='store_true', help='TCP_CORK(리눅스 전용, 묶음 단위로만 전송)')
+    parser.add_argument('--history-dir', default=None,
+                        help='방 대화 기록(세그먼트 로그) 디렉터리. 지정하면 입장 시 최근 대화를 다시 보여 줌')
+    parser.add_argument('--replay', type=int, default=20, help='입장 시 다시 보여 줄 최근 메시지 수')
+    parser.add_argument('--idle-timeout', type=float, default=0.0,
+                        help='이 시간(초) 동안 아무것도 보내지 않는 연결은 끊음(절반이 지나면 PING). 0이면 끔')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='연결 하나가 보낼 수 있는 초당 메시지 수. 넘치면 읽기를 늦춤(버리지 않음). 0이면 끔')
+    parser.add_argument('--burst', type=int, default=10, help='연결별 속도 제한의 순간 허용량(메시지 수)')
+    parser.add_argument('--room-rate-limit', type=float, default=0.0,
+                        help='방 하나에 들어오는 초당 메시지 수(멤버 전체 합). 0이면 끔')
+    parser.add_argument('--room-burst', type=int, default=50, help='방별 속도 제한의 순간 허용량(메시지 수)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='지표(Prometheus 텍스트)를 GET /metrics로 노출할 포트. 워커 모드에서는 워커마다 +0, +1, ...')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='2 이상이면 SO_REUSEPORT로 포트를 공유하는 워커 프로세스 수(멀티 코어 활용)')
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    server = ChatServer(args.host, args.port)
+    options = {
+        'outbox_size': args.outbox_size, 'overflow': args.overflow,
+        'flush_ms': args.flush_ms, 'batch_bytes': args.batch_bytes,
+        'nodelay': args.nodelay, 'sndbuf': args.sndbuf, 'cork': args.cork,
+        'history_dir': args.history_dir, 'replay': args.replay,
+        'idle_timeout': args.idle_timeout,
+        'rate_limit': args.rate_limit, 'burst': args.burst,
+        'room_rate_limit': args.room_rate_limit, 'room_burst': args.room_burst,
+    }
+    if args.workers > 1:
+        from cluster import run_cluster  # 멀티 프로세스 모드에서만 필요
+        run_cluster(args.workers, args.engine, args.host, args.port,
+                    metrics_port=args.metrics_port, **options)
+        return
+    server = ENGINES[args.engine](args.host, args.port, **options)
+    if args.metrics_port is not None:
+        serve_metrics(server.metrics, args.host, args.metrics_port)
     server.serve_forever()
 
 
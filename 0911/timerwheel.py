@@ -0,0 +1,48 @@
+import math
+import threading
+import time
+from typing import Hashable, List, Tuple
+
+# 해시드 타이머 휠: 칸(slot) n개를 시계처럼 돌며, 한 틱에 현재 칸에 든 항목만 봄
+#  - 등록/만료가 O(1)(전체 연결을 훑지 않음). 휠 한 바퀴보다 먼 항목은 남은 바퀴 수(rounds)로 구분
+#  - 취소 연산은 없음: 만료된 키를 받은 쪽이 "아직 유효한지"를 확인하고 필요하면 다시 등록(지연 재등록)
+#    → 메시지가 올 때마다 휠을 건드리지 않고 마지막 활동 시각만 갱신하면 됨
+
+
+class TimerWheel:
+    def __init__(self, tick: float = 1.0, slots: int = 64) -> None:
+        self.tick = tick
+        self._slots: List[List[Tuple[int, Hashable]]] = [[] for _ in range(slots)]  # (남은 바퀴, 키)
+        self._current = 0
+        self._next_at = time.monotonic() + tick
+        self._lock = threading.Lock()  # 스레드 엔진에서는 여러 스레드가 등록함
+
+    def schedule(self, key: Hashable, delay: float) -> None:
+        # delay초 뒤(틱 단위로 올림) 만료되도록 등록
+        ticks = max(1, math.ceil(delay / self.tick))
+        n = len(self._slots)
+        with self._lock:
+            self._slots[(self._current + ticks) % n].append(((ticks - 1) // n, key))
+
+    def timeout(self, now: float) -> float:
+        # 다음 틱까지 남은 시간(select 타임아웃용)
+        return max(0.0, self._next_at - now)
+
+    def advance(self, now: float) -> List[Hashable]:
+        # now까지 밀린 틱을 진행하고 만료된 키 목록 반환
+        expired: List[Hashable] = []
+        n = len(self._slots)
+        with self._lock:
+            while now >= self._next_at:
+                self._current = (self._current + 1) % n
+                slot = self._slots[self._current]
+                if slot:
+                    waiting = []
+                    for rounds, key in slot:
+                        if rounds:
+                            waiting.append((rounds - 1, key))
+                        else:
+                            expired.append(key)
+                    self._slots[self._current] = waiting
+                self._next_at += self.tick
+        return expired
@@ -0,0 +1,174 @@
+import json
+import os
+import sys
+import threading
+from collections import deque
+from typing import Any, BinaryIO, Deque, Dict, List, Optional
+
+# ----------------------------
+# 비동기 접속 로그
+# ----------------------------
+# 요청 스레드(또는 이벤트 루프)는 기록(dict)을 큐에 넣기만 하고, 출력은 백그라운드 writer 스레드가 모아서 한 번에
+#  - 큐는 deque(append/popleft가 GIL 아래에서 원자적 → 넣을 때 락 없음). 가득 차면 버리고 dropped를 셈
+#  - writer는 flush_interval마다(또는 batch_size개가 쌓이면 바로) 깨어나 쌓인 기록을 문자열 하나로 써서 flush 한 번
+#  - 파일로 쓸 때는 max_bytes를 넘으면 access.log → access.log.1 → ... → access.log.N 으로 돌림(N = backups)
+#  - 형식: text(기존 콘솔 한 줄), json(JSON Lines), combined(Apache/Nginx combined log format)
+#
+# 기록 필드: time(datetime), ip, method, path, status, bytes, duration_ms, referer, user_agent, geo(위치 dict 또는 None)
+
+LOG_FORMATS = ('text', 'json', 'combined')
+QUEUE_SIZE = 65536            # 쓰기를 기다리는 기록 수 상한(넘치면 버림)
+BATCH_SIZE = 512              # 이만큼 쌓이면 주기를 기다리지 않고 바로 씀
+FLUSH_INTERVAL_SEC = 0.2      # 기록이 적을 때도 이 주기로는 씀(로그가 늦게 보이는 최대 시간)
+MAX_BYTES = 10 * 1024 * 1024  # 로그 파일 하나의 최대 크기
+BACKUPS = 5                   # 보관할 이전 파일 수
+
+AccessEntry = Dict[str, Any]
+
+
+def format_text(entry: AccessEntry) -> str:
+    geo = entry.get('geo')
+    geo_text = f" | Geo: {geo.get('country','')}, {geo.get('region','')}, {geo.get('city','')}" if geo else ''
+    return f"[{entry['time'].isoformat()}] {entry.get('method', 'GET')} {entry['path']} from {entry['ip']}{geo_text}"
+
+
+def format_json(entry: AccessEntry) -> str:
+    record = dict(entry)
+    record['time'] = entry['time'].isoformat()
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+
+def format_combined(entry: AccessEntry) -> str:
+    # 127.0.0.1 - - [10/Oct/2000:13:55:36 -0700] "GET /a HTTP/1.1" 200 2326 "referer" "user-agent"
+    def quoted(value: Optional[str]) -> str:
+        return '"' + (value or '-').replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    size = entry.get('bytes')
+    return (f"{entry['ip']} - - [{entry['time'].strftime('%d/%b/%Y:%H:%M:%S %z')}] "
+            f"{quoted(entry.get('request_line') or entry.get('method', 'GET') + ' ' + entry['path'])} "
+            f"{entry.get('status', '-')} {size if size else '-'} "
+            f"{quoted(entry.get('referer'))} {quoted(entry.get('user_agent'))}")
+
+
+FORMATTERS = {'text': format_text, 'json': format_json, 'combined': format_combined}
+
+
+class AccessLogger:
+    # path가 None 또는 '-'면 표준출력으로
+    def __init__(self, path: Optional[str] = None, fmt: str = 'text', queue_size: int = QUEUE_SIZE,
+                 batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL_SEC,
+                 max_bytes: int = MAX_BYTES, backups: int = BACKUPS) -> None:
+        if fmt not in FORMATTERS:
+            raise ValueError(f'알 수 없는 로그 형식: {fmt}')
+        self.path = None if path in (None, '-') else path
+        self._format = FORMATTERS[fmt]
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue: Deque[AccessEntry] = deque()
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._file: Optional[BinaryIO] = None
+        self._size = 0
+        self.written = 0
+        self.dropped = 0  # 큐가 가득 차서 버린 기록 수
+
+    def log(self, entry: AccessEntry) -> None:
+        # 블로킹하지 않음(락도 없음). 길이 확인과 append 사이 경쟁으로 상한을 조금 넘을 수는 있음
+        if self._thread is None:
+            self._start()
+        if len(self._queue) >= self.queue_size:
+            self.dropped += 1
+            return
+        self._queue.append(entry)
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    def _start(self) -> None:
+        # 첫 기록이 들어올 때 writer 시작(모듈을 import만 하면 스레드가 생기지 않음)
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='access-log', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closing  # 먼저 읽어 둠: 닫기 직전에 들어온 기록까지 아래에서 비움
+            self._drain()
+            if closing:
+                break
+        self._close_file()
+
+    def _drain(self) -> None:
+        lines: List[str] = []
+        queue = self._queue
+        for _ in range(len(queue)):  # 지금 쌓인 만큼만(계속 들어와도 한 번에 끝없이 붙잡지 않음)
+            entry = queue.popleft()
+            try:
+                lines.append(self._format(entry))
+            except Exception:
+                continue  # 형식이 깨진 기록 하나 때문에 writer가 죽지 않도록
+        if lines:
+            try:
+                self._write('\n'.join(lines) + '\n')
+            except OSError:
+                self.dropped += len(lines)  # 디스크가 가득 찼거나 파일을 못 엶: 버리고 다음 배치에서 다시 시도
+                self._close_file()
+                return
+            self.written += len(lines)
+
+    def _write(self, text: str) -> None:
+        if self.path is None:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            return
+        data = text.encode('utf-8')
+        if self._file is None:
+            self._open()
+        elif self.max_bytes and self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def _close_file(self) -> None:
+        # 쓰다 실패한 파일도 닫고 버림(닫지 않으면 실패할 때마다 fd가 하나씩 샘)
+        file, self._file = self._file, None
+        if file is not None:
+            try:
+                file.close()
+            except OSError:
+                pass  # 버퍼에 남은 것을 flush하다 또 실패해도 fd는 닫힘
+
+    def _open(self) -> None:
+        self._file = open(self.path, 'ab')
+        self._size = self._file.tell()
+
+    def _rotate(self) -> None:
+        # access.log.(N-1) → access.log.N, ..., access.log → access.log.1 (가장 오래된 것은 지워짐)
+        self._close_file()  # 이름 바꾸기가 실패해도 다음 배치에서 다시 엶
+        for i in range(self.backups - 1, 0, -1):
+            src = f'{self.path}.{i}'
+            if os.path.exists(src):
+                os.replace(src, f'{self.path}.{i + 1}')
+        if self.backups > 0:
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def close(self, timeout: float = 5.0) -> None:
+        # 남은 기록을 마저 쓰고 writer 종료
+        if self._thread is None:
+            return
+        self._closing = True
+        self._wake.set()
+        self._thread.join(timeout)
+        if self.dropped:
+            print(f'* access log: dropped {self.dropped} records (queue full or write errors)', file=sys.stderr, flush=True)
@@ -0,0 +1,209 @@
+import asyncio
+import socket
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+# ----------------------------
+# asyncio 서버 엔진
+# ----------------------------
+# 이벤트 루프 한 스레드가 모든 연결을 처리(요청마다 스레드를 만들지 않음)
+#  - HTTP/1.1 keep-alive: 한 연결로 요청을 계속 받음(보낼 응답 없이 keepalive_timeout 동안 조용하면 닫음)
+#  - 파이프라이닝: 한 번에 도착한 요청 여러 개를 순서대로 처리하고 응답을 모아서 한 번에 씀
+#  - 응답은 SimpleHandler를 그대로 사용(소켓 대신 메모리 버퍼를 rfile/wfile로 연결) → 라우트/응답 동일
+#  - 위치정보 조회(외부 API)는 핸들러가 백그라운드 큐(GEO_LOG)에 넘기므로 루프를 막지 않음
+#  - 큰 파일 본문은 loop.sendfile(os.sendfile)로 전송. 그동안 같은 연결의 다음 요청은 기다림(응답 순서 유지)
+
+MAX_HEADER_BYTES = 64 * 1024        # 헤더가 이보다 크면 431 응답 후 연결 종료
+KEEPALIVE_TIMEOUT_SEC = 15.0        # 요청 사이에 이 시간 동안 조용한 연결은 닫음
+
+HEADER_TOO_LARGE = (b'HTTP/1.1 431 Request Header Fields Too Large\r\n'
+                    b'Content-Length: 0\r\nConnection: close\r\n\r\n')
+BAD_REQUEST = b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'
+NOT_IMPLEMENTED = b'HTTP/1.1 501 Not Implemented\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'
+BAD_LENGTH = -1        # _content_length: 길이를 믿을 수 없음(400)
+UNSUPPORTED_CODING = -2  # _content_length: Transfer-Encoding(chunked 등) 본문은 읽지 않음(501)
+
+
+class _AsyncHandlerMixin:
+    # SimpleHandler에 섞어서 asyncio 엔진용으로 바꾸는 부분
+    protocol_version = 'HTTP/1.1'  # 응답에 Content-Length가 있으므로 연결 유지가 기본
+    file_job: Optional[tuple] = None  # 헤더 뒤에 sendfile로 보낼 (열린 파일, 시작, 길이, 반납 함수)
+
+    def _send_file(self, handle, offset: int, count: int) -> None:
+        # 소켓이 없으므로 여기서는 예약만 하고, 실제 전송은 프로토콜이 loop.sendfile로
+        self.file_job = (handle, offset, count, self._release_file)
+
+
+def _content_length(buf: bytearray, header_end: int) -> int:
+    # 헤더에서 본문 길이(없으면 0). 본문이 있는 요청을 정확히 잘라내기 위해
+    # 경계를 잘못 잡으면 본문이 다음 요청으로 해석됨(request smuggling) → 애매하면 받지 않고 연결을 닫음
+    #  - Transfer-Encoding이 있으면(chunked 등) UNSUPPORTED_CODING
+    #  - Content-Length가 숫자가 아니거나, 여러 개인데 값이 다르거나, 이름 뒤에 공백이 있으면 BAD_LENGTH
+    head = bytes(buf[:header_end]).lower()
+    if b'content-length' not in head and b'transfer-encoding' not in head:
+        return 0  # 대부분의 GET: 헤더를 줄 단위로 나누지 않음
+    length = None
+    for line in head.split(b'\r\n')[1:]:
+        name, sep, value = line.partition(b':')
+        field = name.strip()
+        if field not in (b'content-length', b'transfer-encoding'):
+            continue
+        if not sep or name != field:
+            return BAD_LENGTH  # 'Content-Length : 5', 접힌 줄(obs-fold) 등
+        if field == b'transfer-encoding':
+            return UNSUPPORTED_CODING
+        value = value.strip()
+        if not value.isdigit() or (length is not None and int(value) != length):
+            return BAD_LENGTH
+        length = int(value)
+    return length or 0
+
+
+class _HTTPProtocol(asyncio.Protocol):
+    # 연결 하나. 수신 버퍼에서 완성된 요청을 잘라 핸들러에 넘기고 응답을 씀
+    def __init__(self, server: 'AsyncHTTPServer') -> None:
+        self._server = server
+        self._loop = asyncio.get_running_loop()
+        self._buf = bytearray()
+        self._transport: Optional[asyncio.Transport] = None
+        self._peer: Tuple[str, int] = ('', 0)
+        self._last_active = 0.0
+        self._idle_timer: Optional[asyncio.TimerHandle] = None
+        self._write_paused = False  # 송신 버퍼가 가득 참(pause_writing ~ resume_writing)
+        self._sending_file = False  # sendfile 중에는 다음 요청을 처리하지 않음
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport
+        peer = transport.get_extra_info('peername')
+        if peer:
+            self._peer = peer[:2]
+        self._last_active = self._loop.time()
+        self._idle_timer = self._loop.call_later(self._server.keepalive_timeout, self._check_idle)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+
+    def _busy(self) -> bool:
+        # 아직 보낼 응답이 남아 있음(sendfile 중 포함) → 받은 바이트가 없어도 유휴가 아님
+        return self._sending_file or self._write_paused or self._transport.get_write_buffer_size() > 0
+
+    def _check_idle(self) -> None:
+        # 요청마다 타이머를 다시 걸지 않고, 만료됐을 때 마지막 활동 시각을 보고 연장하거나 닫음
+        timeout = self._server.keepalive_timeout
+        if self._busy():
+            self._idle_timer = self._loop.call_later(timeout, self._check_idle)
+            return
+        idle = self._loop.time() - self._last_active
+        if idle >= timeout:
+            self._transport.close()
+        else:
+            self._idle_timer = self._loop.call_later(timeout - idle, self._check_idle)
+
+    # 보내는 쪽이 밀리면(클라이언트가 응답을 안 읽음) 새 요청도 그만 읽음
+    def pause_writing(self) -> None:
+        self._write_paused = True
+        self._transport.pause_reading()
+
+    def resume_writing(self) -> None:
+        self._write_paused = False
+        self._last_active = self._loop.time()  # 응답이 빠져나간 때부터 유휴 시간을 셈
+        self._transport.resume_reading()
+
+    def data_received(self, data: bytes) -> None:
+        self._last_active = self._loop.time()
+        self._buf += data
+        if not self._sending_file:
+            self._process()
+
+    def _process(self) -> None:
+        # 버퍼에 완성된 요청들을 순서대로 처리
+        responses: List[bytes] = []
+        close = False
+        while not close:
+            end = self._buf.find(b'\r\n\r\n')
+            if end < 0:
+                if len(self._buf) > MAX_HEADER_BYTES:
+                    responses.append(HEADER_TOO_LARGE)
+                    close = True
+                break
+            body_len = _content_length(self._buf, end)
+            if body_len < 0:
+                responses.append(NOT_IMPLEMENTED if body_len == UNSUPPORTED_CODING else BAD_REQUEST)
+                close = True
+                break
+            size = end + 4 + body_len
+            if len(self._buf) < size:
+                break  # 본문이 아직 다 안 옴
+            raw = bytes(self._buf[:size])
+            del self._buf[:size]
+            try:
+                out, close, file_job = self._server.handle(raw, self._peer)
+            except Exception:
+                out, close, file_job = b'', True, None  # 핸들러 버그: 이 연결만 정리
+            responses.append(out)
+            if file_job is not None:
+                # 헤더(와 앞선 응답들)를 먼저 쓰고 본문은 sendfile로. 끝나면 남은 요청을 이어서 처리
+                self._transport.writelines(responses)
+                self._sending_file = True
+                self._transport.pause_reading()
+                self._loop.create_task(self._send_file(file_job, close))
+                return
+        if responses:
+            self._transport.writelines(responses)  # 파이프라인된 응답을 모아서 한 번에
+        if close:
+            self._transport.close()
+
+    async def _send_file(self, file_job: tuple, close: bool) -> None:
+        handle, offset, count, release = file_job
+        try:
+            await self._loop.sendfile(self._transport, handle.file, offset, count)
+        except (OSError, RuntimeError):
+            close = True  # 연결이 끊김 등: 잘린 응답이므로 연결 종료
+        finally:
+            release(handle)
+        self._sending_file = False
+        self._last_active = self._loop.time()  # 전송이 끝난 때부터 유휴 시간을 새로 셈
+        if close or self._transport.is_closing():
+            self._transport.close()
+            return
+        self._transport.resume_reading()
+        self._process()
+
+
+class AsyncHTTPServer:
+    def __init__(self, handler_class: type, keepalive_timeout: float = KEEPALIVE_TIMEOUT_SEC) -> None:
+        # SimpleHandler(또는 그 하위 클래스)에 asyncio용 동작을 섞은 클래스
+        self.handler_class = type(f'Async{handler_class.__name__}', (_AsyncHandlerMixin, handler_class), {})
+        self.keepalive_timeout = keepalive_timeout
+
+    def handle(self, raw: bytes, client_address: Tuple[str, int]) -> Tuple[bytes, bool, Optional[tuple]]:
+        # 요청 하나를 핸들러로 처리하고 (응답 바이트, 연결을 닫아야 하는지, sendfile로 보낼 본문) 반환
+        # BaseHTTPRequestHandler.__init__은 소켓을 받아 바로 처리하므로 건너뛰고 필요한 속성만 채움
+        handler = self.handler_class.__new__(self.handler_class)
+        handler.server = self
+        handler.request = None
+        handler.client_address = client_address
+        handler.rfile = BytesIO(raw)
+        handler.wfile = BytesIO()
+        handler.close_connection = True
+        handler.handle_one_request()
+        return handler.wfile.getvalue(), handler.close_connection, handler.file_job
+
+    async def serve(self, host: str, port: int) -> None:
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(
+            lambda: _HTTPProtocol(self), host, port,
+            reuse_address=True, backlog=socket.SOMAXCONN,
+        )
+        async with server:
+            await server.serve_forever()
+
+
+def serve_async(host: str, port: int, handler_class: type,
+                keepalive_timeout: float = KEEPALIVE_TIMEOUT_SEC) -> None:
+    server = AsyncHTTPServer(handler_class, keepalive_timeout)
+    try:
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt: # Ctrl+C
+        print('\n* Shutting down...')
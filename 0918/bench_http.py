@@ -0,0 +1,322 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+# HTTP 부하/지연 벤치마크: 시나리오마다 server.py를 새로 띄우고 asyncio 클라이언트로 두드림
+#
+#   python bench_http.py --engines thread,asyncio --concurrency 32 --duration 5 --json results.json
+#   python bench_http.py --compare old.json results.json     # 두 결과 비교(req/s, p99 변화율)
+#
+#  - 연결 concurrency개가 각자 요청 → 응답 → 다음 요청(keep-alive). 서버가 연결을 닫으면(HTTP/1.0) 다시 접속
+#  - 워밍업 동안의 요청은 빼고 duration초 동안의 처리량과 지연 백분위수를 기록
+#  - 클라이언트도 파이썬 한 프로세스라, 아주 빠른 경로에서는 클라이언트가 먼저 한계에 닿을 수 있음
+#    (같은 장비/같은 설정으로 잰 결과끼리 비교할 것)
+#
+# 시나리오
+#   index          : GET / (메모리에 캐시된 index.html)
+#   index-304      : GET / + If-None-Match(브라우저 재검증, 본문 없음)
+#   index-uncached : GET / (--no-static-cache: 요청마다 디스크에서 읽고 해시)
+#   not-found      : GET /missing (404)
+#   geo-off        : 공인 IP(X-Forwarded-For) 접속, 위치조회 끔
+#   geo-on         : 공인 IP 접속, 가짜 제공자(지연 --fake-geo-delay초)로 위치조회
+
+HOST = '127.0.0.1'
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py')
+PROXY_ARGS = ['--trusted-proxy', '127.0.0.0/8']  # 벤치마크 클라이언트를 프록시로 보고 X-Forwarded-For를 믿게
+
+RequestMaker = Callable[[], bytes]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    # 정렬된 값에서 p(0~1) 백분위수. 값이 없으면 0
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(p * len(sorted_values)))
+    return sorted_values[index]
+
+
+def get_request(path: str, headers: Optional[Dict[str, str]] = None) -> bytes:
+    lines = [f'GET {path} HTTP/1.1', f'Host: {HOST}', 'User-Agent: bench_http']
+    lines += [f'{k}: {v}' for k, v in (headers or {}).items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('ascii')
+
+
+def public_ip(rnd: random.Random, pool: int) -> str:
+    # pool개 중 하나(같은 IP가 다시 오면 위치 캐시가 맞음)
+    n = rnd.randrange(pool)
+    return f'{11 + n % 200}.{n // 200 % 256}.{n // 51200 % 256}.{1 + n % 250}'
+
+
+class Scenario:
+    def __init__(self, name: str, server_args: List[str], make_request: Callable[[argparse.Namespace], RequestMaker],
+                 expect: int = 200) -> None:
+        self.name = name
+        self.server_args = server_args
+        self.make_request = make_request
+        self.expect = expect  # 정상 응답 코드(그 밖의 코드는 오류로 셈)
+
+
+def _fixed(path: str, headers: Optional[Dict[str, str]] = None) -> Callable[[argparse.Namespace], RequestMaker]:
+    def make(args: argparse.Namespace) -> RequestMaker:
+        data = get_request(path, headers)
+        return lambda: data
+    return make
+
+
+def _conditional(args: argparse.Namespace) -> RequestMaker:
+    # 먼저 한 번 받아서 ETag를 알아 둔 뒤 그 값으로 재검증
+    data = get_request('/', {'If-None-Match': fetch_etag(args.port, '/')})
+    return lambda: data
+
+
+def _forwarded(args: argparse.Namespace) -> RequestMaker:
+    rnd = random.Random(1)
+    return lambda: get_request('/', {'X-Forwarded-For': public_ip(rnd, args.ip_pool)})
+
+
+SCENARIOS: Dict[str, Scenario] = {s.name: s for s in (
+    Scenario('index', ['--geo', 'none'], _fixed('/')),
+    Scenario('index-304', ['--geo', 'none'], _conditional, expect=304),
+    Scenario('index-uncached', ['--geo', 'none', '--no-static-cache'], _fixed('/')),
+    Scenario('not-found', ['--geo', 'none'], _fixed('/missing'), expect=404),
+    Scenario('geo-off', ['--geo', 'none'] + PROXY_ARGS, _forwarded),
+    Scenario('geo-on', ['--geo', 'fake'] + PROXY_ARGS, _forwarded),
+)}
+
+
+def fetch_etag(port: int, path: str) -> str:
+    with socket.create_connection((HOST, port), timeout=5) as s:
+        s.sendall(get_request(path, {'Connection': 'close'}))
+        data = b''
+        while b'\r\n\r\n' not in data:
+            chunk = s.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    for line in data.split(b'\r\n\r\n', 1)[0].split(b'\r\n')[1:]:
+        key, _, value = line.partition(b':')
+        if key.strip().lower() == b'etag':
+            return value.strip().decode('ascii')
+    raise RuntimeError('ETag 헤더가 없음')
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[int, bool]:
+    # 응답 하나를 끝까지 읽고 (상태 코드, 연결을 계속 쓸 수 있는지) 반환
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    version, status = lines[0].split(' ', 2)[:2]
+    headers = {}
+    for line in lines[1:]:
+        key, sep, value = line.partition(':')
+        if sep:
+            headers[key.strip().lower()] = value.strip().lower()
+    length = int(headers.get('content-length', '0'))
+    if length and status != '304':
+        await reader.readexactly(length)
+    connection = headers.get('connection', '')
+    keep = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    return int(status), keep
+
+
+class BenchStats:
+    def __init__(self) -> None:
+        self.latency_ms: List[float] = []
+        self.status: Counter = Counter()
+        self.errors = 0       # 연결 실패/끊김, 예상과 다른 상태 코드
+        self.connects = 0
+        self.measuring = False
+
+    def summary(self, elapsed: float, expect: int) -> Dict[str, float]:
+        lat = sorted(self.latency_ms)
+        ok = self.status.get(expect, 0)
+        return {
+            'requests': len(lat),
+            'errors': self.errors + len(lat) - ok,
+            'connects': self.connects,
+            'req_per_sec': len(lat) / elapsed if elapsed else 0.0,
+            'latency_mean_ms': sum(lat) / len(lat) if lat else 0.0,
+            'latency_p50_ms': percentile(lat, 0.50),
+            'latency_p90_ms': percentile(lat, 0.90),
+            'latency_p99_ms': percentile(lat, 0.99),
+            'latency_max_ms': lat[-1] if lat else 0.0,
+            'status': {str(k): v for k, v in sorted(self.status.items())},
+        }
+
+
+async def client_loop(port: int, make_request: RequestMaker, stats: BenchStats, until: float) -> None:
+    loop = asyncio.get_running_loop()
+    reader: Optional[asyncio.StreamReader] = None
+    writer: Optional[asyncio.StreamWriter] = None
+    while loop.time() < until:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(HOST, port)
+                stats.connects += 1
+            data = make_request()
+            start = time.perf_counter()
+            writer.write(data)
+            status, keep = await read_response(reader)
+            elapsed = (time.perf_counter() - start) * 1000
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            if stats.measuring:
+                stats.errors += 1
+            keep = False
+        else:
+            if stats.measuring:
+                stats.latency_ms.append(elapsed)
+                stats.status[status] += 1
+        if not keep and writer is not None:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(port: int, make_request: RequestMaker, concurrency: int,
+                   warmup: float, duration: float, expect: int) -> Dict[str, float]:
+    loop = asyncio.get_running_loop()
+    stats = BenchStats()
+    until = loop.time() + warmup + duration
+    tasks = [asyncio.create_task(client_loop(port, make_request, stats, until)) for _ in range(concurrency)]
+    await asyncio.sleep(warmup)
+    stats.measuring = True
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    stats.measuring = False
+    return stats.summary(time.perf_counter() - started, expect)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def start_server(engine: str, port: int, extra: List[str]) -> subprocess.Popen:
+    cmd = [sys.executable, SERVER, '--host', HOST, '--port', str(port), '--engine', engine] + extra
+    proc = subprocess.Popen(cmd, cwd=os.path.dirname(SERVER), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'서버가 바로 종료됨: {" ".join(cmd)}')
+        try:
+            socket.create_connection((HOST, port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError('서버가 뜨지 않음')
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def run_scenario(scenario: Scenario, engine: str, args: argparse.Namespace) -> Dict[str, object]:
+    args.port = free_port()
+    extra = list(scenario.server_args)
+    if scenario.name == 'geo-on':
+        extra += ['--fake-geo-delay', str(args.fake_geo_delay)]
+    proc = start_server(engine, args.port, extra)
+    try:
+        make_request = scenario.make_request(args)
+        result = asyncio.run(run_load(args.port, make_request, args.concurrency,
+                                      args.warmup, args.duration, scenario.expect))
+    finally:
+        stop_server(proc)
+    return {'scenario': scenario.name, 'engine': engine, **result}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(SERVER),
+                             capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def print_table(results: List[Dict[str, object]]) -> None:
+    print(f"{'scenario':<16}{'engine':<9}{'req/s':>10}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+    for r in results:
+        print(f"{r['scenario']:<16}{r['engine']:<9}{r['req_per_sec']:>10.0f}{r['latency_p50_ms']:>9.2f}"
+              f"{r['latency_p90_ms']:>9.2f}{r['latency_p99_ms']:>9.2f}{r['latency_max_ms']:>9.2f}{r['errors']:>8}")
+
+
+def compare(old_path: str, new_path: str) -> None:
+    # 같은 (시나리오, 엔진)끼리 처리량/p99 변화율
+    def load(path: str) -> Dict[Tuple[str, str], Dict[str, float]]:
+        with open(path, encoding='utf-8') as f:
+            return {(r['scenario'], r['engine']): r for r in json.load(f)['results']}
+
+    old, new = load(old_path), load(new_path)
+    print(f"{'scenario':<16}{'engine':<9}{'req/s':>18}{'change':>9}{'p99 ms':>18}{'change':>9}")
+    for key in sorted(old.keys() & new.keys()):
+        a, b = old[key], new[key]
+        rps = (b['req_per_sec'] / a['req_per_sec'] - 1) * 100 if a['req_per_sec'] else 0.0
+        p99 = (b['latency_p99_ms'] / a['latency_p99_ms'] - 1) * 100 if a['latency_p99_ms'] else 0.0
+        print(f"{key[0]:<16}{key[1]:<9}{a['req_per_sec']:>8.0f} → {b['req_per_sec']:<7.0f}{rps:>+8.1f}%"
+              f"{a['latency_p99_ms']:>8.2f} → {b['latency_p99_ms']:<7.2f}{p99:>+8.1f}%")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='0918 HTTP 서버 처리량/지연 벤치마크')
+    parser.add_argument('--engines', default='thread,asyncio', help='쉼표로 구분(thread, asyncio)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='쉼표로 구분: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=32, help='동시 연결 수')
+    parser.add_argument('--warmup', type=float, default=1.0, help='측정 전 워밍업(초)')
+    parser.add_argument('--duration', type=float, default=5.0, help='측정 시간(초)')
+    parser.add_argument('--ip-pool', type=int, default=1000, help='geo 시나리오에서 쓰는 서로 다른 공인 IP 수')
+    parser.add_argument('--fake-geo-delay', type=float, default=0.05, help='geo-on 시나리오의 가짜 조회 지연(초)')
+    parser.add_argument('--json', default=None, help='결과를 JSON으로 저장할 경로')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='저장한 결과 두 개를 비교만 함')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+    names = [n.strip() for n in args.scenarios.split(',') if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f'알 수 없는 시나리오: {", ".join(unknown)}')
+    results = []
+    for engine in [e.strip() for e in args.engines.split(',') if e.strip()]:
+        for name in names:
+            result = run_scenario(SCENARIOS[name], engine, args)
+            print(f"* {name} / {engine}: {result['req_per_sec']:.0f} req/s, p99 {result['latency_p99_ms']:.2f} ms",
+                  file=sys.stderr, flush=True)
+            results.append(result)
+    print_table(results)
+    if args.json:
+        report = {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'config': {k: getattr(args, k) for k in ('concurrency', 'warmup', 'duration', 'ip_pool', 'fake_geo_delay')},
+            'results': results,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import random
+import time
+from ipaddress import ip_address, ip_network
+from typing import Callable, List
+
+from netmatch import is_private_ip
+
+# 사설망 판별 마이크로 벤치마크
+#  - legacy : 호출마다 ip_network 8개를 만들고 하나씩 포함 검사(예전 server.is_private_ip)
+#  - matcher: 미리 만든 정수 구간표 + inet_pton + 이분 탐색(현재 netmatch.is_private_ip)
+# 입력은 실제 접속 로그와 비슷한 비율로 섞음(공인 IPv4가 대부분, 사설/루프백/IPv6/깨진 값 조금)
+
+
+def legacy_is_private_ip(ip: str) -> bool:
+    try:
+        addr = ip_address(ip)
+    except ValueError:
+        return True
+    private_nets = [
+        ip_network('10.0.0.0/8'),
+        ip_network('172.16.0.0/12'),
+        ip_network('192.168.0.0/16'),
+        ip_network('127.0.0.0/8'),
+        ip_network('169.254.0.0/16'),
+        ip_network('::1/128'),
+        ip_network('fc00::/7'),
+        ip_network('fe80::/10'),
+    ]
+    return any(addr in net for net in private_nets)
+
+
+def make_mix(n: int, seed: int = 1) -> List[str]:
+    rnd = random.Random(seed)
+
+    def public_v4() -> str:
+        while True:
+            first = rnd.randint(1, 223)
+            if first not in (10, 127, 169, 172, 192):
+                return f'{first}.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}'
+
+    kinds = [
+        (0.60, public_v4),
+        (0.12, lambda: f'192.168.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}'),
+        (0.06, lambda: f'10.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}'),
+        (0.04, lambda: f'172.{rnd.randint(16, 31)}.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}'),
+        (0.05, lambda: '127.0.0.1'),
+        (0.08, lambda: f'2001:db8:{rnd.randint(0, 0xffff):x}::{rnd.randint(1, 0xffff):x}'),
+        (0.02, lambda: '::1'),
+        (0.02, lambda: f'fe80::{rnd.randint(1, 0xffff):x}'),
+        (0.01, lambda: 'unknown'),
+    ]
+    weights = [w for w, _ in kinds]
+    makers = [m for _, m in kinds]
+    return [rnd.choices(makers, weights)[0]() for _ in range(n)]
+
+
+def measure(fn: Callable[[str], bool], ips: List[str], repeat: int) -> float:
+    # 가장 빠른 회차 기준 호출당 나노초
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for ip in ips:
+            fn(ip)
+        best = min(best, time.perf_counter() - start)
+    return best / len(ips) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='is_private_ip 예전/현재 구현 비교')
+    parser.add_argument('--count', type=int, default=100_000, help='주소 수')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    ips = make_mix(args.count)
+    mismatched = [ip for ip in ips if legacy_is_private_ip(ip) != is_private_ip(ip)]
+    if mismatched:
+        raise SystemExit(f'결과가 다름: {mismatched[:5]}')
+
+    legacy = measure(legacy_is_private_ip, ips, args.repeat)
+    matcher = measure(is_private_ip, ips, args.repeat)
+    print(f'{args.count} addresses, best of {args.repeat}')
+    print(f'  legacy : {legacy:8.0f} ns/call')
+    print(f'  matcher: {matcher:8.0f} ns/call  (x{legacy / matcher:.1f})')
+
+
+if __name__ == '__main__':
+    main()
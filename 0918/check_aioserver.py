@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+# asyncio 엔진 keep-alive 회귀 검사(로컬에서 서버를 띄워 직접 요청)
+#  - 큰 정적 파일(sendfile)을 천천히 읽는 클라이언트도 keepalive_timeout과 상관없이 본문을 끝까지 받아야 함
+#    (유휴 타이머는 받은 바이트만 보면 안 됨. 응답을 보내는 중인 연결은 유휴가 아님)
+#  - 전송이 끝나면 유휴 시간을 새로 세서 조용한 연결은 닫혀야 함
+# 실패하면 종료 코드 1
+#
+#   python check_aioserver.py
+#   python check_aioserver.py --size-mb 30 --timeout 1.0
+
+READ_CHUNK = 16 * 1024
+READ_DELAY_SEC = 0.005   # 느린 클라이언트 흉내: 조금 읽고 쉼
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, keepalive_timeout: float) -> None:
+    import server  # 작업 디렉터리의 static/을 STATIC_DIR로 씀
+    from aioserver import AsyncHTTPServer
+    from accesslog import AccessLogger
+
+    server.GEO = server.make_geo_provider('none')
+    server.ACCESS_LOG = AccessLogger(os.devnull, 'text')
+    httpd = AsyncHTTPServer(server.SimpleHandler, keepalive_timeout)
+    threading.Thread(target=asyncio.run, args=(httpd.serve('127.0.0.1', port),), daemon=True).start()
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise SystemExit('서버가 뜨지 않음')
+
+
+def slow_download(port: int, path: str) -> tuple:
+    # (연결, 헤더의 Content-Length, 받은 본문 길이, 다운로드 시간)
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 64 * 1024)  # 커널 버퍼가 작아야 서버 쪽이 실제로 밀림
+    sock.connect(('127.0.0.1', port))
+    sock.sendall(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    start = time.monotonic()
+    data = b''
+    while b'\r\n\r\n' not in data:
+        chunk = sock.recv(READ_CHUNK)
+        if not chunk:
+            break
+        data += chunk
+    head, _, body = data.partition(b'\r\n\r\n')
+    length = -1
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            length = int(value)
+    received = len(body)
+    while received < length:
+        chunk = sock.recv(READ_CHUNK)
+        if not chunk:
+            break  # 서버가 중간에 닫음
+        received += len(chunk)
+        time.sleep(READ_DELAY_SEC)
+    elapsed = time.monotonic() - start
+    return sock, length, received, elapsed
+
+
+def closed_within(sock: socket.socket, seconds: float) -> bool:
+    # keep-alive 연결이 seconds 안에 서버 쪽에서 닫히는가
+    sock.settimeout(seconds)
+    try:
+        return sock.recv(1) == b''
+    except socket.timeout:
+        return False
+    except OSError:
+        return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='asyncio 엔진 keep-alive/sendfile 회귀 검사')
+    parser.add_argument('--size-mb', type=float, default=8.0, help='내려받을 정적 파일 크기(MB)')
+    parser.add_argument('--timeout', type=float, default=0.5, help='서버 keepalive_timeout(초)')
+    args = parser.parse_args()
+
+    failures = []
+    base = tempfile.mkdtemp(prefix='check_aioserver_')
+    cwd = os.getcwd()
+    try:
+        os.mkdir(os.path.join(base, 'static'))
+        size = int(args.size_mb * 1024 * 1024)
+        with open(os.path.join(base, 'static', 'big.bin'), 'wb') as f:
+            f.write(os.urandom(size))
+        os.chdir(base)
+        port = free_port()
+        start_server(port, args.timeout)
+
+        sock, length, received, elapsed = slow_download(port, '/static/big.bin')
+        print(f'slow download: {received:,} of {length:,} bytes in {elapsed:.1f}s (keepalive_timeout {args.timeout}s)')
+        if elapsed <= args.timeout:
+            failures.append('download finished before the idle timeout; use a larger --size-mb')
+        if length != size or received != size:
+            failures.append(f'truncated body: {received:,} of {size:,} bytes')
+        elif not closed_within(sock, args.timeout * 4):
+            failures.append('idle connection not closed after the transfer')
+        sock.close()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(base, ignore_errors=True)
+
+    if failures:
+        for failure in failures:
+            print(f'  FAIL {failure}')
+        raise SystemExit(1)
+    print('* asyncio keep-alive checks passed')
+
+
+if __name__ == '__main__':
+    main()
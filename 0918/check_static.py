@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+
+from static import StaticCache, resolve_static_path
+
+# /static/ 경로 처리 회귀 검사(서버 없이 static.py만)
+#  - 루트 밖으로 나가는 경로(.., 숨김 파일, 심볼릭 링크)는 None
+#  - 처음엔 없던 파일이 나중에 루트 밖을 가리키는 심볼릭 링크로 생겨도 None(경로 결과를 기억해 두면 안 됨)
+# 실패하면 종료 코드 1
+#
+#   python check_static.py
+
+
+def main() -> None:
+    base = tempfile.mkdtemp(prefix='check_static_')
+    failures = []
+
+    def expect(label: str, actual, expected) -> None:
+        if actual != expected:
+            failures.append(f'{label}: {actual!r} (expected {expected!r})')
+
+    try:
+        root = os.path.join(base, 'www')
+        os.mkdir(root)
+        outside = os.path.join(base, 'secret.txt')
+        with open(outside, 'w') as f:
+            f.write('secret')
+        with open(os.path.join(root, 'a.txt'), 'w') as f:
+            f.write('hello')
+        real_root = os.path.realpath(root)
+
+        expect('plain file', resolve_static_path(root, 'a.txt'), os.path.join(real_root, 'a.txt'))
+        expect('directory index', resolve_static_path(root, ''), os.path.join(real_root, 'index.html'))
+        expect('parent dir', resolve_static_path(root, '../secret.txt'), None)
+        expect('encoded parent dir', resolve_static_path(root, '%2e%2e/secret.txt'), None)
+        expect('hidden file', resolve_static_path(root, '.env'), None)
+        expect('NUL byte', resolve_static_path(root, 'a.txt%00'), None)
+
+        if hasattr(os, 'symlink'):
+            cache = StaticCache(revalidate_ms=0)
+            # 없는 파일: 경로는 루트 안이지만 캐시에서 None(404)
+            path = resolve_static_path(root, 'later')
+            expect('missing file', path is not None and cache.get(path), None)
+            # 같은 이름이 루트 밖을 가리키는 링크로 생김 → 다음 요청에서 거부돼야 함
+            os.symlink(outside, os.path.join(root, 'later'))
+            expect('symlink created later', resolve_static_path(root, 'later'), None)
+            os.symlink(outside, os.path.join(root, 'link.txt'))
+            expect('symlink out of root', resolve_static_path(root, 'link.txt'), None)
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    if failures:
+        for failure in failures:
+            print(f'  FAIL {failure}')
+        raise SystemExit(1)
+    print('* static path checks passed')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.request import urlopen, Request
+from urllib.error import URLError
+
+# ----------------------------
+# IP 위치정보 제공자
+# ----------------------------
+# 접속 로그에 붙일 위치정보(국가/지역/도시)를 IP로 조회
+#  - IpApiProvider   : ip-api.com 조회(외부 API, 블로킹, 최대 timeout초)
+#  - CachingProvider : 다른 제공자를 감싸서 결과를 메모리에 캐시(LRU + TTL)
+#                      실패(None)도 짧게 캐시하고, 같은 IP 동시 조회는 한 번만 나감(single-flight)
+#  - FakeProvider    : 네트워크 없이 정해진 값을 돌려주는 테스트용
+#  - GeoEnricher     : 요청 처리와 분리된 백그라운드 조회. 응답은 바로 나가고 로그만 나중에 위치를 붙여 출력
+#                      (bounded 큐 + 워커 스레드, 모인 IP는 get_locations로 한 번에 조회)
+
+GEO_TIMEOUT_SEC = 2.5         # 위치정보 요청시 타임아웃(초)
+CACHE_MAX_ENTRIES = 10000     # 캐시에 둘 IP 수(넘으면 가장 오래 안 쓴 것부터 버림)
+CACHE_TTL_SEC = 6 * 3600      # 조회 성공 결과 유지 시간(IP 위치는 자주 바뀌지 않음)
+CACHE_NEGATIVE_TTL_SEC = 300  # 조회 실패(None) 유지 시간(그동안 같은 IP는 다시 조회하지 않음)
+IP_API_BATCH_MAX = 100        # ip-api.com batch 엔드포인트가 한 번에 받는 IP 수
+ENRICH_QUEUE_SIZE = 10000     # 위치 조회를 기다리는 로그 수(넘치면 위치 없이 바로 출력)
+ENRICH_WORKERS = 4            # 위치 조회 워커 스레드 수
+ENRICH_BATCH_SIZE = 100       # 워커가 한 번에 모아서 조회하는 로그 수
+ENRICH_BATCH_WAIT_SEC = 0.05  # 배치를 채우려고 기다리는 최대 시간(로그가 이만큼 늦게 찍힐 수 있음)
+ENRICH_STOP_POLL_SEC = 0.2    # 쉬고 있는 워커가 종료 요청을 확인하는 주기
+
+# 위치정보 제공자 인터페이스
+class GeolocationProvider:
+    # 위치정보 제공자가 반드시 구현해야 할 메소드
+    def get_location(self, ip: str) -> Optional[Dict[str, str]]:
+        raise NotImplementedError
+
+    # 여러 IP를 한 번에 조회(ip → 위치 또는 None). 배치 API가 있는 제공자는 오버라이딩
+    def get_locations(self, ips: Iterable[str]) -> Dict[str, Optional[Dict[str, str]]]:
+        return {ip: self.get_location(ip) for ip in ips}
+
+class NoopProvider(GeolocationProvider):
+    # (위치조회 끔) 구현체
+    def get_location(self, ip: str) -> Optional[Dict[str, str]]:
+        return None
+    
+
+class IpApiProvider(GeolocationProvider):
+    def __init__(self, timeout: float = GEO_TIMEOUT_SEC) -> None:
+        self.timeout = timeout
+
+    def get_location(self, ip: str) -> Optional[Dict[str, str]]:
+			  # ip-api.com이라는 무료 서비스의 엔드포인트.
+			  # 매개변수로 받은 접속자의 ip를 넣어 그 IP의 위치정보를 알려주는 API
+        url = f'http://ip-api.com/json/{ip}?fields=status,country,regionName,city,query'
+        try:
+            # HTTP 요청 설정 객체 Request의 기본값은 GET요청
+            # url와 서버 이름(최소한의 신원)을 정해서 User-Agent 헤더에 담아서 보냄
+					  # HTTP 표준에서 최소한의 신원을 밝혀야 하기 때문
+            req = Request(url, headers={'User-Agent': 'test-client'})
+            
+            # urlopen()이 req를 받아서 네트워크로 HTTP 요청을 날리고, 응답 resp를 가져옴
+            with urlopen(req, timeout=self.timeout) as resp:
+		            # resp의 바디를 바이트로 읽어와서 UTF-8 문자열로 바꿈(깨진 바이트 무시)
+		            # json 모듈의 loads 함수를 사용해서 JSON 문자열을 딕셔너리로 변환
+                data = json.loads(resp.read().decode('utf-8', errors='ignore'))
+                
+            return _ip_api_location(data, ip)
+        except URLError:
+            return None
+        except Exception:
+            return None
+
+    # batch 엔드포인트(POST, IP 최대 100개)로 여러 IP를 요청 한 번에 조회
+    def get_locations(self, ips: Iterable[str]) -> Dict[str, Optional[Dict[str, str]]]:
+        ips = list(dict.fromkeys(ips))
+        results: Dict[str, Optional[Dict[str, str]]] = dict.fromkeys(ips)
+        for i in range(0, len(ips), IP_API_BATCH_MAX):
+            chunk = ips[i:i + IP_API_BATCH_MAX]
+            url = 'http://ip-api.com/batch?fields=status,country,regionName,city,query'
+            body = json.dumps(chunk).encode('utf-8')
+            req = Request(url, data=body, headers={'User-Agent': 'test-client', 'Content-Type': 'application/json'})
+            try:
+                with urlopen(req, timeout=self.timeout) as resp:
+                    rows = json.loads(resp.read().decode('utf-8', errors='ignore'))
+            except Exception:
+                continue  # 이 묶음은 실패(None)
+            # 응답은 요청한 순서대로 온 목록
+            for ip, data in zip(chunk, rows):
+                results[ip] = _ip_api_location(data, ip) if isinstance(data, dict) else None
+        return results
+
+
+def _ip_api_location(data: dict, ip: str) -> Optional[Dict[str, str]]:
+    # data 딕셔너리에서 'status'키 값 확인
+    if data.get('status') == 'success':
+        # data 딕셔너리에서 필요한 값으로 위치 정보 딕셔너리를 만들어 반환
+        return {
+            'ip': data.get('query') or ip,
+            'country': data.get('country') or '',
+            'region': data.get('regionName') or '',
+            'city': data.get('city') or '',
+        }
+    return None
+
+
+class _Pending:
+    # 진행 중인 조회 하나. 같은 IP를 기다리는 스레드들이 결과를 나눠 받음
+    __slots__ = ('done', 'result')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, str]] = None
+
+
+class CachingProvider(GeolocationProvider):
+    # 다른 제공자를 감싸는 캐시. 재방문자는 외부 API를 기다리지 않음
+    def __init__(self, inner: GeolocationProvider, max_entries: int = CACHE_MAX_ENTRIES,
+                 ttl: float = CACHE_TTL_SEC, negative_ttl: float = CACHE_NEGATIVE_TTL_SEC,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.inner = inner
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries: 'OrderedDict[str, Tuple[float, Optional[Dict[str, str]]]]' = OrderedDict()  # ip → (만료 시각, 결과)
+        self._pending: Dict[str, _Pending] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # 다른 스레드의 조회 결과를 기다려서 받은 횟수
+
+    def get_location(self, ip: str) -> Optional[Dict[str, str]]:
+        return self.get_locations((ip,))[ip]
+
+    def get_locations(self, ips: Iterable[str]) -> Dict[str, Optional[Dict[str, str]]]:
+        results: Dict[str, Optional[Dict[str, str]]] = {}
+        mine: List[Tuple[str, _Pending]] = []    # 내가 조회할 IP
+        others: List[Tuple[str, _Pending]] = []  # 다른 스레드가 조회 중인 IP
+        with self._lock:
+            now = self._clock()
+            for ip in dict.fromkeys(ips):
+                cached = self._entries.get(ip)
+                if cached is not None:
+                    expires, result = cached
+                    if now < expires:
+                        self._entries.move_to_end(ip)  # 최근 사용
+                        self.hits += 1
+                        results[ip] = result
+                        continue
+                    del self._entries[ip]
+                pending = self._pending.get(ip)
+                if pending is None:
+                    pending = self._pending[ip] = _Pending()
+                    mine.append((ip, pending))
+                    self.misses += 1
+                else:
+                    others.append((ip, pending))
+                    self.coalesced += 1
+
+        if mine:
+            # 캐시에 없는 IP만 모아 제공자에 한 번에(배치 API가 있으면 요청 한 번)
+            fetched: Dict[str, Optional[Dict[str, str]]] = {}
+            try:
+                fetched = self.inner.get_locations([ip for ip, _ in mine])
+            except Exception:
+                fetched = {}  # 제공자 오류도 실패로 보고 캐시
+            finally:
+                self._store(mine, fetched)
+            for ip, pending in mine:
+                results[ip] = pending.result
+
+        # 같은 IP를 이미 누가 조회 중: 그 결과를 기다림(외부 API 호출은 한 번)
+        for ip, pending in others:
+            pending.done.wait()
+            results[ip] = pending.result
+        return results
+
+    def _store(self, done: List[Tuple[str, '_Pending']], fetched: Dict[str, Optional[Dict[str, str]]]) -> None:
+        with self._lock:
+            now = self._clock()
+            for ip, pending in done:
+                result = fetched.get(ip)
+                ttl = self.ttl if result is not None else self.negative_ttl
+                self._entries[ip] = (now + ttl, result)
+                self._entries.move_to_end(ip)
+                del self._pending[ip]
+                pending.result = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)  # 가장 오래 안 쓴 IP
+        for _, pending in done:
+            pending.done.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FakeProvider(GeolocationProvider):
+    # 테스트용(네트워크 없음). table에 있는 IP는 그 값, 없으면 None
+    # table을 주지 않으면 모든 IP에 가짜 위치를 돌려줌. delay로 느린 외부 API를 흉내 냄
+    # 배치 조회도 지연은 한 번만(배치 API 흉내). calls는 외부 API 호출 횟수에 해당
+    def __init__(self, table: Optional[Dict[str, Dict[str, str]]] = None, delay: float = 0.0) -> None:
+        self.table = table
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_location(self, ip: str) -> Optional[Dict[str, str]]:
+        return self.get_locations((ip,))[ip]
+
+    def get_locations(self, ips: Iterable[str]) -> Dict[str, Optional[Dict[str, str]]]:
+        with self._lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return {ip: self._lookup(ip) for ip in ips}
+
+    def _lookup(self, ip: str) -> Optional[Dict[str, str]]:
+        if self.table is None:
+            return {'ip': ip, 'country': 'Testland', 'region': 'Fake', 'city': 'Localhost'}
+        return self.table.get(ip)
+
+
+# 위치를 붙여 내보낼 접속 기록 하나(클라이언트 IP는 'ip' 키)
+AccessRecord = Dict[str, Any]
+
+
+class GeoEnricher:
+    # 위치정보 조회를 요청 처리에서 분리. 핸들러는 submit()만 하고 바로 응답
+    # 워커가 큐에서 기록을 모아(최대 batch_size, batch_wait초) IP별로 한 번에 조회한 뒤 emit(기록, 위치) 호출
+    def __init__(self, resolve: Callable[[List[str]], Dict[str, Optional[Dict[str, str]]]],
+                 emit: Callable[[AccessRecord, Optional[Dict[str, str]]], None],
+                 workers: int = ENRICH_WORKERS, queue_size: int = ENRICH_QUEUE_SIZE,
+                 batch_size: int = ENRICH_BATCH_SIZE, batch_wait: float = ENRICH_BATCH_WAIT_SEC) -> None:
+        self._resolve = resolve  # IP 목록 → {ip: 위치}. 보통 provider.get_locations
+        self._emit = emit
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._queue: 'queue.Queue[Optional[AccessRecord]]' = queue.Queue(queue_size)
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        # 종료 요청. 큐에 넣는 종료 신호(None)는 꽉 찬 큐에서 막힐 수 있어 이벤트로 알림
+        self._stop = threading.Event()
+        self.dropped = 0  # 큐가 가득 차서 위치 없이 바로 내보낸 기록 수
+
+    def submit(self, record: AccessRecord) -> None:
+        # 블로킹하지 않음. 큐가 가득 차면(조회가 밀림) 위치 없이 바로 내보냄 → 로그는 잃지 않음
+        if self._stop.is_set():
+            self._emit(record, None)  # 종료 중: 워커가 곧 멈추므로 바로
+            return
+        if not self._threads:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._emit(record, None)
+
+    def _start(self) -> None:
+        # 첫 기록이 들어올 때 워커 시작(모듈을 import만 하면 스레드가 생기지 않음)
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f'geo-{i}', daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _next_batch(self) -> Optional[List[AccessRecord]]:
+        # 다음 배치. 종료 요청 후 큐가 비면 None(남은 기록은 끝까지 처리하고 종료)
+        first = None
+        while first is None:  # 큐의 None은 깨우기 신호일 뿐
+            if self._stop.is_set() and self._queue.empty():
+                return None
+            try:
+                first = self._queue.get(timeout=ENRICH_STOP_POLL_SEC)
+            except queue.Empty:
+                continue
+        batch = [first]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = 0 if self._stop.is_set() else deadline - time.monotonic()  # 종료 중에는 기다리지 않음
+            try:
+                record = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not None:
+                batch.append(record)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                locations = self._resolve(list(dict.fromkeys(record['ip'] for record in batch)))
+            except Exception:
+                locations = {}
+            for record in batch:
+                self._emit(record, locations.get(record['ip']))
+
+    def close(self, timeout: float = 5.0) -> None:
+        # 큐에 남은 기록을 마저 내보내고 워커 종료(최대 timeout초 기다림)
+        self._stop.set()
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)  # 쉬고 있는 워커를 바로 깨움
+            except queue.Full:
+                break  # 꽉 찼으면 워커들은 이미 깨어 있음
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        # 시간 안에 조회하지 못한 기록은 위치 없이 내보냄(로그는 잃지 않음)
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not None:
+                self._emit(record, None)
@@ -0,0 +1,235 @@
+import argparse
+import csv
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from ipaddress import ip_address, ip_network
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from geo import GeolocationProvider
+from netmatch import pack_ip
+
+# ----------------------------
+# 오프라인 IP 대역 DB 위치정보 제공자
+# ----------------------------
+# 네트워크 없이 로컬 파일에서 조회(이분 탐색, 수 마이크로초)
+#  - CSV(대역, 국가, 지역, 도시)를 미리 정렬된 이진 파일로 컴파일해 두고, 서버는 그 파일을 mmap으로 읽음
+#    → 파이썬 객체로 풀어 올리지 않으므로 메모리가 작고, 여러 서버 프로세스가 같은 페이지를 공유
+#  - 주소는 빅엔디언 바이트(IPv4 4B, IPv6 16B)로 저장 → 바이트 비교가 곧 숫자 비교라 그대로 이분 탐색
+#  - 파일이 바뀌면(컴파일 결과로 교체) reload_sec마다 stat()으로 알아채고 새 파일을 다시 mmap
+#
+# CSV 한 줄: 대역,국가,지역,도시
+#   대역은 CIDR(1.2.3.0/24) 또는 시작-끝(1.2.3.0-1.2.3.255). '#'으로 시작하는 줄은 무시
+#
+# 컴파일: python geodb.py compile ranges.csv geo.db
+# 조회:   python geodb.py lookup geo.db 1.2.3.4
+
+MAGIC = b'GEODB1\x00\x00'
+HEADER = struct.Struct('>8sIII')  # 매직, IPv4 대역 수, IPv6 대역 수, 위치 수
+LOC_INDEX = struct.Struct('>I')
+RELOAD_SEC = 5.0                  # 파일이 바뀌었는지 확인하는 주기(초)
+FIELD_SEP = '\x1f'                # 위치 문자열 안에서 국가/지역/도시 구분자
+
+
+class GeoDbError(ValueError):
+    pass
+
+
+# ----------------------------
+# 컴파일(CSV → 이진 파일)
+# ----------------------------
+
+def _parse_range(text: str) -> Tuple[bytes, bytes]:
+    # '1.2.3.0/24' 또는 '1.2.3.0-1.2.3.255' → (시작, 끝) 빅엔디언 바이트
+    if '-' in text:
+        first, last = (ip_address(part.strip()) for part in text.split('-', 1))
+        if first.version != last.version or int(last) < int(first):
+            raise ValueError(f'잘못된 대역: {text}')
+        return first.packed, last.packed
+    net = ip_network(text.strip(), strict=False)
+    return net.network_address.packed, net.broadcast_address.packed
+
+
+def compile_csv(rows: Iterable[List[str]]) -> bytes:
+    locations: Dict[str, int] = {}  # 같은 위치 문자열은 한 번만 저장
+    ranges: Dict[int, List[Tuple[bytes, bytes, int]]] = {4: [], 16: []}
+    for lineno, row in enumerate(rows, 1):
+        if not row or row[0].lstrip().startswith('#'):
+            continue
+        try:
+            start, end = _parse_range(row[0])
+        except ValueError as e:
+            raise GeoDbError(f'{lineno}번째 줄: {e}') from None
+        fields = [(row[i] if i < len(row) else '').strip().replace(FIELD_SEP, ' ') for i in (1, 2, 3)]
+        loc = locations.setdefault(FIELD_SEP.join(fields), len(locations))
+        ranges[len(start)].append((start, end, loc))
+
+    out = [HEADER.pack(MAGIC, len(ranges[4]), len(ranges[16]), len(locations))]
+    for width in (4, 16):
+        table = sorted(ranges[width])
+        for prev, cur in zip(table, table[1:]):
+            if cur[0] <= prev[1]:
+                raise GeoDbError(f'겹치는 대역: {ip_address(prev[0])}-{ip_address(prev[1])}, {ip_address(cur[0])}')
+        out.extend(start + end + LOC_INDEX.pack(loc) for start, end, loc in table)
+    # 위치 문자열: 시작 위치 목록(위치 수 + 1) + UTF-8 본문
+    blobs = [text.encode('utf-8') for text in locations]
+    offset = 0
+    for blob in blobs:
+        out.append(LOC_INDEX.pack(offset))
+        offset += len(blob)
+    out.append(LOC_INDEX.pack(offset))
+    out.extend(blobs)
+    return b''.join(out)
+
+
+def compile_file(src: str, dst: str) -> None:
+    with open(src, newline='', encoding='utf-8') as f:
+        data = compile_csv(csv.reader(f))
+    # 임시 파일에 다 쓴 뒤 교체 → 실행 중인 서버는 반쯤 쓴 파일을 읽지 않음(이전 파일 mmap도 그대로 유효)
+    tmp = f'{dst}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, dst)
+
+
+# ----------------------------
+# 조회
+# ----------------------------
+
+class _Table:
+    # mmap 안의 대역 표 하나: [시작][끝][위치 번호] 고정 길이 레코드가 시작 주소 순으로
+    __slots__ = ('base', 'width', 'stride', 'count')
+
+    def __init__(self, base: int, width: int, count: int) -> None:
+        self.base = base
+        self.width = width
+        self.stride = width * 2 + LOC_INDEX.size
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class GeoDb:
+    # 컴파일된 파일 하나를 mmap으로 연 것(읽기 전용)
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as f:
+            try:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # 파일을 닫아도 매핑은 유지
+            except ValueError:
+                raise GeoDbError(f'빈 파일: {path}') from None
+        if len(self._buf) < HEADER.size:
+            raise GeoDbError(f'형식이 아님: {path}')
+        magic, n4, n6, nloc = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise GeoDbError(f'형식이 아님: {path}')
+        self.v4 = _Table(HEADER.size, 4, n4)
+        self.v6 = _Table(self.v4.base + n4 * self.v4.stride, 16, n6)
+        self._loc_base = self.v6.base + n6 * self.v6.stride
+        self._blob_base = self._loc_base + (nloc + 1) * LOC_INDEX.size
+        self.location_count = nloc
+        if self._blob_base > len(self._buf):
+            raise GeoDbError(f'잘린 파일: {path}')
+
+    def __len__(self) -> int:
+        return len(self.v4) + len(self.v6)
+
+    def lookup(self, packed: bytes) -> Optional[Tuple[str, str, str]]:
+        # 빅엔디언 주소 바이트 → (국가, 지역, 도시). 어느 대역에도 없으면 None
+        table = self.v4 if len(packed) == 4 else self.v6
+        buf = self._buf
+        base, stride, width = table.base, table.stride, table.width
+        # 시작 주소가 packed 이하인 마지막 대역 찾기(bisect_right). 레코드를 꺼내지 않고 mmap에서 바로 비교
+        lo, hi = 0, table.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = base + mid * stride
+            if buf[pos:pos + width] <= packed:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return None
+        pos = base + (lo - 1) * stride + width
+        if buf[pos:pos + width] < packed:  # 그 대역의 끝보다 뒤(대역 사이의 빈 곳)
+            return None
+        loc, = LOC_INDEX.unpack_from(buf, pos + width)
+        start, end = struct.unpack_from('>II', buf, self._loc_base + loc * LOC_INDEX.size)
+        country, region, city = buf[self._blob_base + start:self._blob_base + end].decode('utf-8').split(FIELD_SEP)
+        return country, region, city
+
+
+class GeoDbProvider(GeolocationProvider):
+    # 컴파일된 DB 파일로 조회. 파일이 교체되면 다음 확인 시점에 새 파일로 바꿔 끼움
+    def __init__(self, path: str, reload_sec: float = RELOAD_SEC) -> None:
+        self.path = path
+        self.reload_sec = reload_sec
+        self._lock = threading.Lock()
+        self._version = self._stat()
+        self._db = GeoDb(path)
+        self._check_at = time.monotonic() + reload_sec
+        self.reloads = 0
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _maybe_reload(self) -> None:
+        with self._lock:
+            if time.monotonic() < self._check_at:
+                return  # 다른 스레드가 방금 확인함
+            self._check_at = time.monotonic() + self.reload_sec
+            version = self._stat()
+            if version is None or version == self._version:
+                return  # 파일이 없어졌으면 쓰던 DB를 계속 사용
+            try:
+                db = GeoDb(self.path)
+            except (OSError, GeoDbError) as e:
+                print(f'* geo db reload failed: {e}', file=sys.stderr, flush=True)
+                return
+            # 이전 매핑은 닫지 않음: 조회 중인 스레드가 다 쓰고 나면 GC가 정리
+            self._db = db
+            self._version = version
+            self.reloads += 1
+
+    def get_location(self, ip: str) -> Optional[Dict[str, str]]:
+        if time.monotonic() >= self._check_at:
+            self._maybe_reload()
+        packed = pack_ip(ip)  # ip_address()보다 훨씬 빠름(요청마다 호출). ::ffff:1.2.3.4는 IPv4로
+        if packed is None:
+            return None
+        found = self._db.lookup(packed)
+        if found is None:
+            return None
+        country, region, city = found
+        return {'ip': ip, 'country': country, 'region': region, 'city': city}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='오프라인 IP 대역 위치정보 DB')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('compile', help='CSV(대역,국가,지역,도시)를 이진 DB 파일로')
+    p.add_argument('src')
+    p.add_argument('dst')
+    p = sub.add_parser('lookup', help='DB 파일에서 IP 조회')
+    p.add_argument('db')
+    p.add_argument('ips', nargs='+')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.command == 'compile':
+        compile_file(args.src, args.dst)
+        db = GeoDb(args.dst)
+        print(f'* {args.dst}: {len(db.v4)} IPv4 + {len(db.v6)} IPv6 ranges, {db.location_count} locations')
+    else:
+        provider = GeoDbProvider(args.db)
+        for ip in args.ips:
+            print(ip, provider.get_location(ip))
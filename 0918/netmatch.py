@@ -0,0 +1,106 @@
+import socket
+from bisect import bisect_right
+from ipaddress import ip_network
+from typing import Iterable, List, Optional, Tuple
+
+# ----------------------------
+# IP 대역 매칭
+# ----------------------------
+# 요청마다 부르는 "이 IP가 이 대역들 안에 있나?"를 빠르게
+#  - 대역 목록은 처음 한 번만 정수 구간 [시작, 끝]으로 바꿔 정렬/병합(IPv4, IPv6 따로)
+#  - 조회는 inet_pton(문자열 → 바이트) + 이분 탐색 한 번(ip_address/ip_network 객체를 만들지 않음)
+#  - ::ffff:1.2.3.4 (듀얼 스택 소켓이 주는 IPv4-mapped 주소)는 IPv4 표에서 찾음
+#
+# 프록시 뒤에서는 소켓 주소가 프록시 IP이므로, 믿을 수 있는 프록시가 붙인 X-Forwarded-For에서 실제 IP를 꺼냄
+
+# 위치조회 스킵할 ip 모음
+PRIVATE_NETWORKS = (
+    '10.0.0.0/8',       # 사설 IPv4 (회사/학교/가정 LAN)
+    '172.16.0.0/12',    # 사설 IPv4 (회사/학교/가정 LAN)
+    '192.168.0.0/16',   # 사설 IPv4 (집 공유기 등)
+    '127.0.0.0/8',      # 루프백(자기 PC 자신)
+    '169.254.0.0/16',   # IPv4 링크-로컬
+    '::1/128',          # IPv6 루프백(자기 PC 자신)
+    'fc00::/7',         # IPv6 사설 주소 (ULA)
+    'fe80::/10',        # IPv6 링크-로컬
+)
+
+V4_MAPPED_PREFIX = b'\x00' * 10 + b'\xff\xff'  # IPv4-mapped IPv6 주소의 앞 12바이트
+
+
+def pack_ip(ip: str) -> Optional[bytes]:
+    # IP 문자열 → 빅엔디언 바이트(IPv4 4B, IPv6 16B). 잘못된 문자열이면 None
+    try:
+        packed = socket.inet_pton(socket.AF_INET6 if ':' in ip else socket.AF_INET, ip.strip())
+    except (OSError, ValueError):
+        return None
+    if packed[:12] == V4_MAPPED_PREFIX:
+        return packed[12:]
+    return packed
+
+
+class CidrMatcher:
+    # 대역 목록을 미리 정수 구간표로 만들어 두고 포함 여부를 O(log n)으로 판단
+    def __init__(self, cidrs: Iterable[str] = ()) -> None:
+        self.cidrs = tuple(cidrs)
+        ranges = {4: [], 16: []}  # 주소 바이트 길이 → [(시작, 끝)]
+        for cidr in self.cidrs:
+            net = ip_network(cidr, strict=False)  # 잘못된 대역은 ValueError(설정 오류는 시작할 때 알림)
+            width = 4 if net.version == 4 else 16
+            ranges[width].append((int(net.network_address), int(net.broadcast_address)))
+        self._tables = {width: self._merge(spans) for width, spans in ranges.items()}
+
+    @staticmethod
+    def _merge(spans: List[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+        # 겹치거나 붙어 있는 구간은 하나로 → 찾은 구간 하나만 보면 됨
+        starts: List[int] = []
+        ends: List[int] = []
+        for start, end in sorted(spans):
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        return starts, ends
+
+    def __bool__(self) -> bool:
+        return any(starts for starts, _ in self._tables.values())
+
+    def contains_packed(self, packed: bytes) -> bool:
+        starts, ends = self._tables[len(packed)]
+        n = int.from_bytes(packed, 'big')
+        i = bisect_right(starts, n) - 1
+        return i >= 0 and n <= ends[i]
+
+    def __contains__(self, ip: str) -> bool:
+        packed = pack_ip(ip)
+        return packed is not None and self.contains_packed(packed)
+
+
+PRIVATE = CidrMatcher(PRIVATE_NETWORKS)
+
+
+# 로컬/사설망 ip 인가?
+# 공인 IP가 아닌 내부망·루프백·특수망 주소는 위치를 알 수 없기 때문에 조회 X
+# 잘못된 문자열도 True(조회하지 않음)
+def is_private_ip(ip: str) -> bool:
+    packed = pack_ip(ip)
+    return packed is None or PRIVATE.contains_packed(packed)
+
+
+def real_client_ip(peer_ip: str, forwarded_for: Optional[str], trusted: CidrMatcher) -> str:
+    # 소켓 상대가 믿을 수 있는 프록시일 때만 X-Forwarded-For를 봄(아니면 누구나 헤더로 IP를 속일 수 있음)
+    # 헤더는 "클라이언트, 프록시1, 프록시2" 순이라 오른쪽부터 보며 믿을 수 있는 프록시를 건너뜀
+    # → 처음 나오는 그 밖의 주소가 실제 클라이언트. 형식이 깨진 항목을 만나면 거기서 멈추고 직전 홉을 씀
+    if not forwarded_for or not trusted or peer_ip not in trusted:
+        return peer_ip
+    client = peer_ip
+    for hop in reversed(forwarded_for.split(',')):
+        hop = hop.strip()
+        packed = pack_ip(hop)
+        if packed is None:
+            break
+        client = hop
+        if not trusted.contains_packed(packed):
+            break
+    return client
@@ -3,12 +3,17 @@ from socketserver import ThreadingMixIn
 from http.server import HTTPServer
 from typing import Dict, Optional
 from datetime import datetime, timezone
-from urllib.request import urlopen, Request
-from urllib.error import URLError
-from ipaddress import ip_address, ip_network
-import json
+from urllib.parse import urlsplit
+import argparse
 import os
-import sys
+import signal
+import time
+
+from netmatch import CidrMatcher, is_private_ip, real_client_ip
+from accesslog import LOG_FORMATS, AccessLogger
+from geo import AccessRecord, CachingProvider, FakeProvider, GeoEnricher, GeolocationProvider, IpApiProvider, NoopProvider
+from static import (OpenFileCache, RangeNotSatisfiable, StaticCache, choose_encoding, if_range_matches,
+                    is_not_modified, parse_range, resolve_static_path)
 
 # ----------------------------
 # 기본 설정
@@ -16,91 +21,70 @@ import sys
 HOST = '0.0.0.0'              # 서버가 바인드될 주소 (0.0.0.0 → 모든 네트워크 인터페이스 허용)
 PORT = 8080                   # 접속할 포트 번호
 INDEX_FILE = 'index.html'     # 기본으로 서빙할 HTML 파일
-GEO_PROVIDER = 'ipapi'        # IP 기반 위치정보 제공자 ('ipapi' 또는 'none')
+REVALIDATE_MS = 1000          # 캐시한 파일이 디스크에서 바뀌었는지 확인하는 주기(ms)
+STATIC_DIR = 'static'         # 정적 파일(CSS/JS/이미지) 디렉터리
+STATIC_PREFIX = '/static/'    # 이 경로로 시작하는 요청은 STATIC_DIR 안의 파일로 응답
+MAX_OPEN_FILES = 64           # 큰 파일 전송용으로 열어 두는 파일 수
+GEO_PROVIDER = 'ipapi'        # IP 기반 위치정보 제공자 ('ipapi', 'geodb', 'fake' 또는 'none')
+GEO_DB_FILE = 'geo.db'        # geodb 제공자가 읽는 DB 파일(python geodb.py compile ranges.csv geo.db)
 GEO_TIMEOUT_SEC = 2.5         # 위치정보 요청시 타임아웃(초)
+GEO_CACHE_SIZE = 10000        # 위치정보를 캐시할 IP 수(0이면 캐시 안 함)
+GEO_CACHE_TTL_SEC = 6 * 3600  # 조회 성공 결과 캐시 시간(초)
+GEO_NEGATIVE_TTL_SEC = 300    # 조회 실패 결과 캐시 시간(초). 그동안 같은 IP는 다시 조회하지 않음
+GEO_PROVIDERS = ('ipapi', 'geodb', 'fake', 'none')
+FAKE_GEO_DELAY_SEC = 0.0      # fake 제공자의 조회 지연(느린 외부 API 흉내, 벤치마크용)
+ACCESS_LOG_FILE = '-'         # 접속 로그 파일('-'면 콘솔). 파일은 크기가 넘치면 access.log.1, .2 ... 로 돌림
+ACCESS_LOG_FORMAT = 'text'    # 'text'(콘솔 한 줄), 'json'(JSON Lines), 'combined'(Apache/Nginx 형식)
+TRUSTED_PROXIES = ()          # 앞단 리버스 프록시 대역(예: '10.0.0.0/8'). 여기서 온 요청은 X-Forwarded-For로 실제 IP 확인
 
-# 위치정보 제공자 인터페이스
-class GeolocationProvider:
-    # 위치정보 제공자가 반드시 구현해야 할 메소드
-    def get_location(self, ip: str) -> Optional[Dict[str, str]]:
-        raise NotImplementedError
-
-class NoopProvider(GeolocationProvider):
-    # (위치조회 끔) 구현체
-    def get_location(self, ip: str) -> Optional[Dict[str, str]]:
-        return None
-    
-
-class IpApiProvider(GeolocationProvider):
-    def get_location(self, ip: str) -> Optional[Dict[str, str]]:
-			  # ip-api.com이라는 무료 서비스의 엔드포인트.
-			  # 매개변수로 받은 접속자의 ip를 넣어 그 IP의 위치정보를 알려주는 API
-        url = f'http://ip-api.com/json/{ip}?fields=status,country,regionName,city,query'
-        try:
-            # HTTP 요청 설정 객체 Request의 기본값은 GET요청
-            # url와 서버 이름(최소한의 신원)을 정해서 User-Agent 헤더에 담아서 보냄
-					  # HTTP 표준에서 최소한의 신원을 밝혀야 하기 때문
-            req = Request(url, headers={'User-Agent': 'test-client'})
-            
-            # urlopen()이 req를 받아서 네트워크로 HTTP 요청을 날리고, 응답 resp를 가져옴
-            with urlopen(req, timeout=GEO_TIMEOUT_SEC) as resp:
-		            # resp의 바디를 바이트로 읽어와서 UTF-8 문자열로 바꿈(깨진 바이트 무시)
-		            # json 모듈의 loads 함수를 사용해서 JSON 문자열을 딕셔너리로 변환
-                data = json.loads(resp.read().decode('utf-8', errors='ignore'))
-                
-            # data 딕셔너리에서 'status'키 값 확인
-            if data.get('status') == 'success':
-		            # data 딕셔너리에서 필요한 값으로 위치 정보 딕셔너리를 만들어 반환
-                return {
-                    'ip': data.get('query') or ip,
-                    'country': data.get('country') or '',
-                    'region': data.get('regionName') or '',
-                    'city': data.get('city') or '',
-                }
-        except URLError:
-            return None
-        except Exception:
-            return None
-        return None
-
-
-# 로컬/사설망 ip 인가? 
-# 공인 IP가 아닌 내부망·루프백·특수망 주소는 위치를 알 수 없기 때문에 조회 X
-def is_private_ip(ip: str) -> bool:
-
-    try:
-        # 매개변수로 받은 ip문자열을 파싱해서 IPv4Address 또는 IPv6Address 객체로 바꿈
-        addr = ip_address(ip)
-     # 잘못된 문자열
-    except ValueError:
-        return True
-     # 위치조회 스킵할 ip 모음
-    private_nets = [		    
-        ip_network('10.0.0.0/8'),       # 사설 IPv4 (회사/학교/가정 LAN)
-		ip_network('172.16.0.0/12'),    # 사설 IPv4 (회사/학교/가정 LAN)
-		ip_network('192.168.0.0/16'),   # 사설 IPv4 (집 공유기 등)
-		ip_network('127.0.0.0/8'),      # 루프백(자기 PC 자신)
-		ip_network('169.254.0.0/16'),   # IPv4 링크-로컬
-		ip_network('::1/128'),          # IPv6 루프백(자기 PC 자신)
-		ip_network('fc00::/7'),         # IPv6 사설 주소 (ULA)
-		ip_network('fe80::/10'),        # IPv6 링크-로컬
-    ]
-    # private_nets안의 각각의 객체 net이
-    # 우리가 받은 addr에 어느 하나라도 포함되나요? 
-    # true -> 조회 x , false -> o
-    return any(addr in net for net in private_nets)
-
-
-# "ipapi", "none" 문자열을 받아 GeolocationProvider를 상속한 객체를 반환하라는 뜻
-def make_geo_provider(name: str) -> GeolocationProvider:
+# "ipapi", "geodb", "fake", "none" 문자열을 받아 GeolocationProvider를 상속한 객체를 반환하라는 뜻
+# 실제 조회하는 제공자는 캐시로 감쌈(재방문 IP는 외부 API를 다시 부르지 않음)
+def make_geo_provider(name: str, db_file: str = GEO_DB_FILE) -> GeolocationProvider:
     if name == 'ipapi':
-        return IpApiProvider()
-    return NoopProvider()
+        provider: GeolocationProvider = IpApiProvider(GEO_TIMEOUT_SEC)
+    elif name == 'geodb':
+        from geodb import GeoDbProvider  # 로컬 파일 조회는 이미 빠르므로 캐시 없이
+        return GeoDbProvider(db_file)
+    elif name == 'fake':
+        provider = FakeProvider(delay=FAKE_GEO_DELAY_SEC)
+    else:
+        return NoopProvider()
+    if GEO_CACHE_SIZE <= 0:
+        return provider
+    return CachingProvider(provider, GEO_CACHE_SIZE, GEO_CACHE_TTL_SEC, GEO_NEGATIVE_TTL_SEC)
 
 
 # 전역 위치정보 제공자 객체 생성
 GEO = make_geo_provider(GEO_PROVIDER)
 
+# 믿을 수 있는 프록시 대역(비어 있으면 X-Forwarded-For는 무시)
+TRUSTED = CidrMatcher(TRUSTED_PROXIES)
+
+
+# 접속 로그는 백그라운드 writer가 모아서 출력(요청 스레드는 큐에 넣기만 함)
+ACCESS_LOG = AccessLogger(ACCESS_LOG_FILE, ACCESS_LOG_FORMAT)
+
+
+# 위치를 붙인 접속 기록을 로그로(위치를 모르면 None)
+def write_access(record: AccessRecord, loc: Optional[Dict[str, str]]) -> None:
+    record['geo'] = loc
+    ACCESS_LOG.log(record)
+
+
+# 위치 조회는 백그라운드 워커가(응답은 조회를 기다리지 않음). GEO는 --geo로 바뀔 수 있어 호출 시점에 참조
+GEO_LOG = GeoEnricher(lambda ips: GEO.get_locations(ips), write_access)
+
+
+# 서버를 멈출 때: 위치 조회를 기다리던 기록 → 로그 파일 순으로 마저 내보냄
+def close_logs() -> None:
+    GEO_LOG.close()
+    ACCESS_LOG.close()
+
+# 전역 정적 파일 캐시(작은 파일은 바이트/압축본을 메모리에 두고 REVALIDATE_MS마다만 stat)
+STATIC = StaticCache(REVALIDATE_MS)
+# 큰 파일(sendfile 대상)은 열어 둔 파일을 재사용
+FILES = OpenFileCache(MAX_OPEN_FILES)
+
 # HTTP 요청별로 처리 로직 오버라이딩하기 위해 BaseHTTPRequestHandler 상속 받음
 class SimpleHandler(BaseHTTPRequestHandler):
     server_version = 'SpacePirateHTTP/0.1'  # 내 서버가 브라우저한테 응답할 때 보여줄 서버 이름
@@ -109,44 +93,158 @@ class SimpleHandler(BaseHTTPRequestHandler):
     def do_GET(self) -> None:
 		    # 부모 클래스 덕분에 자동으로 내 서버에 접속한 클라이언트의 IP,PORT 튜플 제공받음
         client_ip = self.client_address[0] 
+        # 프록시 뒤라면 프록시가 전달한 실제 클라이언트 IP
+        client_ip = real_client_ip(client_ip, self.headers.get('X-Forwarded-For'), TRUSTED)
         now = datetime.now(timezone.utc).astimezone()  # UTC 기준 현재 시각을 시스템 로컬 타임존으로 환
-        # 위치 정보 조회
-        geo_text = ''
-        # False면 
-        if not is_private_ip(client_ip):
-		        # 실제 조회 호출하고 위치 정보를 가진 dict반환 저장
-            loc = GEO.get_location(client_ip)
-            # 조회 성공 시 로그 문자열 생성
-            if loc:
-                geo_text = f" | Geo: {loc.get('country','')}, {loc.get('region','')}, {loc.get('city','')}"
-
-        # 서버 콘솔에 로그 출력
-        print(f'[{now.isoformat()}] GET {self.path} from {client_ip}{geo_text}', file=sys.stdout, flush=True)
+        started = time.perf_counter()
+        self._status: Optional[int] = None
+        self._body_bytes = 0
+        try:
+            self._route()
+        finally:
+            # 응답을 보낸 뒤에 로그(상태 코드/크기/처리 시간 포함)
+            self._log_access({
+                'time': now,
+                'ip': client_ip,
+                'method': self.command,
+                'path': self.path,
+                'request_line': self.requestline,
+                'status': self._status,
+                'bytes': self._body_bytes,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+                'referer': self.headers.get('Referer'),
+                'user_agent': self.headers.get('User-Agent'),
+            })
 
+    def _route(self) -> None:
+        route = urlsplit(self.path).path  # 쿼리스트링(?v=3 등)은 떼고 경로만
         # 요청 경로가 '/' 또는 '/index.html'이면 index.html 서빙
-        if self.path in ('/', '/index.html'):
+        if route in ('/', '/index.html'):
             self._send_index()
+        # /static/... 은 STATIC_DIR 안의 파일(루트 밖으로 나가는 경로는 404)
+        elif route.startswith(STATIC_PREFIX):
+            path = resolve_static_path(STATIC_DIR, route[len(STATIC_PREFIX):])
+            if path is None:
+                self._send_not_found()
+            else:
+                self._send_static(path)
         else:
             self._send_not_found()
 
+    # 위치 조회가 필요한 접속자인가? (조회는 외부 API 호출이라 느림)
+    def _needs_geo(self, client_ip: str) -> bool:
+        return not isinstance(GEO, NoopProvider) and not is_private_ip(client_ip)
+
+    # 접속 로그 기록. 위치 조회가 필요하면 조회 큐에 넣고 바로 돌아감(위치가 붙은 로그는 조금 뒤에 찍힘)
+    def _log_access(self, record: AccessRecord) -> None:
+        if self._needs_geo(record['ip']):
+            GEO_LOG.submit(record)
+        else:
+            write_access(record, None)
+
+    # 로그에 남길 상태 코드와 본문 크기를 응답 헤더를 보낼 때 같이 기억
+    def send_response(self, code: int, message: Optional[str] = None) -> None:
+        self._status = code
+        super().send_response(code, message)
+
+    def send_header(self, keyword: str, value: str) -> None:
+        if keyword == 'Content-Length':
+            self._body_bytes = int(value)
+        super().send_header(keyword, value)
+
     # 모두 공통 패턴(HTTP 응답 전송)
 
-    # index.html 파일을 읽어서 클라이언트에게 전송하는 정상 응답 전송
+    # index.html 정상 응답 전송
     def _send_index(self) -> None:
-        if not os.path.exists(INDEX_FILE):
-            self._send_not_found()
-            return
+        self._send_static(INDEX_FILE)
 
+    # 정적 파일을 (캐시에서) 꺼내 클라이언트에게 전송
+    def _send_static(self, path: str) -> None:
         try:
-            with open(INDEX_FILE, 'rb') as f:
-                body = f.read()
-            self.send_response(200)  # 상태 코드 전송
-            self.send_header('Content-Type', 'text/html; charset=utf-8') # 헤더 전송
-            self.send_header('Content-Length', str(len(body))) # 헤더 전송
-            self.end_headers()  # 헤더 전송
-            self.wfile.write(body)   # 바디 전송
+            entry = STATIC.get(path)
         except Exception as exc:
             self._send_error(500, f'Internal Server Error: {exc}')
+            return
+        if entry is None:
+            self._send_not_found()
+            return
+
+        # 일부 구간 요청(이어받기, 동영상 탐색 등). If-Range가 현재 파일과 다르면 전체를 보냄
+        range_header = self.headers.get('Range')
+        if range_header and not if_range_matches(self.headers.get('If-Range'), entry.etag, entry.mtime):
+            range_header = None
+
+        # 브라우저가 받아 주는 압축 방식이 있으면 미리 만들어 둔 압축본 사용(구간 요청은 원본 기준)
+        encoding = None
+        if entry.compressible and not range_header:
+            encoding = choose_encoding(self.headers.get('Accept-Encoding'))
+        body, encoding, etag = entry.variant(encoding)
+
+        # 브라우저가 가진 사본이 최신이면 본문 없이 304(전송량 절약)
+        if is_not_modified(etag, entry.mtime, self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since')):
+            self.send_response(304)
+            self._send_validators(entry, etag)
+            self.end_headers()
+            return
+
+        try:
+            byte_range = parse_range(range_header, entry.size)
+        except RangeNotSatisfiable:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{entry.size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        start, end = byte_range if byte_range is not None else (0, entry.size - 1)
+        # 압축본은 원본과 길이가 다름(구간 요청은 항상 원본이라 entry.size 기준이 맞음)
+        length = end - start + 1 if byte_range is not None or body is None else len(body)
+
+        # 큰 파일은 헤더를 보내기 전에 열어 둠(사라졌으면 정상적인 404)
+        handle = None
+        if body is None:
+            try:
+                handle = FILES.acquire(entry.path, entry.version)
+            except OSError:
+                self._send_not_found()
+                return
+
+        self.send_response(206 if byte_range is not None else 200)  # 상태 코드 전송
+        self.send_header('Content-Type', entry.content_type) # 헤더 전송
+        self.send_header('Content-Length', str(length)) # 헤더 전송
+        if byte_range is not None:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{entry.size}')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Accept-Ranges', 'bytes')
+        self._send_validators(entry, etag)
+        self.end_headers()  # 헤더 전송
+        if handle is None:
+            # 바디 전송(메모리에 있는 바이트). 구간이면 그 부분만
+            self.wfile.write(body if byte_range is None else memoryview(body)[start:end + 1])
+        else:
+            self._send_file(handle, start, length)  # 큰 파일은 디스크 → 소켓으로 바로
+
+    # 캐시 검증용 헤더(다음 요청에 If-None-Match / If-Modified-Since로 돌아옴)
+    def _send_validators(self, entry, etag: str) -> None:
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', entry.last_modified)
+        self.send_header('Cache-Control', 'no-cache')  # 쓰기 전에 항상 재검증(HTML이 바로 바뀌어 보이도록)
+        if entry.compressible:
+            self.send_header('Vary', 'Accept-Encoding')  # 중간 캐시가 압축본/원본을 섞어 주지 않도록
+
+    # 파일 내용을 파이썬 bytes로 읽지 않고 커널이 바로 소켓으로 보냄(os.sendfile)
+    # handle은 FILES.acquire로 얻은 것. 다 보내면 돌려줌
+    def _send_file(self, handle, offset: int, count: int) -> None:
+        try:
+            self.connection.sendfile(handle.file, offset, count)
+        except OSError:
+            self.close_connection = True  # 헤더는 이미 나감: 연결을 끊어 잘린 응답임을 알림
+        finally:
+            FILES.release(handle)
+
+    # 다른 엔진(aioserver)이 전송을 끝낸 뒤 파일을 돌려줄 때
+    def _release_file(self, handle) -> None:
+        FILES.release(handle)
 
 		# 404 Not Found 응답 전송
     def _send_not_found(self) -> None:
@@ -177,8 +275,29 @@ class ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
     daemon_threads = True  # ThreadingMixIn이 읽는 설정 플래그. True면 생성되는 작업 스레드들을 데몬 스레드로 만듦
 
 
+# 서버 엔진 종류
+#  - thread : ThreadingMixIn(요청 연결마다 스레드, HTTP/1.0 → 응답마다 연결 종료)
+#  - asyncio: 이벤트 루프 한 스레드로 모든 연결 처리(HTTP/1.1 keep-alive, 파이프라이닝) → aioserver.py
+ENGINES = ('thread', 'asyncio')
+
+
 # 서버 실행 함수
-def run(host: str = HOST, port: int = PORT) -> None:
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def run(host: str = HOST, port: int = PORT, engine: str = 'thread') -> None:
+    # kill(SIGTERM)도 Ctrl+C처럼 정리하고 끝냄(큐에 남은 접속 로그를 잃지 않도록)
+    signal.signal(signal.SIGTERM, _interrupt)
+    if engine == 'asyncio':
+        from aioserver import serve_async  # asyncio 엔진을 쓸 때만 필요
+        print(f'* Serving {INDEX_FILE} at http://{host}:{port} with asyncio engine (Ctrl+C to stop)')
+        try:
+            serve_async(host, port, SimpleHandler)
+        finally:
+            close_logs()
+        return
+
 		# 서버가 바인드할 주소 튜플(현재 '0.0.0.0', 8080)
     server_address = (host, port)
     
@@ -193,6 +312,34 @@ def run(host: str = HOST, port: int = PORT) -> None:
         print('\n* Shutting down...')
     finally:
         httpd.server_close()   # 서버 종료
+        close_logs()           # 아직 못 쓴 접속 로그를 마저 출력
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='index.html 서빙 + 접속 로그 HTTP 서버')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--engine', choices=ENGINES, default='thread',
+                        help='thread: 요청 연결마다 스레드, asyncio: 이벤트 루프(keep-alive/파이프라이닝)')
+    parser.add_argument('--geo', choices=GEO_PROVIDERS, default=GEO_PROVIDER,
+                        help='접속 IP 위치정보 제공자(geodb: 로컬 DB 파일, fake: 네트워크 없이 가짜 위치, 테스트용)')
+    parser.add_argument('--geo-db', default=GEO_DB_FILE, help='--geo geodb일 때 읽을 DB 파일')
+    parser.add_argument('--fake-geo-delay', type=float, default=FAKE_GEO_DELAY_SEC,
+                        help='--geo fake의 조회 지연(초)')
+    parser.add_argument('--no-static-cache', action='store_true',
+                        help='정적 파일을 캐시하지 않고 요청마다 디스크에서 읽음(비교 측정용)')
+    parser.add_argument('--access-log', default=ACCESS_LOG_FILE, help="접속 로그 파일('-'면 콘솔)")
+    parser.add_argument('--log-format', choices=LOG_FORMATS, default=ACCESS_LOG_FORMAT)
+    parser.add_argument('--trusted-proxy', action='append', default=list(TRUSTED_PROXIES), metavar='CIDR',
+                        help='X-Forwarded-For를 믿을 프록시 대역(여러 번 지정 가능)')
+    return parser.parse_args()
+
 
 if __name__ == '__main__':
-    run()
+    args = parse_args()
+    FAKE_GEO_DELAY_SEC = args.fake_geo_delay
+    GEO = make_geo_provider(args.geo, args.geo_db)
+    TRUSTED = CidrMatcher(args.trusted_proxy)
+    ACCESS_LOG = AccessLogger(args.access_log, args.log_format)
+    if args.no_static_cache:
+        STATIC = StaticCache(REVALIDATE_MS, enabled=False)
+    run(args.host, args.port, args.engine)
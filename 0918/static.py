@@ -0,0 +1,317 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional, Sequence, Tuple
+from urllib.parse import unquote
+
+try:
+    import brotli  # 선택 의존성(pip install brotli). 없으면 gzip만 제공
+except ImportError:
+    brotli = None
+
+# ----------------------------
+# 정적 파일 캐시
+# ----------------------------
+# 요청마다 디스크에서 읽지 않고 메모리에 둔 바이트를 그대로 보냄
+#  - 파일이 바뀌었는지는 revalidate_ms마다 한 번만 stat()으로 확인(mtime/inode/크기가 다르면 다시 읽음)
+#  - ETag는 내용 해시(바이트가 같으면 같은 값 → 강한 ETag)
+#  - 조건부 요청(If-None-Match / If-Modified-Since)이 맞으면 본문 없이 304
+#  - 텍스트 계열은 압축본(br/gzip)을 파일 버전마다 처음 요청될 때 한 번만 만들어 둠
+#  - SENDFILE_MIN_BYTES보다 큰 파일은 메모리에 올리지 않고 os.sendfile로 바로 보냄(본문 없음)
+#    이때 쓰는 파일은 열어 둔 채로 재사용(OpenFileCache) → 요청마다 open/close 하지 않음
+#  - URL 경로 → 디스크 경로 변환은 루트 밖으로 나갈 수 없게(.., 심볼릭 링크, 숨김 파일 차단)
+#  - Range 요청(한 구간)은 206, 범위가 파일 밖이면 416
+
+SENDFILE_MIN_BYTES = 64 * 1024   # 이보다 크면 메모리에 캐시하지 않고 sendfile로 전송
+MIN_COMPRESS_BYTES = 256         # 이보다 작으면 압축 이득보다 헤더/CPU 비용이 큼
+
+# 압축해서 줄어드는 형식(이미지/동영상/압축 파일은 제외)
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/xml', 'image/svg+xml')
+
+# 서버가 만들 수 있는 인코딩(선호 순)
+ENCODINGS: Tuple[str, ...] = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def content_type_for(path: str) -> str:
+    ctype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if ctype.startswith('text/') or ctype == 'application/javascript':
+        ctype += '; charset=utf-8'
+    return ctype
+
+
+def _compress(encoding: str, body: bytes) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body)
+    return gzip.compress(body, compresslevel=6, mtime=0)  # mtime=0: 같은 입력이면 같은 출력
+
+
+class CachedFile:
+    __slots__ = ('path', 'body', 'size', 'etag', 'mtime', 'last_modified', 'version',
+                 'content_type', 'compressible', 'checked_at', '_variants')
+
+    def __init__(self, path: str, body: Optional[bytes], st: os.stat_result) -> None:
+        # st는 body를 읽은 그 파일 객체의 fstat(경로로 따로 stat하면 그 사이 바뀐 파일과 섞일 수 있음)
+        self.path = path
+        self.body = body  # 큰 파일은 None(sendfile로 보냄)
+        # Content-Length는 실제로 보낼 바이트 수여야 함(읽는 도중 파일이 커지거나 줄어도 body 기준)
+        self.size = len(body) if body is not None else st.st_size
+        if body is not None:
+            self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        else:
+            # 큰 파일은 전체를 읽어 해시하지 않고 stat 값으로(내용이 바뀌면 mtime/크기가 바뀜)
+            self.etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}-{st.st_ino:x}"'
+        self.mtime = int(st.st_mtime)  # HTTP 날짜는 초 단위
+        self.last_modified = formatdate(st.st_mtime, usegmt=True)
+        self.version = _version(st)
+        self.content_type = content_type_for(path)
+        self.compressible = (body is not None and len(body) >= MIN_COMPRESS_BYTES
+                             and self.content_type.startswith(COMPRESSIBLE_TYPES))
+        self.checked_at = time.monotonic()
+        self._variants: Dict[str, Optional[bytes]] = {}  # 인코딩 → 압축본(이득이 없으면 None)
+
+    def variant(self, encoding: Optional[str]) -> Tuple[Optional[bytes], Optional[str], str]:
+        # (본문, 실제 적용된 인코딩, ETag). 압축본은 처음 요청될 때 한 번만 만듦
+        # 같은 파일 버전이면 다시 압축하지 않음(파일이 바뀌면 CachedFile 자체가 새로 만들어짐)
+        if encoding is None or not self.compressible:
+            return self.body, None, self.etag
+        if encoding not in self._variants:
+            packed = _compress(encoding, self.body)
+            self._variants[encoding] = packed if len(packed) < len(self.body) else None
+        packed = self._variants[encoding]
+        if packed is None:
+            return self.body, None, self.etag
+        # 표현(representation)마다 ETag가 달라야 강한 ETag 규칙에 맞음
+        return packed, encoding, self.etag[:-1] + '-' + encoding + '"'
+
+
+def _version(st: os.stat_result) -> tuple:
+    # 파일이 바뀌었는지 판단하는 값(편집기가 새 파일로 바꿔치기하면 inode가 바뀜)
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+
+class StaticCache:
+    # enabled=False면 캐시하지 않고 요청마다 stat/읽기/해시(비교 측정용, 예전 동작과 같음)
+    def __init__(self, revalidate_ms: float = 1000, enabled: bool = True) -> None:
+        self.revalidate_sec = revalidate_ms / 1000
+        self.enabled = enabled
+        self._entries: Dict[str, CachedFile] = {}
+        self._lock = threading.Lock()  # 같은 파일을 여러 스레드가 동시에 다시 읽지 않도록
+
+    def get(self, path: str) -> Optional[CachedFile]:
+        # 캐시된 파일(없는 파일이면 None). 읽기 실패는 OSError로 올려 보냄
+        if not self.enabled:
+            return self._load(path)
+        entry = self._entries.get(path)
+        if entry is not None and time.monotonic() - entry.checked_at < self.revalidate_sec:
+            return entry  # 확인 주기 안: 디스크를 전혀 건드리지 않음
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and time.monotonic() - entry.checked_at < self.revalidate_sec:
+                return entry  # 기다리는 동안 다른 스레드가 확인함
+            try:
+                st = os.stat(path)
+            except (FileNotFoundError, NotADirectoryError):
+                self._entries.pop(path, None)
+                return None
+            if not stat.S_ISREG(st.st_mode):
+                return None  # 디렉터리/장치 파일 등은 보내지 않음
+            if entry is not None and entry.version == _version(st):
+                entry.checked_at = time.monotonic()
+                return entry
+            entry = _read(path, st)
+            self._entries[path] = entry
+            return entry
+
+    @staticmethod
+    def _load(path: str) -> Optional[CachedFile]:
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return _read(path, st)
+
+
+def _read(path: str, st: os.stat_result) -> CachedFile:
+    # 작은 파일은 열어서 그 파일의 fstat과 내용을 함께 씀(크기/ETag/버전이 같은 시점의 값)
+    if st.st_size >= SENDFILE_MIN_BYTES:
+        return CachedFile(path, None, st)
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        body = f.read()
+    return CachedFile(path, body, st)
+
+
+# sendfile을 지원하지 않는 OS(윈도우)의 socket.sendfile은 seek+read로 대신하므로
+# 여러 요청이 파일 객체 하나를 함께 쓰면 위치가 엉킴 → 그때는 요청마다 새로 엶
+SHARE_FILES = hasattr(os, 'sendfile')
+
+
+class FileHandle:
+    __slots__ = ('file', 'version', 'refs', 'stale')
+
+    def __init__(self, path: str, version: tuple) -> None:
+        self.file = open(path, 'rb')
+        self.version = version
+        self.refs = 0        # 지금 이 파일로 전송 중인 요청 수
+        self.stale = False   # 캐시에서 빠짐(전송이 모두 끝나면 닫음)
+
+
+class OpenFileCache:
+    # 큰 파일 전송용으로 열어 둔 파일들(LRU, 최대 max_open개)
+    # os.sendfile은 위치(offset)를 직접 넘기므로 여러 연결이 같은 파일 객체를 동시에 써도 안전
+    def __init__(self, max_open: int = 64) -> None:
+        self.max_open = max_open
+        self._handles: 'OrderedDict[str, FileHandle]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, path: str, version: tuple) -> FileHandle:
+        # 다 쓰면 반드시 release()
+        if not SHARE_FILES:
+            handle = FileHandle(path, version)
+            handle.refs = 1
+            handle.stale = True  # 캐시하지 않음: release 때 바로 닫힘
+            return handle
+        with self._lock:
+            handle = self._handles.get(path)
+            if handle is not None and handle.version != version:
+                self._retire(self._handles.pop(path))  # 파일이 바뀜: 새로 열어야 함
+                handle = None
+            if handle is None:
+                handle = FileHandle(path, version)
+                self._handles[path] = handle
+                while len(self._handles) > self.max_open:
+                    self._retire(self._handles.popitem(last=False)[1])
+            else:
+                self._handles.move_to_end(path)
+            handle.refs += 1
+            return handle
+
+    def release(self, handle: FileHandle) -> None:
+        with self._lock:
+            handle.refs -= 1
+            if handle.stale and handle.refs == 0:
+                handle.file.close()
+
+    @staticmethod
+    def _retire(handle: FileHandle) -> None:
+        # 캐시에서 뺀 파일: 전송 중인 요청이 없으면 바로 닫고, 있으면 마지막 release 때 닫음
+        handle.stale = True
+        if handle.refs == 0:
+            handle.file.close()
+
+
+def resolve_static_path(root: str, url_path: str) -> Optional[str]:
+    # URL 경로(접두사 뒤 부분)를 root 안의 실제 파일 경로로. 밖으로 나가거나 수상하면 None
+    # 요청마다 realpath를 다시 함(결과를 기억해 두면, 나중에 그 자리에 생긴 심볼릭 링크가 루트 밖을 가리켜도 못 막음)
+    path = unquote(url_path)
+    if '\0' in path or '\\' in path:
+        return None
+    parts = [part for part in path.split('/') if part and part != '.']
+    if any(part == '..' or part.startswith('.') for part in parts):
+        return None  # 상위 디렉터리 이동, 숨김 파일(.git, .env 등)은 거부
+    if not parts or path.endswith('/'):
+        parts.append('index.html')  # 디렉터리 요청은 그 안의 index.html
+    real_root = os.path.realpath(root)
+    real = os.path.realpath(os.path.join(real_root, *parts))
+    if not real.startswith(real_root + os.sep):
+        return None  # 심볼릭 링크로 루트 밖을 가리킴
+    return real
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    # Range 헤더에서 (시작, 끝) 바이트 위치(끝 포함). 무시해야 하면 None(→ 200 전체)
+    # 범위가 파일 밖이면 RangeNotSatisfiable(→ 416). 여러 구간 요청은 전체로 응답(RFC 7233에서 허용)
+    if not header or not header.startswith('bytes='):
+        return None
+    spec = header[len('bytes='):].strip()
+    if ',' in spec:
+        return None
+    first, sep, last = spec.partition('-')
+    if not sep:
+        return None
+    try:
+        suffix = int(last) if not first else None  # bytes=-500 → 마지막 500바이트
+        start = int(first) if first else 0
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None  # 형식이 틀린 헤더는 무시
+    if suffix is not None:
+        if suffix < 0:
+            return None
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable(spec)
+        return max(0, size - suffix), size - 1
+    if start >= size:
+        raise RangeNotSatisfiable(spec)
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def if_range_matches(if_range: Optional[str], etag: str, mtime: int) -> bool:
+    # If-Range가 없거나 현재 파일과 같으면 True(→ Range 적용). 다르면 전체를 새로 받아야 함
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"'):
+        return if_range == etag  # 강한 비교
+    try:
+        since = parsedate_to_datetime(if_range)
+    except (TypeError, ValueError):
+        return False
+    return since is not None and since.tzinfo is not None and since.timestamp() == mtime
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Sequence[str] = ENCODINGS) -> Optional[str]:
+    # Accept-Encoding(예: "gzip, deflate, br;q=0.9")에서 서버가 가진 것 중 가장 선호되는 인코딩
+    # q가 같으면 서버 선호 순(available 순서). 받아 주는 것이 없으면 None(압축 안 함)
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_not_modified(etag: str, mtime: int, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    # 클라이언트가 가진 사본이 최신이면 True(→ 304)
+    if if_none_match is not None:
+        # If-None-Match가 있으면 If-Modified-Since는 보지 않음(RFC 7232). GET은 약한 비교
+        if if_none_match.strip() == '*':
+            return True
+        tags = (tag.strip() for tag in if_none_match.split(','))
+        return any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in tags)
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False  # 날짜 형식이 틀리면 무시하고 200
+        if since is None or since.tzinfo is None:
+            return False
+        return mtime <= since.timestamp()
+    return False
@@ -0,0 +1,123 @@
+import argparse
+import glob
+import os
+import time
+from typing import Callable, Dict, List, Set
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from crawling_KBS import BASE_URL, HEADLINE_EXTRACTOR, HEADLINE_SELECTORS, _clean_text
+
+# 헤드라인 추출 벤치마크(네트워크 없이 저장된 페이지로)
+#  - legacy : 선택자마다 soup.select 두 번 + 제목마다 find_parent/find_previous/find_next(예전 get_kbs_headlines)
+#  - single : 미리 컴파일한 선택자로 문서를 한 번만 순회(현재 HeadlineExtractor)
+# 파싱은 파일마다 한 번만 하고 추출만 잼. 두 구현의 결과(순서까지)가 같은지 먼저 확인
+#
+#   python bench_headlines.py                       # fixtures/*.html
+#   python bench_headlines.py saved_kbs_main.html   # 브라우저로 저장한 실제 페이지
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def legacy_extract(soup: BeautifulSoup) -> List[Dict[str, str]]:
+    # 예전 get_kbs_headlines 본문 그대로(페이지를 받아 파싱하는 부분만 빼고 soup을 인자로)
+    # 최종 결과를 담을 리스트
+    results: List[Dict[str, str]] = []
+    # 제목 기준 중복 제거(동일 카드가 여러 선택자에 걸릴 수 있음)
+    seen_titles: Set[str] = set()
+
+    # 제목/링크를 정제하고 중복 없이 결과에 추가
+    def add_item(title_text: str, href: str) -> None:
+        # 헬퍼 사용
+        title = _clean_text(title_text)
+        # 상대경로 href 를 절대 URL 로 바꿈
+        url = urljoin(BASE_URL, href or '')
+
+        # 없으면 스킵
+        if not title or not url:
+            return
+        # 이미 본 제목이면 스킵
+        if title in seen_titles:
+            return
+        # 중복 집합에 등록하고, 결과 리스트에 dict로 추가
+        seen_titles.add(title)
+        results.append({'title': title, 'url': url})
+
+    # 각 섹션별로 링크 → 제목 혹은 제목 → 링크 순으로 탐색하여 누락을 줄인다.
+    for title_sel, link_sel in HEADLINE_SELECTORS:
+        # (A) 링크 목록을 먼저 순회하면서 제목을 찾는 방식
+        # CSS 선택자로 링크 후보를 모두 찾음
+        for link in soup.select(link_sel):
+            # title_sel 전체를 쓰면 컨텍스트가 달라 빗나갈 수 있어, 가장 마지막 토큰만 탐색
+            # (몇몇 구조에서 상위/형제에 p.title이 붙는 경우가 있어 보수적으로 접근)
+            last_token = title_sel.split()[-1]  # 예: 'p.title.normal-weight'
+            # select_one은 첫 번째 일치 요소만 반환
+            title_tag = link.select_one(last_token)
+
+            # 못 찾았으면 대체 후보(흔한 제목 태그)로 한 번 더 시도.
+            if not title_tag:
+                title_tag = link.select_one('p.title') or link.select_one('p.news-txt')
+
+            if title_tag and link.get('href'):
+                add_item(title_tag.get_text(strip=True), link.get('href'))
+
+        # (B) 반대로 제목을 먼저 순회하면서 인접한 링크를 추정하는 방식(보조)
+        for title_tag in soup.select(title_sel):
+            # 같은 카드 내부 혹은 부모/형제에서 a 태그를 찾는다.
+            link_tag = (
+                # 부모 방향으로 가장 가까운 <a>
+                title_tag.find_parent('a') or
+                # 이전 형제/조상 방향
+                title_tag.find_previous('a') or
+                # 다음 형제/자손 방향
+                title_tag.find_next('a')
+            )
+            if link_tag and link_tag.get('href'):
+                add_item(title_tag.get_text(strip=True), link_tag.get('href'))
+
+    return results
+
+
+def current_extract(soup: BeautifulSoup) -> List[Dict[str, str]]:
+    # 링크는 예전과 같이 BASE_URL 기준(get_kbs_headlines가 메인 페이지 주소에서 구하는 사이트 주소)
+    return HEADLINE_EXTRACTOR.extract(soup, BASE_URL)
+
+
+def measure(fn: Callable[[BeautifulSoup], List[Dict[str, str]]], soup: BeautifulSoup, repeat: int) -> float:
+    # 가장 빠른 회차 기준 호출당 밀리초
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(soup)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='헤드라인 추출 예전/현재 구현 비교')
+    parser.add_argument('pages', nargs='*', help='HTML 파일(기본: fixtures/*.html)')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = args.pages or sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html')))
+    if not pages:
+        raise SystemExit('HTML 파일이 없음')
+    for path in pages:
+        with open(path, 'rb') as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+        expected = legacy_extract(soup)
+        actual = current_extract(soup)
+        if actual != expected:
+            diff = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), min(len(expected), len(actual)))
+            raise SystemExit(f'{path}: 결과가 다름({len(expected)}개 vs {len(actual)}개, {diff}번째부터)')
+
+        legacy = measure(legacy_extract, soup, args.repeat)
+        single = measure(current_extract, soup, args.repeat)
+        print(f'{os.path.basename(path)}: {len(expected)} headlines, {len(soup.find_all(True))} tags, best of {args.repeat}')
+        print(f'  legacy: {legacy:8.2f} ms/page')
+        print(f'  single: {single:8.2f} ms/page  (x{legacy / single:.1f})')
+
+
+if __name__ == '__main__':
+    main()
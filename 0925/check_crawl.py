@@ -0,0 +1,91 @@
+import argparse
+from typing import Optional
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import crawling_KBS
+from crawling_KBS import crawl_kbs_articles, get_kbs_headlines
+from fixture_server import start_fixture_server
+from parsers import Document, ParserBackend, available_parsers, get_parser
+
+# 크롤러 모드 회귀 검사(fixture_server를 띄워 로컬에서)
+#  - 기사 하나가 파싱에 실패해도(파서 오류) 그 기사만 error로 남고 나머지 기사는 모두 수집돼야 함
+#  - 결과 순서는 헤드라인 순서 그대로
+#  - 헤드라인의 기사 링크(경로 상대 href 포함)가 모두 실제 기사 주소로 풀림
+# 실패하면 종료 코드 1
+#
+#   python check_crawl.py
+#   python check_crawl.py --parser selectolax
+
+
+class BrokenArticleBackend:
+    # 지정한 기사 페이지만 파싱 오류를 내는 백엔드(나머지는 실제 백엔드에 그대로 넘김)
+    def __init__(self, inner: ParserBackend, broken_ncd: str) -> None:
+        self.inner = inner
+        self.name = inner.name
+        self.marker = f'기사 {broken_ncd}<'.encode('utf-8')  # fixture_server.article_html의 제목
+
+    def parse(self, content: bytes, encoding: Optional[str] = None) -> Document:
+        if self.marker in content:
+            raise ValueError('broken fixture article')
+        return self.inner.parse(content, encoding)
+
+    def __getattr__(self, name: str):
+        return getattr(self.inner, name)
+
+
+def check_parser(parser: str, main_url: str) -> list:
+    failures = []
+    headlines = get_kbs_headlines(main_url, parser=parser)
+    # 기준: 아무것도 망가뜨리지 않고 한 번(기사가 아닌 링크는 원래 404로 실패)
+    expected = crawl_kbs_articles(main_url, max_workers=4, per_host=4, delay=0.0, parser=parser)
+    # 기사 링크는 모두 받아져야 함(경로 상대 링크도 예전처럼 사이트 루트 기준으로 풀려야 /news/view.do)
+    lost = [a['url'] for a in expected if 'error' in a and 'ncd=' in a['url']]
+    if lost:
+        failures.append(f'[{parser}] article links not fetched: {lost[:3]}')
+    candidates = [a for a in expected if 'error' not in a and 'ncd=' in a['url']]
+    if len(candidates) < 3:
+        return [f'[{parser}] too few articles: {len(candidates)}']
+    broken = candidates[1]
+    broken_ncd = parse_qs(urlsplit(broken['url']).query)['ncd'][0]
+    backend = BrokenArticleBackend(get_parser(parser), broken_ncd)
+
+    with mock.patch.object(crawling_KBS, 'get_parser', lambda name=None: backend):
+        articles = crawl_kbs_articles(main_url, max_workers=4, per_host=4, delay=0.0, parser=parser)
+
+    if [a['url'] for a in articles] != [h['url'] for h in headlines]:
+        failures.append(f'[{parser}] {len(articles)} articles for {len(headlines)} headlines (or out of order)')
+    failed = [a for a in articles if 'error' in a]
+    want = [a['url'] for a in expected if 'error' in a or a['url'] == broken['url']]
+    if [a['url'] for a in failed] != want:
+        failures.append(f'[{parser}] failed articles: {[a["url"] for a in failed]} (expected {want})')
+    others = [a for a in articles if a['url'] != broken['url']]
+    if others != [a for a in expected if a['url'] != broken['url']]:
+        failures.append(f'[{parser}] other articles differ from an undisturbed crawl')
+    error = next((a['error'] for a in failed if a['url'] == broken['url']), '-')
+    print(f'{parser}: {len(articles)} articles, {len(failed)} failed (broken one: {error})')
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='크롤러 모드 회귀 검사(기사 하나의 파싱 실패)')
+    parser.add_argument('--parser', action='append', help='검사할 파서(기본: 설치된 전부)')
+    args = parser.parse_args()
+
+    server = start_fixture_server()
+    failures = []
+    try:
+        for name in args.parser or available_parsers():
+            failures += check_parser(name, server.main_url)
+    finally:
+        server.shutdown()
+
+    if failures:
+        for failure in failures:
+            print(f'  FAIL {failure}')
+        raise SystemExit(1)
+    print('* crawl checks passed')
+
+
+if __name__ == '__main__':
+    main()
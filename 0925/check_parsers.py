@@ -0,0 +1,121 @@
+import argparse
+import glob
+import os
+import time
+from typing import Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+from bench_headlines import legacy_extract
+from crawling_KBS import (ARTICLE_BODY_SELECTORS, ARTICLE_DATE_SELECTORS, BASE_URL, HEADLINE_EXTRACTOR,
+                          _select_text)
+from fixture_server import article_html
+from parsers import available_parsers, get_parser
+
+# 파서 백엔드 일치 검사(네트워크 없이 저장된 페이지로)
+#  - 기준: html.parser로 파싱 + 예전 get_kbs_headlines 방식(bench_headlines.legacy_extract)
+#  - 설치된 백엔드마다 같은 바이트를 파싱해 헤드라인 목록(순서까지)과 기사 본문/입력 시각이 같은지 확인
+#  - 헤더 charset이 알 수 없는 이름일 때도 백엔드마다 오류 없이 같은 결과인지 확인
+#  - 하나라도 다르면 종료 코드 1. 같으면 백엔드별 파싱+추출 시간을 보여 줌
+#
+#   python check_parsers.py                        # fixtures/*.html + 거기 나온 기사 페이지
+#   python check_parsers.py saved_kbs_main.html    # 브라우저로 저장한 실제 페이지
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+UNKNOWN_CHARSET = 'x-bogus-charset'  # Content-Type에 잘못 적힌 charset 흉내
+
+
+def article_pages(headlines: List[Dict[str, str]]) -> Dict[str, bytes]:
+    # 헤드라인이 가리키는 기사 번호로 fixture_server와 같은 기사 페이지를 만듦
+    pages = {}
+    for item in headlines:
+        ncd = parse_qs(urlsplit(item['url']).query).get('ncd')
+        if ncd:
+            pages[f'article {ncd[0]}'] = article_html(ncd[0]).encode('utf-8')
+    return pages
+
+
+def check_page(name: str, content: bytes, parsers: List[str]) -> List[Dict[str, str]]:
+    reference = get_parser('html.parser')
+    expected = legacy_extract(reference.parse(content))
+    failed = False
+    for parser in parsers:
+        backend = get_parser(parser)
+        actual = HEADLINE_EXTRACTOR.extract(backend.parse(content), BASE_URL, backend)
+        if actual != expected:
+            failed = True
+            missing = [item for item in expected if item not in actual]
+            extra = [item for item in actual if item not in expected]
+            print(f'  FAIL {name} [{parser}]: {len(expected)} vs {len(actual)} headlines, '
+                  f'missing {missing[:3]}, extra {extra[:3]}')
+    if failed:
+        raise SystemExit(1)
+    return expected
+
+
+def check_charset(name: str, content: bytes, parsers: List[str], expected: List[Dict[str, str]]) -> None:
+    # 응답 헤더의 charset이 파이썬이 모르는 이름이어도 모든 백엔드가 헤더 없을 때와 같게 파싱
+    for parser in parsers:
+        backend = get_parser(parser)
+        try:
+            actual = HEADLINE_EXTRACTOR.extract(backend.parse(content, UNKNOWN_CHARSET), BASE_URL, backend)
+        except LookupError as e:
+            print(f'  FAIL {name} [{parser}] charset={UNKNOWN_CHARSET}: {e}')
+            raise SystemExit(1)
+        if actual != expected:
+            print(f'  FAIL {name} [{parser}] charset={UNKNOWN_CHARSET}: {len(actual)} vs {len(expected)} headlines')
+            raise SystemExit(1)
+
+
+def check_article(name: str, content: bytes, parsers: List[str]) -> None:
+    reference = get_parser('html.parser')
+    ref_doc = reference.parse(content)
+    expected = [_select_text(ref_doc, selectors, reference) for selectors in (ARTICLE_DATE_SELECTORS, ARTICLE_BODY_SELECTORS)]
+    for parser in parsers:
+        backend = get_parser(parser)
+        doc = backend.parse(content)
+        actual = [_select_text(doc, selectors, backend) for selectors in (ARTICLE_DATE_SELECTORS, ARTICLE_BODY_SELECTORS)]
+        if actual != expected:
+            print(f'  FAIL {name} [{parser}]: {actual[0]!r} / {actual[1][:60]!r}...')
+            raise SystemExit(1)
+
+
+def measure(parser: str, content: bytes, repeat: int) -> float:
+    # 파싱 + 헤드라인 추출, 가장 빠른 회차 기준 밀리초
+    backend = get_parser(parser)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        HEADLINE_EXTRACTOR.extract(backend.parse(content), BASE_URL, backend)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='HTML 파서 백엔드별 결과 일치 검사')
+    parser.add_argument('pages', nargs='*', help='메인 페이지 HTML 파일(기본: fixtures/*.html)')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    parsers = list(available_parsers())
+    print(f'* parsers: {", ".join(parsers)}')
+    pages = args.pages or sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html')))
+    if not pages:
+        raise SystemExit('HTML 파일이 없음')
+    for path in pages:
+        with open(path, 'rb') as f:
+            content = f.read()
+        headlines = check_page(os.path.basename(path), content, parsers)
+        check_charset(os.path.basename(path), content, parsers, headlines)
+        articles = article_pages(headlines)
+        for name, article in articles.items():
+            check_article(name, article, parsers)
+        print(f'{os.path.basename(path)}: {len(headlines)} headlines and {len(articles)} articles identical, '
+              f'parse+extract best of {args.repeat}')
+        baseline = measure('html.parser', content, args.repeat)
+        for name in parsers:
+            elapsed = measure(name, content, args.repeat)
+            print(f'  {name:<11}: {elapsed:8.2f} ms/page  (x{baseline / elapsed:.1f})')
+
+
+if __name__ == '__main__':
+    main()
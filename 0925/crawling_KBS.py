@@ -1,8 +1,15 @@
-from typing import Dict, List, Set, Tuple
-from urllib.parse import urljoin
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
 from pprint import pprint
+import argparse
+import threading
+import time
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from parsers import PARSERS, Document, Node, ParserBackend, Selector, get_parser
 
 
 BASE_URL: str = 'https://news.kbs.co.kr'
@@ -29,6 +36,29 @@ HEADLINE_SELECTORS: List[Tuple[str, str]] = [
     ('a.box-content p.title', 'a.box-content[href*="/news/view.do"]'),
 ]
 
+# 기사 페이지의 본문/입력 시각 선택자(위에서부터 먼저 찾은 것 사용)
+ARTICLE_BODY_SELECTORS: List[str] = ['#cont_newstext', 'div.detail-body', 'article']
+ARTICLE_DATE_SELECTORS: List[str] = ['em.input-date', 'span.input-date']
+
+# 기사 수집(크롤러 모드) 기본값
+MAX_WORKERS = 8          # 동시에 받는 기사 수(스레드 수)
+PER_HOST_LIMIT = 4       # 한 호스트에 동시에 보내는 요청 수 상한
+POLITENESS_DELAY = 0.2   # 같은 호스트에 요청을 시작하는 최소 간격(초). 서버에 부담을 주지 않도록
+# 기사 하나만 실패로 남기고 넘어갈 오류(네트워크 오류 + 파싱/디코딩 오류, 예: 알 수 없는 charset)
+ARTICLE_ERRORS = (requests.RequestException, LookupError, ValueError, UnicodeError)
+
+# HTML 파서(parsers.py). auto = 설치된 것 중 가장 빠른 것(selectolax → lxml → html.parser)
+PARSER = 'auto'
+
+# 서버에 '나는 누구다' 라고 보낼 값.
+# 크롤링 할거니까 실제 브라우저 처럼 보이게끔 UA넣을거임.
+# 너무 쉽게 하면 봇이라고 간주당함.
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+    'AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/120.0.0.0 Safari/537.36'
+)
+
 
 
 # 공백 문자 제거 후 문자열만 리스트에 저장
@@ -38,91 +68,276 @@ def _clean_text(text: str) -> str:
 
 
 
-# URL → BeautifulSoup 객체 변환기
-def _fetch_soup(url: str) -> BeautifulSoup:
-    # HTTP 요청에 같이 보낼 헤더 정보를 담은 딕셔너리
-    headers = {
-        # 서버에 '나는 누구다' 라고 보낼 값.
-        # 크롤링 할거니까 실제 브라우저 처럼 보이게끔 UA넣을거임.
-        # 너무 쉽게 하면 봇이라고 간주당함.
-        'User-Agent': (
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-            'AppleWebKit/537.36 (KHTML, like Gecko) '
-            'Chrome/120.0.0.0 Safari/537.36'
-        )
-    }
+# 연결을 재사용하는 세션(요청마다 TCP/TLS 연결을 새로 맺지 않음)
+# 스레드 여러 개가 같이 써도 되도록 연결 풀 크기를 스레드 수에 맞춤
+def make_session(pool_size: int = MAX_WORKERS) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # HTTP 요청에 같이 보낼 헤더 정보(모든 요청에 공통)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+# 따로 세션을 넘기지 않은 요청들이 함께 쓰는 기본 세션
+def _default_session() -> requests.Session:
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = make_session()
+        return _SESSION
+
+
+# HEADLINE_SELECTORS 전체를 문서 한 번 순회로 처리하는 추출기
+# 예전 방식(선택자마다 soup.select를 두 번 = 문서 전체를 약 10번 순회)과 결과가 같도록
+#  1) 순회하며 각 노드가 어느 (선택자 번호, 링크/제목) 규칙에 맞는지 기록 + 문서 순서 위치와 직전 <a>를 같이 기록
+#  2) 기록을 (선택자 번호, 링크 먼저/제목 나중, 문서 순서)로 정렬 → 예전 반복문이 만나던 순서 그대로
+#  3) 그 순서로 제목/링크를 찾아 중복 없이 결과에 추가(먼저 나온 제목이 이김)
+# find_previous('a')는 "문서 순서로 직전 <a>", find_next('a')는 "다음 <a>"와 같음(순회 중에 함께 구함)
+# 문서는 parsers.py의 어느 백엔드로 만든 것이든 됨(선택자는 백엔드별로 한 번씩만 컴파일)
+class HeadlineExtractor:
+    def __init__(self, selectors: List[Tuple[str, str]] = HEADLINE_SELECTORS) -> None:
+        self.selectors = list(selectors)
+        self._compiled: Dict[str, tuple] = {}  # 백엔드 이름 → _compile 결과
+
+    def _compile(self, backend: ParserBackend) -> tuple:
+        compiled = self._compiled.get(backend.name)
+        if compiled is None:
+            rules: List[Selector] = []
+            # 태그 이름 → 확인할 (선택자 번호, 0=링크 / 1=제목, 선택자). 이름을 모르는 선택자는 None 아래
+            by_name: Dict[Optional[str], List[Tuple[int, int, Selector]]] = {}
+            for index, (title_sel, link_sel) in enumerate(self.selectors):
+                title, link = backend.compile(title_sel), backend.compile(link_sel)
+                # title_sel 전체를 쓰면 컨텍스트가 달라 빗나갈 수 있어, 링크 안에서는 가장 마지막 토큰만 탐색
+                rules.append(backend.compile(title_sel.split()[-1]))
+                by_name.setdefault(link.name, []).append((index, 0, link))
+                by_name.setdefault(title.name, []).append((index, 1, title))
+            # 못 찾았으면 대체 후보(흔한 제목 태그)로 한 번 더 시도
+            fallbacks = [backend.compile('p.title'), backend.compile('p.news-txt')]
+            compiled = self._compiled[backend.name] = (rules, by_name, fallbacks)
+        return compiled
+
+    def extract(self, doc: Document, base_url: str, backend: Optional[ParserBackend] = None) -> List[Dict[str, str]]:
+        backend = backend or get_parser('html.parser')
+        rules, by_name, fallbacks = self._compile(backend)
+        hits: List[Tuple[int, int, int, Node, Optional[Node]]] = []  # (선택자 번호, 링크/제목, 위치, 노드, 직전 <a>)
+        anchor_pos: List[int] = []   # 문서 순서의 모든 <a> 위치(find_next용)
+        anchors: List[Node] = []
+        last_anchor: Optional[Node] = None
+        any_name = by_name.get(None, [])
+        tag_name = backend.tag_name
+        pos = 0
+        for node in backend.iter_tags(doc):
+            pos += 1
+            name = tag_name(node)
+            for candidates in (by_name.get(name), any_name):
+                for index, kind, selector in candidates or ():
+                    if selector.match(node):
+                        hits.append((index, kind, pos, node, last_anchor))
+            if name == 'a':
+                anchor_pos.append(pos)
+                anchors.append(node)
+                last_anchor = node
+        hits.sort(key=lambda hit: hit[:3])
+
+        # 최종 결과를 담을 리스트
+        results: List[Dict[str, str]] = []
+        # 제목 기준 중복 제거(동일 카드가 여러 선택자에 걸릴 수 있음)
+        seen_titles: Set[str] = set()
+        texts: Dict[int, str] = {}  # 같은 제목 노드가 여러 규칙에 걸리면 텍스트는 한 번만 추출
+
+        def text_of(tag: Node) -> str:
+            key = backend.node_id(tag)
+            if key not in texts:
+                texts[key] = backend.text(tag, strip=True)
+            return texts[key]
+
+        # 제목/링크를 정제하고 중복 없이 결과에 추가
+        def add_item(title_text: str, href: str) -> None:
+            title = _clean_text(title_text)
+            # 상대경로 href 를 절대 URL 로 바꿈(사이트 주소 기준. KBS면 BASE_URL)
+            url = urljoin(base_url, href or '')
+            # 없거나 이미 본 제목이면 스킵
+            if not title or not url or title in seen_titles:
+                return
+            seen_titles.add(title)
+            results.append({'title': title, 'url': url})
+
+        for index, kind, pos, node, previous_anchor in hits:
+            if kind == 0:
+                # (A) 링크 → 링크 안의 제목
+                title_tag = rules[index].select_one(node)
+                if title_tag is None:
+                    title_tag = fallbacks[0].select_one(node)
+                if title_tag is None:
+                    title_tag = fallbacks[1].select_one(node)
+                href = backend.attr(node, 'href')
+                if title_tag is not None and href:
+                    add_item(text_of(title_tag), href)
+            else:
+                # (B) 제목 → 부모 방향으로 가장 가까운 <a>, 없으면 문서 순서로 직전 <a>, 그것도 없으면 다음 <a>
+                link_tag = backend.find_parent(node, 'a')
+                if link_tag is None:
+                    link_tag = previous_anchor
+                if link_tag is None:
+                    i = bisect_right(anchor_pos, pos)
+                    link_tag = anchors[i] if i < len(anchors) else None
+                href = backend.attr(link_tag, 'href') if link_tag is not None else None
+                if href:
+                    add_item(text_of(node), href)
+        return results
+
+
+# 선택자는 한 번만 컴파일
+HEADLINE_EXTRACTOR = HeadlineExtractor(HEADLINE_SELECTORS)
+
+
+
+# 응답 헤더 Content-Type에 적힌 charset(없으면 None)
+# requests는 charset이 없으면 ISO-8859-1로 가정하지만, 그러면 한글이 깨지므로 파서가 <meta charset>을 보게 둠
+def _header_charset(resp: requests.Response) -> Optional[str]:
+    for param in resp.headers.get('Content-Type', '').split(';')[1:]:
+        key, _, value = param.partition('=')
+        if key.strip().lower() == 'charset':
+            return value.strip().strip('"\'') or None
+    return None
+
+
+# URL → 파싱된 문서(백엔드는 parsers.py)
+def _fetch_document(url: str, session: Optional[requests.Session] = None,
+                    backend: Optional[ParserBackend] = None) -> Document:
+    session = session or _default_session()
+    backend = backend or get_parser(PARSER)
     # HTTP GET 요청을 보내고 응답을 resp에 담음
-    resp = requests.get(url, headers=headers, timeout=10) # 서버 응답이 10초 안에 없으면 에러 발생(무한 대기 방지)
+    resp = session.get(url, timeout=10) # 서버 응답이 10초 안에 없으면 에러 발생(무한 대기 방지)
     # resp의 상태 코드가 200이 아니면 에러 내서 멈추게 함
     resp.raise_for_status()
-    # 응답 본문을 문자열로 꺼내고,파이썬 내장 HTML 파서 사용하여 객체 생성
-    return BeautifulSoup(resp.text, 'html.parser')
+    # 본문 바이트를 그대로 파서에 넘김(resp.text처럼 문서 전체를 미리 문자열로 바꾸지 않음)
+    return backend.parse(resp.content, _header_charset(resp))
+
 
 
+# 메인 페이지 주소 → 사이트 주소(scheme://host). 상대경로 링크는 예전처럼 여기에 붙임
+# (KBS면 BASE_URL. 'view.do?..' 같은 경로 상대 링크도 메인 페이지 폴더가 아니라 사이트 루트 기준)
+def _site_url(main_url: str) -> str:
+    parts = urlsplit(main_url)
+    return f'{parts.scheme}://{parts.netloc}'
+
 
 # KBS 메인 페이지에서 가능한 많은 헤드라인(제목/URL)을 수집해 리스트로 반환
-def get_kbs_headlines() -> List[Dict[str, str]]:
-    # 방금 만든 헬퍼로 bs객체 얻음
-    soup = _fetch_soup(MAIN_URL)
-    # 최종 결과를 담을 리스트
-    results: List[Dict[str, str]] = []
-    # 제목 기준 중복 제거(동일 카드가 여러 선택자에 걸릴 수 있음)
-    seen_titles: Set[str] = set()  
-
-    # 제목/링크를 정제하고 중복 없이 결과에 추가
-    def add_item(title_text: str, href: str) -> None:
-        # 헬퍼 사용
-        title = _clean_text(title_text)
-        # 상대경로 href 를 절대 URL 로 바꿈
-        url = urljoin(BASE_URL, href or '')
-
-        # 없으면 스킵
-        if not title or not url:
-            return
-        # 이미 본 제목이면 스킵
-        if title in seen_titles:
-            return
-        # 중복 집합에 등록하고, 결과 리스트에 dict로 추가
-        seen_titles.add(title)
-        results.append({'title': title, 'url': url})
-
-    # 각 섹션별로 링크 → 제목 혹은 제목 → 링크 순으로 탐색하여 누락을 줄인다.
-    for title_sel, link_sel in HEADLINE_SELECTORS:
-        # (A) 링크 목록을 먼저 순회하면서 제목을 찾는 방식
-        # CSS 선택자로 링크 후보를 모두 찾음
-        for link in soup.select(link_sel):
-            # title_sel 전체를 쓰면 컨텍스트가 달라 빗나갈 수 있어, 가장 마지막 토큰만 탐색
-            # (몇몇 구조에서 상위/형제에 p.title이 붙는 경우가 있어 보수적으로 접근)
-            last_token = title_sel.split()[-1]  # 예: 'p.title.normal-weight'
-            # select_one은 첫 번째 일치 요소만 반환
-            title_tag = link.select_one(last_token)
-
-            # 못 찾았으면 대체 후보(흔한 제목 태그)로 한 번 더 시도.
-            if not title_tag:
-                title_tag = link.select_one('p.title') or link.select_one('p.news-txt')
-
-            if title_tag and link.get('href'):
-                add_item(title_tag.get_text(strip=True), link.get('href'))
-
-        # (B) 반대로 제목을 먼저 순회하면서 인접한 링크를 추정하는 방식(보조)
-        for title_tag in soup.select(title_sel):
-            # 같은 카드 내부 혹은 부모/형제에서 a 태그를 찾는다.
-            link_tag = (
-                # 부모 방향으로 가장 가까운 <a>
-                title_tag.find_parent('a') or
-                # 이전 형제/조상 방향
-                title_tag.find_previous('a') or
-                # 다음 형제/자손 방향
-                title_tag.find_next('a')
-            )
-            if link_tag and link_tag.get('href'):
-                add_item(title_tag.get_text(strip=True), link_tag.get('href'))
-
-    return results
+# main_url을 바꾸면 다른 주소(예: fixture_server.py)의 같은 구조 페이지에서 수집
+def get_kbs_headlines(main_url: str = MAIN_URL, session: Optional[requests.Session] = None,
+                      parser: Optional[str] = None) -> List[Dict[str, str]]:
+    backend = get_parser(parser or PARSER)
+    # 방금 만든 헬퍼로 문서 객체 얻음
+    doc = _fetch_document(main_url, session, backend)
+    return HEADLINE_EXTRACTOR.extract(doc, _site_url(main_url), backend)
+
+
+
+# 호스트별 동시 요청 수 제한 + 요청 시작 간격(politeness delay)
+class HostLimiter:
+    def __init__(self, per_host: int = PER_HOST_LIMIT, delay: float = POLITENESS_DELAY) -> None:
+        self.per_host = per_host
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}  # 호스트 → 다음 요청을 시작해도 되는 시각
+
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._slots[host]
+
+    def _wait_turn(self, host: str) -> None:
+        # 시작 시각을 미리 예약해 두고 그때까지 잠듦(여러 스레드가 동시에 와도 delay 간격으로 줄 섬)
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+    def fetch(self, url: str, session: requests.Session, backend: ParserBackend) -> Document:
+        host = urlsplit(url).netloc
+        with self._slot(host):
+            self._wait_turn(host)
+            return _fetch_document(url, session, backend)
+
+
+# 선택자 목록에서 처음 찾은 요소의 텍스트(공백 정리)
+def _select_text(doc: Document, selectors: List[str], backend: ParserBackend, separator: str = ' ') -> str:
+    for selector in selectors:
+        tag = backend.select_one(doc, selector)
+        if tag is not None:
+            return _clean_text(backend.text(tag, separator))
+    return ''
+
+
+# 기사 한 건: 헤드라인 정보에 본문/입력 시각을 더함. 실패해도 전체 수집은 계속(error에 사유)
+def fetch_article(item: Dict[str, str], session: requests.Session, limiter: HostLimiter,
+                  backend: ParserBackend) -> Dict[str, str]:
+    article = dict(item)
+    try:
+        doc = limiter.fetch(item['url'], session, backend)
+        published = _select_text(doc, ARTICLE_DATE_SELECTORS, backend)
+        body = _select_text(doc, ARTICLE_BODY_SELECTORS, backend)
+    except ARTICLE_ERRORS as e:
+        article['error'] = f'{type(e).__name__}: {e}'
+        return article
+    article['published'] = published
+    article['body'] = body
+    return article
+
+
+# 크롤러 모드: 메인 페이지의 헤드라인을 모은 뒤 각 기사 페이지를 동시에 받아 본문까지 수집
+# 세션 하나(연결 풀)를 모든 스레드가 함께 쓰고, 호스트별 동시 요청 수와 요청 간격을 지킴
+def crawl_kbs_articles(main_url: str = MAIN_URL, max_workers: int = MAX_WORKERS, per_host: int = PER_HOST_LIMIT,
+                       delay: float = POLITENESS_DELAY, limit: Optional[int] = None,
+                       parser: Optional[str] = None) -> List[Dict[str, str]]:
+    backend = get_parser(parser or PARSER)
+    session = make_session(max_workers)
+    limiter = HostLimiter(per_host, delay)
+    try:
+        headlines = get_kbs_headlines(main_url, session, backend.name)
+        if limit is not None:
+            headlines = headlines[:limit]
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='kbs') as pool:
+            # map은 입력 순서대로 결과를 돌려줌(헤드라인 순서 유지)
+            return list(pool.map(lambda item: fetch_article(item, session, limiter, backend), headlines))
+    finally:
+        session.close()
+
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='KBS 뉴스 헤드라인/기사 수집')
+    parser.add_argument('--main-url', default=MAIN_URL, help='메인 페이지 주소(로컬 테스트: fixture_server.py)')
+    parser.add_argument('--articles', action='store_true', help='헤드라인마다 기사 페이지를 받아 본문까지 수집')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='동시에 받는 기사 수')
+    parser.add_argument('--per-host', type=int, default=PER_HOST_LIMIT, help='한 호스트에 동시에 보내는 요청 수')
+    parser.add_argument('--delay', type=float, default=POLITENESS_DELAY, help='같은 호스트 요청 시작 간격(초)')
+    parser.add_argument('--limit', type=int, default=None, help='기사 수 상한')
+    parser.add_argument('--parser', choices=PARSERS, default=PARSER, help='HTML 파서(auto: 설치된 것 중 가장 빠른 것)')
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
-    headlines = get_kbs_headlines()
-    for item in headlines:
-        print(item)
+    args = parse_args()
+    if not args.articles:
+        headlines = get_kbs_headlines(args.main_url, parser=args.parser)
+        for item in headlines:
+            print(item)
+    else:
+        started = time.perf_counter()
+        articles = crawl_kbs_articles(args.main_url, args.workers, args.per_host, args.delay, args.limit,
+                                      args.parser)
+        for article in articles:
+            pprint(article)
+        failed = sum(1 for a in articles if 'error' in a)
+        print(f'* {len(articles)} articles ({failed} failed) in {time.perf_counter() - started:.2f}s')
@@ -0,0 +1,146 @@
+import argparse
+import html
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# 크롤러 테스트용 로컬 HTTP 서버(실제 KBS에 요청하지 않고 크롤러를 돌려 보기 위함)
+#
+#   python fixture_server.py --port 8925 --latency 0.2
+#   python crawling_KBS.py --main-url http://127.0.0.1:8925/news/pc/main/main.html --articles
+#
+#  - /news/pc/main/main.html : fixtures/kbs_main.html (KBS 메인 구조를 흉내 낸 합성 페이지)
+#  - /news/view.do?ncd=번호   : 기사 페이지(번호로 정해지는 가짜 본문, 매번 같은 내용)
+#  - /__stats                : 지금까지의 요청 수, 연결 수, 동시에 처리 중이던 요청 최대치(JSON)
+# HTTP/1.1 keep-alive라서 클라이언트가 연결을 재사용하면 connections가 requests보다 훨씬 적게 나옴
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BASE_DIR, 'fixtures')
+MAIN_PATH = '/news/pc/main/main.html'
+ARTICLE_PATH = '/news/view.do'
+
+
+def article_html(ncd: str) -> str:
+    # 기사 번호로 시드를 정해 항상 같은 본문
+    rnd = random.Random(ncd)
+    words = '정부 발표 시장 전망 지역 주민 관계자 조사 결과 계획 예산 논의 대응 확대 지원 영향'.split()
+    paragraphs = [' '.join(rnd.choice(words) for _ in range(rnd.randint(20, 40))) + '.' for _ in range(rnd.randint(3, 8))]
+    body = '<br><br>'.join(html.escape(p) for p in paragraphs)
+    return f'''<!DOCTYPE html>
+<html lang="ko">
+<head><meta charset="utf-8"><title>기사 {html.escape(ncd)} | KBS 뉴스 (fixture)</title></head>
+<body>
+<div id="contents">
+  <div class="view-headline">
+    <h4 class="headline-title">기사 {html.escape(ncd)}</h4>
+    <div class="dates"><em class="input-date">입력 2025.09.25 ({rnd.randint(10, 23)}:{rnd.randint(10, 59)})</em></div>
+  </div>
+  <div class="detail-body font-size" id="cont_newstext">{body}</div>
+  <div class="reporter">기자 {rnd.choice(words)}</div>
+</div>
+</body>
+</html>
+'''
+
+
+class FixtureStats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {'requests': self.requests, 'connections': self.connections, 'max_in_flight': self.max_in_flight}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive(연결 재사용 여부를 확인할 수 있게)
+    server_version = 'KBSFixture/0.1'
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.stats.lock:
+            self.server.stats.connections += 1
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == '/__stats':
+            self._send(200, json.dumps(self.server.stats.snapshot()).encode('utf-8'), 'application/json')
+            return
+        stats = self.server.stats
+        with stats.lock:
+            stats.requests += 1
+            stats.in_flight += 1
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        try:
+            if self.server.latency:
+                time.sleep(self.server.latency)  # 느린 원격 서버 흉내
+            if url.path == MAIN_PATH:
+                with open(os.path.join(FIXTURE_DIR, 'kbs_main.html'), 'rb') as f:
+                    self._send(200, f.read())
+            elif url.path == ARTICLE_PATH and parse_qs(url.query).get('ncd'):
+                self._send(200, article_html(parse_qs(url.query)['ncd'][0]).encode('utf-8'))
+            else:
+                self._send(404, b'not found', 'text/plain; charset=utf-8')
+        finally:
+            with stats.lock:
+                stats.in_flight -= 1
+
+    def _send(self, code: int, body: bytes, content_type: str = 'text/html; charset=utf-8') -> None:
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        return
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency: float = 0.0) -> None:
+        super().__init__(address, FixtureHandler)
+        self.latency = latency
+        self.stats = FixtureStats()
+
+    @property
+    def main_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}{MAIN_PATH}'
+
+
+def start_fixture_server(port: int = 0, latency: float = 0.0, host: str = '127.0.0.1') -> FixtureServer:
+    # 백그라운드 스레드로 띄움(port=0이면 빈 포트). 다 쓰면 server.shutdown()
+    server = FixtureServer((host, port), latency)
+    threading.Thread(target=server.serve_forever, name='fixture-server', daemon=True).start()
+    return server
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='KBS 크롤러 테스트용 로컬 HTTP 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8925)
+    parser.add_argument('--latency', type=float, default=0.0, help='응답마다 기다릴 시간(초)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    server = FixtureServer((args.host, args.port), args.latency)
+    print(f'* Serving fixtures at {server.main_url} (Ctrl+C to stop)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('\n* Shutting down...')
+    finally:
+        server.server_close()
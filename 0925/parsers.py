@@ -0,0 +1,275 @@
+import codecs
+import re
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+# ----------------------------
+# HTML 파서 백엔드
+# ----------------------------
+# 크롤러가 문서에서 하는 일(순회, 선택자 매칭, 속성/텍스트 꺼내기)만 모아 두고 파서를 바꿔 끼울 수 있게
+#  - html.parser : 파이썬 내장(설치 필요 없음, 가장 느림)
+#  - lxml        : BeautifulSoup + lxml(pip install lxml)
+#  - selectolax  : lexbor 엔진(pip install selectolax). 파싱/선택자 매칭이 C라서 가장 빠르고 트리도 가벼움
+#  - auto        : 설치된 것 중 가장 빠른 것
+# 어느 백엔드든 응답 바이트를 그대로 받음(본문 전체를 미리 str로 바꾸지 않음)
+# 헤드라인 결과가 백엔드마다 같은지는 check_parsers.py로 확인
+
+PARSERS = ('auto', 'selectolax', 'lxml', 'html.parser')
+
+Node = Any      # 백엔드마다 다른 요소 타입(bs4.Tag, LexborNode)
+Document = Any  # parse()가 돌려준 문서
+
+
+def selector_key(selector: str) -> Tuple[Optional[str], Tuple[str, ...]]:
+    # 선택자 마지막 단계(예: 'a.box-content')의 태그 이름/클래스 → 매칭 전에 빠르게 거르는 데 씀
+    compound = selector.split()[-1].split('[', 1)[0]  # 'a[href*=...]' → 'a'
+    if ':' in compound:  # 가상 클래스(:not 등)가 있으면 미리 거르지 않음
+        return None, ()
+    name = re.match(r'[A-Za-z][\w-]*', compound)
+    return (name.group(0).lower() if name else None), tuple(re.findall(r'\.([\w-]+)', compound))
+
+
+class Selector:
+    # 미리 컴파일한 선택자. name/classes는 빠른 거르기용(None/()이면 모두 후보)
+    name: Optional[str] = None
+    classes: Tuple[str, ...] = ()
+
+    def match(self, node: Node) -> bool:
+        # node 자신이 선택자에 맞는가(조상 조건 포함)
+        raise NotImplementedError
+
+    def select_one(self, node: Node) -> Optional[Node]:
+        # node의 자손 중 문서 순서로 처음 맞는 것(node 자신은 제외)
+        raise NotImplementedError
+
+
+class ParserBackend:
+    name = ''
+
+    def parse(self, content: bytes, encoding: Optional[str] = None) -> Document:
+        # encoding: 응답 헤더의 charset(없으면 None → 백엔드가 <meta charset>으로 판단)
+        raise NotImplementedError
+
+    def compile(self, selector: str) -> Selector:
+        raise NotImplementedError
+
+    def iter_tags(self, doc: Document) -> Iterator[Node]:
+        # 모든 요소를 문서 순서(전위 순회)로. 텍스트/주석은 제외
+        raise NotImplementedError
+
+    def tag_name(self, node: Node) -> str:
+        raise NotImplementedError
+
+    def node_id(self, node: Node) -> int:
+        # 같은 요소면 같은 값(캐시 키). 요소 객체를 매번 새로 만드는 백엔드도 있어서 id()로는 안 됨
+        raise NotImplementedError
+
+    def attr(self, node: Node, name: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def find_parent(self, node: Node, name: str) -> Optional[Node]:
+        # 조상 중 가장 가까운 name 요소
+        raise NotImplementedError
+
+    def text(self, node: Node, separator: str = '', strip: bool = False) -> str:
+        # BeautifulSoup의 get_text와 같은 규칙(script/style/template 내용과 주석은 빼고, strip이면 빈 조각도 뺌)
+        raise NotImplementedError
+
+    def select_one(self, doc: Document, selector: str) -> Optional[Node]:
+        # 문서 전체에서 처음 맞는 요소(한 번만 쓰는 선택자용)
+        raise NotImplementedError
+
+
+# ----------------------------
+# BeautifulSoup (html.parser / lxml)
+# ----------------------------
+class _SoupSelector(Selector):
+    __slots__ = ('pattern', 'name', 'classes')
+
+    def __init__(self, selector: str) -> None:
+        import soupsieve as sv  # BeautifulSoup의 select()가 쓰는 CSS 선택자 엔진(bs4 설치 시 함께 설치됨)
+        self.pattern = sv.compile(selector)
+        self.name, self.classes = selector_key(selector)
+
+    def match(self, node: Node) -> bool:
+        if self.classes:
+            have = node.get('class') or ()
+            for cls in self.classes:
+                if cls not in have:
+                    return False
+        return self.pattern.match(node)
+
+    def select_one(self, node: Node) -> Optional[Node]:
+        return self.pattern.select_one(node)
+
+
+class SoupBackend(ParserBackend):
+    def __init__(self, parser: str = 'html.parser') -> None:
+        from bs4 import BeautifulSoup, Tag
+        if parser == 'lxml':
+            import lxml  # noqa: F401  설치 안 돼 있으면 첫 페이지가 아니라 지금 ImportError
+        self.name = parser
+        self._soup = BeautifulSoup
+        self._tag = Tag
+
+    def parse(self, content: bytes, encoding: Optional[str] = None) -> Document:
+        return self._soup(content, self.name, from_encoding=encoding)
+
+    def compile(self, selector: str) -> Selector:
+        return _SoupSelector(selector)
+
+    def iter_tags(self, doc: Document) -> Iterator[Node]:
+        tag = self._tag
+        for node in doc.descendants:
+            if isinstance(node, tag):
+                yield node
+
+    def tag_name(self, node: Node) -> str:
+        return node.name
+
+    def node_id(self, node: Node) -> int:
+        return id(node)
+
+    def attr(self, node: Node, name: str) -> Optional[str]:
+        return node.get(name)
+
+    def find_parent(self, node: Node, name: str) -> Optional[Node]:
+        return node.find_parent(name)
+
+    def text(self, node: Node, separator: str = '', strip: bool = False) -> str:
+        return node.get_text(separator, strip=strip)
+
+    def select_one(self, doc: Document, selector: str) -> Optional[Node]:
+        return doc.select_one(selector)
+
+
+# ----------------------------
+# selectolax (lexbor)
+# ----------------------------
+# 선택자 매칭은 lexbor(C)가 함. 텍스트는 get_text와 규칙을 맞추려고 직접 모음
+# (selectolax의 text()는 script/style 내용까지 포함함)
+_SKIP_TEXT_PARENTS = frozenset(('script', 'style', 'template'))
+
+
+def _lookup_codec(encoding: Optional[str]) -> Optional[codecs.CodecInfo]:
+    if not encoding:
+        return None
+    try:
+        return codecs.lookup(encoding)
+    except LookupError:
+        return None
+
+
+class _LexborSelector(Selector):
+    __slots__ = ('selector', 'name', 'classes')
+
+    def __init__(self, selector: str) -> None:
+        self.selector = selector
+        self.name, self.classes = selector_key(selector)
+
+    def match(self, node: Node) -> bool:
+        if self.classes:
+            have = (node.attributes.get('class') or '').split()
+            for cls in self.classes:
+                if cls not in have:
+                    return False
+        return node.css_matches(self.selector)
+
+    def select_one(self, node: Node) -> Optional[Node]:
+        # lexbor의 css()는 node 자신도 후보에 넣음 → BeautifulSoup처럼 자손만
+        for found in node.css(self.selector):
+            if found.mem_id != node.mem_id:
+                return found
+        return None
+
+
+class LexborBackend(ParserBackend):
+    name = 'selectolax'
+
+    def __init__(self) -> None:
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse(self, content: bytes, encoding: Optional[str] = None) -> Document:
+        # lexbor는 바이트를 UTF-8로 읽음 → 헤더가 다른 charset을 말할 때만 직접 디코딩
+        # 파이썬이 모르는 charset(오타 등)이면 BeautifulSoup처럼 헤더를 무시하고 바이트 그대로(<meta charset>/UTF-8)
+        codec = _lookup_codec(encoding)
+        if codec is not None and codec.name != 'utf-8':
+            return self._parser(content.decode(codec.name, errors='replace'))
+        return self._parser(content)
+
+    def compile(self, selector: str) -> Selector:
+        return _LexborSelector(selector)
+
+    def iter_tags(self, doc: Document) -> Iterator[Node]:
+        if doc.root is None:
+            return
+        for node in doc.root.traverse(include_text=False):
+            if node.is_element_node:
+                yield node
+
+    def tag_name(self, node: Node) -> str:
+        return node.tag
+
+    def node_id(self, node: Node) -> int:
+        return node.mem_id
+
+    def attr(self, node: Node, name: str) -> Optional[str]:
+        return node.attributes.get(name)
+
+    def find_parent(self, node: Node, name: str) -> Optional[Node]:
+        parent = node.parent
+        while parent is not None and parent.is_element_node:
+            if parent.tag == name:
+                return parent
+            parent = parent.parent
+        return None
+
+    def text(self, node: Node, separator: str = '', strip: bool = False) -> str:
+        parts = []
+        for child in node.traverse(include_text=True):
+            if not child.is_text_node or child.parent.tag in _SKIP_TEXT_PARENTS:
+                continue
+            value = child.text_content or ''
+            if strip:
+                value = value.strip()
+                if not value:
+                    continue
+            parts.append(value)
+        return separator.join(parts)
+
+    def select_one(self, doc: Document, selector: str) -> Optional[Node]:
+        return doc.css_first(selector)
+
+
+_BACKENDS: Dict[str, ParserBackend] = {}
+
+
+def get_parser(name: str = 'auto') -> ParserBackend:
+    # 이름 → 백엔드(한 번 만든 것은 재사용). 설치 안 된 파서를 지정하면 ImportError
+    if name == 'auto':
+        for candidate in ('selectolax', 'lxml', 'html.parser'):
+            try:
+                return get_parser(candidate)
+            except ImportError:
+                continue
+        raise ImportError('쓸 수 있는 HTML 파서가 없음(pip install beautifulsoup4 또는 selectolax)')
+    if name not in _BACKENDS:
+        if name == 'selectolax':
+            _BACKENDS[name] = LexborBackend()
+        elif name in ('lxml', 'html.parser'):
+            _BACKENDS[name] = SoupBackend(name)
+        else:
+            raise ValueError(f'알 수 없는 파서: {name} (가능: {", ".join(PARSERS)})')
+    return _BACKENDS[name]
+
+
+def available_parsers() -> Sequence[str]:
+    # 지금 환경에서 쓸 수 있는 백엔드 이름('auto' 제외)
+    names = []
+    for name in PARSERS[1:]:
+        try:
+            get_parser(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names